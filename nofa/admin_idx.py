@@ -0,0 +1,160 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ AdminIdx
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from collections import OrderedDict
+
+from . import db
+
+
+class AdminIdx(object):
+    """
+    An in-memory index of countries, counties and municipalities.
+    """
+
+    def __init__(self, admin_idx_list=()):
+        """
+        Constructor.
+
+        :param admin_idx_list: A list of administrative units,
+            see :func:`nofa.db.get_admin_idx_list`.
+        :type admin_idx_list: list
+        """
+
+        # country code -> county -> set of municipalities
+        self.admin_dict = OrderedDict()
+        # county -> rank
+        self.cnty_rank_dict = {}
+        # municipality -> rank
+        self.muni_rank_dict = {}
+
+        for cntry_code, cnty, muni, cnty_rank, muni_rank in admin_idx_list:
+            cntry_code, cnty, muni = [
+                db.get_unicode(val) for val in (cntry_code, cnty, muni)]
+
+            self.admin_dict \
+                .setdefault(cntry_code, OrderedDict()) \
+                .setdefault(cnty, set()) \
+                .add(muni)
+            self.cnty_rank_dict[cnty] = cnty_rank
+            self.muni_rank_dict[muni] = muni_rank
+
+    def _get_cntry_dicts(self, cntry_code):
+        """
+        Returns county dictionaries of the given country.
+
+        :param cntry_code: A country code, None for all countries.
+        :type cntry_code: str
+
+        :returns: A list of county dictionaries.
+        :rtype: list
+        """
+
+        if cntry_code is None:
+            return self.admin_dict.values()
+
+        cntry_code = db.get_unicode(cntry_code)
+
+        if cntry_code in self.admin_dict:
+            return [self.admin_dict[cntry_code]]
+
+        return []
+
+    def get_cntry_code_list(self):
+        """
+        Returns a list of country codes that is used to populate
+        country code combo box.
+
+        :returns: A list of country codes.
+        :rtype: list
+        """
+
+        return list(self.admin_dict.keys())
+
+    def get_cnty_list(self, cntry_code):
+        """
+        Returns a list of counties that is used to populate
+        county combo box.
+
+        :param cntry_code: A country code, None for all countries.
+        :type cntry_code: str
+
+        :returns: A list of counties.
+        :rtype: list
+        """
+
+        cnty_set = set()
+
+        for cnty_dict in self._get_cntry_dicts(cntry_code):
+            cnty_set.update(cnty_dict.keys())
+
+        cnty_list = sorted(cnty_set, key=self.cnty_rank_dict.get)
+
+        return cnty_list
+
+    def get_muni_list(self, cntry_code, cnty):
+        """
+        Returns a list of municipalities that is used to populate
+        municipality combo box.
+
+        :param cntry_code: A country code, None for all countries.
+        :type cntry_code: str
+        :param cnty: A county, None for all counties.
+        :type cnty: str
+
+        :returns: A list of municipalities.
+        :rtype: list
+        """
+
+        cnty = db.get_unicode(cnty)
+
+        muni_set = set()
+
+        for cnty_dict in self._get_cntry_dicts(cntry_code):
+            if cnty is None:
+                for cnty_muni_set in cnty_dict.values():
+                    muni_set.update(cnty_muni_set)
+            elif cnty in cnty_dict:
+                muni_set.update(cnty_dict[cnty])
+
+        muni_list = sorted(muni_set, key=self.muni_rank_dict.get)
+
+        return muni_list
+
+
+def get_admin_idx(con):
+    """
+    Returns an administrative index loaded in one query.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns: An administrative index.
+    :rtype: AdminIdx
+    """
+
+    admin_idx = AdminIdx(db.get_admin_idx_list(con))
+
+    return admin_idx
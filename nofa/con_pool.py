@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ ConPool
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import threading
+import time
+
+import psycopg2
+import psycopg2.extensions
+
+from . import db
+
+
+class ConPool(object):
+    """
+    A pool of connections shared by the main window, dialogs and workers.
+
+    Connections are kept open between plugin launches
+    so that reopening the plugin does not connect again.
+    """
+
+    def __init__(self, max_idle=2, chck_intvl=60):
+        """
+        Constructor.
+
+        :param max_idle: A maximum number of idle connections
+            kept per connection information.
+        :type max_idle: int
+        :param chck_intvl: A number of seconds a connection can be idle
+            before it is checked by a query when borrowed.
+        :type chck_intvl: int
+        """
+
+        self.max_idle = max_idle
+        self.chck_intvl = chck_intvl
+
+        self.lock = threading.Lock()
+
+        # key -> list of (connection, time it was returned)
+        self.idle_dict = {}
+        # id of a connection -> key
+        self.used_dict = {}
+
+    @staticmethod
+    def _get_key(con_info):
+        """
+        Returns a key of the given connection information.
+
+        :param con_info: A connection information dictionary.
+        :type con_info: dict
+
+        :returns: A key of the connection information.
+        :rtype: tuple
+        """
+
+        return tuple(sorted(con_info.items()))
+
+    def get_con(self, con_info):
+        """
+        Returns a connection for the given connection information.
+        An idle connection is reused when it is still usable,
+        a new one is opened otherwise.
+
+        :param con_info: A connection information dictionary.
+        :type con_info: dict
+
+        :returns: A connection.
+        :rtype: psycopg2.connection
+        """
+
+        key = self._get_key(con_info)
+
+        while True:
+            with self.lock:
+                idle_list = self.idle_dict.get(key)
+                if not idle_list:
+                    break
+                con, put_ts = idle_list.pop()
+
+            if self._chck_con(con, put_ts):
+                with self.lock:
+                    self.used_dict[id(con)] = key
+                return con
+
+            self._close_con(con)
+
+        con = db.get_con(con_info)
+
+        with self.lock:
+            self.used_dict[id(con)] = key
+
+        return con
+
+    def put_con(self, con, close=False):
+        """
+        Returns the given connection to the pool.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param close: True to close the connection instead of keeping it.
+        :type close: bool
+        """
+
+        if con is None:
+            return
+
+        with self.lock:
+            key = self.used_dict.pop(id(con), None)
+
+        if close or key is None or not self._rst_con(con):
+            self._close_con(con)
+            return
+
+        with self.lock:
+            idle_list = self.idle_dict.setdefault(key, [])
+            if len(idle_list) < self.max_idle:
+                idle_list.append((con, time.time()))
+                return
+
+        self._close_con(con)
+
+    def close_all(self):
+        """
+        Closes all idle connections and forgets borrowed ones.
+        """
+
+        with self.lock:
+            idle_list = [
+                con
+                for con_list in self.idle_dict.values()
+                for con, put_ts in con_list]
+            self.idle_dict.clear()
+            self.used_dict.clear()
+
+        for con in idle_list:
+            self._close_con(con)
+
+    def _chck_con(self, con, put_ts):
+        """
+        Checks if the given idle connection is usable.
+        A query is sent only when the connection has been idle
+        for more than the check interval.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param put_ts: A time the connection was returned to the pool.
+        :type put_ts: float
+
+        :returns: True when the connection is usable, False otherwise.
+        :rtype: bool
+        """
+
+        if con.closed:
+            return False
+
+        if con.get_transaction_status() != \
+                psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+
+        if time.time() - put_ts < self.chck_intvl:
+            return True
+
+        try:
+            cur = con.cursor()
+            cur.execute('SELECT 1')
+            cur.close()
+        except psycopg2.Error:
+            return False
+
+        return True
+
+    def _rst_con(self, con):
+        """
+        Resets the given connection before it is kept in the pool.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+
+        :returns: True when the connection can be kept, False otherwise.
+        :rtype: bool
+        """
+
+        if con.closed:
+            return False
+
+        try:
+            if con.get_transaction_status() != \
+                    psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                con.rollback()
+            con.set_isolation_level(
+                psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+        except psycopg2.Error:
+            return False
+
+        return True
+
+    def _close_con(self, con):
+        """
+        Closes the given connection ignoring errors.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        """
+
+        try:
+            if not con.closed:
+                con.close()
+        except psycopg2.Error:
+            pass
@@ -23,21 +23,190 @@
  ***************************************************************************/
 """
 
-from collections import defaultdict
+from collections import defaultdict, OrderedDict
+import copy
 import datetime
+import functools
+import io
+import json
+import struct
+import threading
+import time
+import uuid
 import psycopg2
 import psycopg2.extras
 
+from . import instr
+
+
+# number of rows sent in one multi-row statement
+INS_PAGE_SIZE = 500
+
+# number of rows from which rows are inserted by COPY instead of INSERT
+COPY_MIN_ROWS = 2000
+
+# number of buffered rows of one table inserted at once
+# when an insert session is flushed
+FLUSH_SIZE = 10000
+
+
+# True to prepare frequent statements once per connection,
+# False when sessions are not kept between transactions
+# (e.g. PgBouncer in transaction pooling mode)
+PREP_STMTS = True
+
+# meters within which the nearest lake of a point is searched for
+NRST_RADIUS = 100.0
+
+# seconds a cached result is valid for when its table is not listed below
+CACHE_TTL = 24 * 60 * 60
+
+# seconds a cached result is valid for, tables that change more often
+CACHE_TTL_DICT = {
+    u'm_dataset': 10 * 60,
+    u'm_project': 10 * 60,
+    u'm_reference': 10 * 60,
+    u'location': 60 * 60,
+    u'pg_user': 10 * 60}
+
+# (function name, dsn, arguments) -> (time, tables, result)
+_cache_dict = {}
+_cache_stats = {u'hit': 0, u'miss': 0}
+_cache_lock = threading.Lock()
+# increased on every invalidation so that results of queries
+# running during an invalidation are not stored
+_cache_gen = [0]
+# dsn -> table -> version when tables were checked last time
+_tbl_vers_dict = {}
+
+# cached functions whose results are saved to lookup snapshots,
+# they are those refreshed together by a warm-up
+SNAP_FNC_NAMES = frozenset([
+    u'get_oqt_list',
+    u'get_occstat_list',
+    u'get_poptrend_list',
+    u'get_estbms_list',
+    u'get_smpp_list',
+    u'get_reliab_list',
+    u'get_smpsu_list',
+    u'get_spwnc_list',
+    u'get_spwnl_list',
+    u'get_reftp_list',
+    u'get_inst_list',
+    u'get_acs_list',
+    u'get_dtst_list',
+    u'get_prj_list',
+    u'get_ref_list',
+    u'get_txn_idx_list',
+    u'get_col_def_val',
+    u'get_admin_idx_list'])
+
+_EVENT_COLS = (
+    'locationID',
+    'eventID',
+    'samplingProtocol',
+    'sampleSizeUnit',
+    'sampleSizeValue',
+    'samplingEffort',
+    'dateStart',
+    'dateEnd',
+    'fieldNumber',
+    'recordedBy',
+    'eventRemarks',
+    'reliability',
+    'datasetID',
+    'projectID',
+    'referenceID')
+
+_OCC_COLS = (
+    'occurrenceID',
+    'taxonID',
+    'ecotypeID',
+    'organismQuantityType',
+    'organismQuantity',
+    'occurrenceStatus',
+    'populationTrend',
+    'recordNumber',
+    'occurrenceRemarks',
+    'establishmentMeans',
+    'establishmentRemarks',
+    'spawningCondition',
+    'spawningLocation',
+    'verifiedBy',
+    'verifiedDate',
+    'modified',
+    'eventID')
+
+_TXNCVG_COLS = (
+    'taxonID',
+    'eventID')
+
+_OCC_LOG_COLS = (
+    'occurrence_id',
+    'event_id',
+    'dataset_id',
+    'project_id',
+    'reference_id',
+    'location_id',
+    'username')
+
+_EVENT_LOG_COLS = (
+    'event_id',
+    'location_id',
+    'dataset_id',
+    'project_id',
+    'reference_id',
+    'username')
+
+
+class PrepCon(psycopg2.extensions.connection):
+    """
+    A connection that keeps track of statements prepared in its session.
+    """
+
+    def __init__(self, *args, **kwargs):
+        """
+        Constructor.
+        """
+
+        super(PrepCon, self).__init__(*args, **kwargs)
+
+        self.prep_stmt_set = set()
+
+
+def get_unicode(val):
+    """
+    Returns the given text as unicode.
+    Byte strings returned by the database are decoded as UTF-8
+    so that they match text of widgets, other values are returned as they
+    are.
+
+    :param val: A value.
+    :type val: object
+
+    :returns: A value, text as unicode.
+    :rtype: object
+    """
+
+    if isinstance(val, bytes):
+        return val.decode(u'utf-8')
+
+    return val
+
 
 def get_con(con_info):
     """
     Returns a connection.
+    Queries of all its cursors are recorded by :mod:`nofa.instr`.
 
     :returns: A connection.
     :rtype: psycopg2.connection
     """
 
-    con = psycopg2.connect(**con_info)
+    con = psycopg2.connect(
+        connection_factory=PrepCon,
+        cursor_factory=instr.InstrCur,
+        **con_info)
     con.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
 
     return con
@@ -57,6 +226,384 @@ def _get_db_cur(con):
     return con.cursor()
 
 
+def set_prep_stmts(bl):
+    """
+    Turns prepared statements on or off.
+
+    :param bl: True to use prepared statements, False otherwise.
+    :type bl: bool
+    """
+
+    global PREP_STMTS
+
+    PREP_STMTS = bl
+
+
+def set_nrst_radius(radius):
+    """
+    Sets a radius within which the nearest lake of a point is searched for.
+
+    :param radius: A radius in meters.
+    :type radius: float
+    """
+
+    global NRST_RADIUS
+
+    NRST_RADIUS = float(radius)
+
+
+def _prep_stmt(con, name, sql):
+    """
+    Prepares the given statement in the session of the given connection
+    unless it has been prepared there already.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param name: A statement name.
+    :type name: str
+    :param sql: A statement with `%s` placeholders.
+    :type sql: str
+
+    :returns: True when the statement is prepared, False when prepared
+        statements are off or the connection does not keep track of them.
+    :rtype: bool
+    """
+
+    if not PREP_STMTS:
+        return False
+
+    prep_stmt_set = getattr(con, 'prep_stmt_set', None)
+
+    if prep_stmt_set is None:
+        return False
+
+    if name not in prep_stmt_set:
+        prm_cnt = sql.count(u'%s')
+        prep_sql = sql % tuple([u'${}'.format(i + 1) for i in range(prm_cnt)])
+
+        cur = _get_db_cur(con)
+        cur.execute(u'PREPARE {} AS {}'.format(name, prep_sql))
+
+        prep_stmt_set.add(name)
+
+    return True
+
+
+def _exec_stmt(con, name, sql, params):
+    """
+    Executes the given statement, prepared when possible.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param name: A statement name.
+    :type name: str
+    :param sql: A statement with `%s` placeholders.
+    :type sql: str
+    :param params: A list of parameters.
+    :type params: tuple
+
+    :returns: A database cursor with the result.
+    :rtype: psycopg2.cursor
+    """
+
+    cur = _get_db_cur(con)
+
+    if _prep_stmt(con, name, sql):
+        cur.execute(
+            u'EXECUTE {} ({})'.format(name, u', '.join([u'%s'] * len(params))),
+            params)
+    else:
+        cur.execute(sql, params)
+
+    return cur
+
+
+def _cached(*tbls):
+    """
+    Returns a decorator that caches results of a function
+    that reads from the given tables.
+    The function has to take a connection as the first argument,
+    the result is cached per function, database and other arguments.
+    A copy of the cached result is returned
+    so that callers can modify it.
+
+    :param tbls: Names of tables the function reads from.
+    :type tbls: tuple
+
+    :returns: A decorator.
+    :rtype: function
+    """
+
+    ttl = min([CACHE_TTL_DICT.get(tbl, CACHE_TTL) for tbl in tbls])
+
+    def _dec(fnc):
+        @functools.wraps(fnc)
+        def _wrpr(con, *args):
+            key = (fnc.__name__, con.dsn, args)
+            now = time.time()
+
+            with _cache_lock:
+                ent = _cache_dict.get(key)
+                if ent and now - ent[0] < ttl:
+                    _cache_stats[u'hit'] += 1
+                    return copy.deepcopy(ent[2])
+                _cache_stats[u'miss'] += 1
+                gen = _cache_gen[0]
+
+            val = fnc(con, *args)
+
+            with _cache_lock:
+                if gen == _cache_gen[0]:
+                    _cache_dict[key] = (now, tbls, val)
+
+            return copy.deepcopy(val)
+
+        _wrpr.cache_tbls = tbls
+
+        return _wrpr
+
+    return _dec
+
+
+def invalidate(*tbls):
+    """
+    Removes cached results that were read from any of the given tables.
+    When no table is given the whole cache is cleared.
+
+    :param tbls: Names of tables.
+    :type tbls: tuple
+    """
+
+    with _cache_lock:
+        _cache_gen[0] += 1
+
+        if not tbls:
+            _cache_dict.clear()
+            return
+
+        for key, ent in _cache_dict.items():
+            if set(tbls) & set(ent[1]):
+                del _cache_dict[key]
+
+
+def get_tbl_vers(con):
+    """
+    Returns versions of lookup and metadata tables
+    and of administrative units of locations in one query.
+    A version is made of the table file node and numbers of inserted,
+    updated and deleted rows from `pg_stat_user_tables`,
+    so it changes with every write, truncate or refresh.
+    Statistics are collected with a delay, a change can be seen
+    up to a few seconds after its commit.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns: A dictionary with table names as used by :func:`_cached`
+        as keys and versions as values.
+    :rtype: dict
+    """
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT      s.relname,
+                    concat_ws(
+                        ':',
+                        pg_relation_filenode(s.relid),
+                        s.n_tup_ins,
+                        s.n_tup_upd,
+                        s.n_tup_del,
+                        d.stats_reset)
+        FROM        pg_catalog.pg_stat_user_tables s
+                    CROSS JOIN
+                    pg_catalog.pg_stat_database d
+        WHERE       d.datname = current_database()
+                    AND
+                    ((s.schemaname = 'nofa'
+                      AND
+                      (s.relname LIKE 'l\\_%'
+                       OR
+                       s.relname IN (
+                           'm_dataset',
+                           'm_project',
+                           'm_reference',
+                           'location')))
+                     OR
+                     (s.schemaname = 'plugin'
+                      AND
+                      s.relname = 'location_admin'))
+        ''')
+    tbl_vers_dict = dict(cur.fetchall())
+
+    # administrative units are read from locations when there is no view
+    if u'location_admin' not in tbl_vers_dict \
+            and u'location' in tbl_vers_dict:
+        tbl_vers_dict[u'location_admin'] = tbl_vers_dict[u'location']
+
+    return tbl_vers_dict
+
+
+def chck_tbl_vers(con):
+    """
+    Invalidates cached results read from tables whose version changed
+    since the last check for the database of the given connection.
+    Nothing is invalidated on the first check.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns: A list of changed tables.
+    :rtype: list
+    """
+
+    tbl_vers_dict = get_tbl_vers(con)
+
+    with _cache_lock:
+        last_tbl_vers_dict = _tbl_vers_dict.get(con.dsn)
+        _tbl_vers_dict[con.dsn] = tbl_vers_dict
+
+    if last_tbl_vers_dict is None:
+        return []
+
+    chngd_tbl_list = sorted(
+        tbl for tbl in set(tbl_vers_dict) | set(last_tbl_vers_dict)
+        if tbl_vers_dict.get(tbl) != last_tbl_vers_dict.get(tbl))
+
+    if chngd_tbl_list:
+        invalidate(*chngd_tbl_list)
+
+    return chngd_tbl_list
+
+
+def _seed_cache(con, fnc, args, val):
+    """
+    Stores the given result of the given cached function in the cache
+    as if it was returned by the function.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param fnc: A function decorated by :func:`_cached`.
+    :type fnc: function
+    :param args: A tuple of arguments following the connection.
+    :type args: tuple
+    :param val: A result.
+    :type val: object
+    """
+
+    key = (fnc.__name__, con.dsn, args)
+
+    with _cache_lock:
+        _cache_dict[key] = (time.time(), fnc.cache_tbls, val)
+
+
+def get_cache_stats():
+    """
+    Returns cache statistics.
+
+    :returns: A dictionary with numbers of cache hits, cache misses
+        and cached results.
+    :rtype: dict
+    """
+
+    with _cache_lock:
+        cache_stats = dict(_cache_stats)
+        cache_stats[u'size'] = len(_cache_dict)
+
+    return cache_stats
+
+
+def get_cache_snap(con):
+    """
+    Returns a snapshot of results of :data:`SNAP_FNC_NAMES`
+    cached for the database of the given connection.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns: A dictionary with tuples containing a function name
+        and arguments following the connection as keys and results
+        as values.
+    :rtype: dict
+    """
+
+    with _cache_lock:
+        snap_dict = {
+            (key[0], key[2]): ent[2]
+            for key, ent in _cache_dict.items()
+            if key[1] == con.dsn and key[0] in SNAP_FNC_NAMES}
+
+    return snap_dict
+
+
+def load_cache_snap(con, snap_dict):
+    """
+    Stores results of the given snapshot in the cache
+    as if they were returned by their functions.
+    Results that are already cached and results of functions
+    that are not in :data:`SNAP_FNC_NAMES` are kept out.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param snap_dict: A snapshot, see :func:`get_cache_snap`.
+    :type snap_dict: dict
+    """
+
+    now = time.time()
+
+    with _cache_lock:
+        for (fnc_name, args), val in snap_dict.items():
+            fnc = globals().get(fnc_name)
+            if fnc_name not in SNAP_FNC_NAMES \
+                    or not hasattr(fnc, u'cache_tbls'):
+                continue
+
+            key = (fnc_name, con.dsn, args)
+            if key not in _cache_dict:
+                _cache_dict[key] = (now, fnc.cache_tbls, val)
+
+
+def get_schema_stamp(con):
+    """
+    Returns a stamp of the `NOFA` schema that changes
+    when any of its tables or columns changes.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns: A schema stamp.
+    :rtype: str
+    """
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT  md5(
+                    string_agg(
+                        c.relname
+                        || '.' || a.attname
+                        || ' ' || format_type(a.atttypid, a.atttypmod),
+                        ',' ORDER BY c.relname, a.attnum))
+        FROM    pg_catalog.pg_attribute a
+                JOIN
+                pg_catalog.pg_class c
+                    ON c.oid = a.attrelid
+                JOIN
+                pg_catalog.pg_namespace n
+                    ON n.oid = c.relnamespace
+        WHERE   n.nspname = 'nofa'
+                AND
+                c.relkind IN ('r', 'v')
+                AND
+                a.attnum > 0
+                AND
+                NOT a.attisdropped
+        ''')
+    schema_stamp = cur.fetchone()[0]
+
+    return schema_stamp
+
+
 def chck_nofa_tbls(con):
     """
     Checks if the database is NOFA.
@@ -87,6 +634,284 @@ def chck_nofa_tbls(con):
     return resp
 
 
+def _ins_rows(con, tbl, cols, rows, stmt_name=None):
+    """
+    Inserts the given rows to the given table.
+    Rows are sent in pages, so the number of round trips grows
+    with the number of pages, not the number of rows.
+    When a statement name is given and prepared statements are on,
+    each page is a batch of executions of a prepared insert,
+    otherwise it is one multi-row statement.
+    From :data:`COPY_MIN_ROWS` rows on they are streamed
+    by `COPY ... FROM STDIN` instead.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param tbl: A table, schema-qualified and quoted where needed.
+    :type tbl: str
+    :param cols: A list of column names.
+    :type cols: list
+    :param rows: A list of row dictionaries, keys are column names.
+    :type rows: list
+    :param stmt_name: A name of the prepared insert statement.
+    :type stmt_name: str
+    """
+
+    if len(rows) == 0:
+        return
+
+    if len(rows) >= COPY_MIN_ROWS:
+        _copy_rows(con, tbl, cols, rows)
+        return
+
+    col_str = u', '.join([u'"{}"'.format(c) for c in cols])
+    tpl_str = u', '.join([u'%({})s'.format(c) for c in cols])
+
+    cur = _get_db_cur(con)
+
+    if stmt_name and _prep_stmt(
+            con,
+            stmt_name,
+            u'INSERT INTO {} ({}) VALUES ({})'.format(
+                tbl, col_str, u', '.join([u'%s'] * len(cols)))):
+        psycopg2.extras.execute_batch(
+            cur,
+            u'EXECUTE {} ({})'.format(stmt_name, tpl_str),
+            rows,
+            page_size=INS_PAGE_SIZE)
+    else:
+        psycopg2.extras.execute_values(
+            cur,
+            u'INSERT INTO {} ({}) VALUES %s'.format(tbl, col_str),
+            rows,
+            template=u'({})'.format(tpl_str),
+            page_size=INS_PAGE_SIZE)
+
+
+def _copy_rows(con, tbl, cols, rows):
+    """
+    Inserts the given rows to the given table by `COPY ... FROM STDIN`
+    in PostgreSQL text format.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param tbl: A table, schema-qualified and quoted where needed.
+    :type tbl: str
+    :param cols: A list of column names.
+    :type cols: list
+    :param rows: A list of row dictionaries, keys are column names.
+    :type rows: list
+    """
+
+    enc = psycopg2.extensions.encodings[con.encoding]
+
+    copy_buf = io.BytesIO()
+
+    for row in rows:
+        copy_buf.write(
+            b'\t'.join([_get_copy_val(row[c], enc) for c in cols]))
+        copy_buf.write(b'\n')
+
+    copy_buf.seek(0)
+
+    cur = _get_db_cur(con)
+    cur.copy_expert(
+        u'COPY {} ({}) FROM STDIN'.format(
+            tbl, u', '.join([u'"{}"'.format(c) for c in cols])),
+        copy_buf)
+
+
+def _get_copy_val(val, enc):
+    """
+    Returns a value in `COPY` text format.
+
+    :param val: A value.
+    :type val: object
+    :param enc: A Python name of the connection encoding.
+    :type enc: str
+
+    :returns: A value in `COPY` text format.
+    :rtype: str
+    """
+
+    if val is None:
+        return b'\\N'
+
+    if isinstance(val, bool):
+        copy_val = b't' if val else b'f'
+    elif isinstance(val, float):
+        copy_val = repr(val)
+    elif isinstance(val, unicode):
+        copy_val = val.encode(enc)
+    else:
+        copy_val = str(val)
+
+    copy_val = copy_val \
+        .replace(b'\\', b'\\\\') \
+        .replace(b'\t', b'\\t') \
+        .replace(b'\n', b'\\n') \
+        .replace(b'\r', b'\\r')
+
+    return copy_val
+
+
+class InsSess(object):
+    """
+    An insert session (unit of work).
+
+    All statements executed on the connection inside the session
+    are one transaction. Rows added to the session are buffered
+    and inserted in bulk. The transaction is committed when the session
+    exits normally and rolled back when an exception is raised.
+    When a commit size is set, buffered rows are inserted and committed
+    every time at least that many rows have been added.
+    """
+
+    def __init__(self, con, cmt_size=0, wrt_cb=None):
+        """
+        Constructor.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param cmt_size: A number of rows after which the transaction
+            is committed, 0 to commit only once at the end.
+        :type cmt_size: int
+        :param wrt_cb: A function called with a number of rows
+            every time buffered rows are inserted, an exception it raises
+            rolls the transaction back.
+        :type wrt_cb: function
+        """
+
+        self.con = con
+        self.cmt_size = cmt_size
+        self.wrt_cb = wrt_cb
+
+        self.row_dict = OrderedDict()
+        self.row_cnt = 0
+
+    def __enter__(self):
+        """
+        Starts the transaction.
+
+        :returns: The insert session.
+        :rtype: InsSess
+        """
+
+        self.con.set_isolation_level(
+            psycopg2.extensions.ISOLATION_LEVEL_READ_COMMITTED)
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """
+        Commits the transaction when there is no exception,
+        rolls it back otherwise.
+        """
+
+        try:
+            if exc_type is None:
+                try:
+                    self.flush()
+                    self.con.commit()
+                except Exception:
+                    if not self.con.closed:
+                        self.con.rollback()
+                    raise
+            else:
+                self.con.rollback()
+        finally:
+            if not self.con.closed:
+                self.con.set_isolation_level(
+                    psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+
+    def add_rows(self, ins_fnc, rows):
+        """
+        Adds rows to the session.
+
+        Rows are inserted in the order in which insert functions were
+        first added, so parent rows have to be added first.
+
+        :param ins_fnc: A bulk insert function, e.g. :func:`ins_events`.
+        :type ins_fnc: function
+        :param rows: A list of rows.
+        :type rows: list
+        """
+
+        self.row_dict.setdefault(ins_fnc, []).extend(rows)
+        self.row_cnt += len(rows)
+
+        if self.cmt_size and self.row_cnt >= self.cmt_size:
+            self.cmt()
+
+    def cmt(self):
+        """
+        Inserts all buffered rows and commits the transaction.
+        The session continues in a new transaction.
+        """
+
+        self.flush()
+        self.con.commit()
+
+    def flush(self):
+        """
+        Inserts all buffered rows, at most :data:`FLUSH_SIZE` rows
+        of one table at once.
+        """
+
+        for ins_fnc, rows in self.row_dict.items():
+            for i in range(0, len(rows), FLUSH_SIZE):
+                wrt_rows = rows[i:i + FLUSH_SIZE]
+                ins_fnc(self.con, wrt_rows)
+
+                if self.wrt_cb is not None:
+                    self.wrt_cb(len(wrt_rows))
+
+            del rows[:]
+
+        self.row_cnt = 0
+
+
+def get_event_row(loc_id, event_id, event_list, dtst_id, prj_id, ref_id):
+    """
+    Returns an event row that is used for inserting events.
+
+    :param loc_id: A location ID.
+    :type loc_id: uuid.UUID
+    :param event_id: An event ID.
+    :type event_id: uuid.UUID
+    :param event_list: A list of data from event input widgets.
+    :type event_list: list
+    :param dtst_id: A dataset ID.
+    :type dtst_id: str
+    :param prj_id: A project ID.
+    :type prj_id: str
+    :param ref_id: A reference ID.
+    :type ref_id: int
+
+    :returns: An event row.
+    :rtype: dict
+    """
+
+    event_row = {
+        'locationID': loc_id,
+        'eventID': event_id,
+        'samplingProtocol': event_list[0],
+        'sampleSizeUnit': event_list[1],
+        'sampleSizeValue': event_list[2],
+        'samplingEffort': event_list[3],
+        'dateStart': event_list[4],
+        'dateEnd': event_list[5],
+        'fieldNumber': event_list[6],
+        'recordedBy': event_list[7],
+        'eventRemarks': event_list[8],
+        'reliability': event_list[9],
+        'datasetID': dtst_id,
+        'projectID': prj_id,
+        'referenceID': ref_id}
+
+    return event_row
+
+
 def ins_event(con, loc_id, event_id, event_list, dtst_id, prj_id, ref_id):
     """
     Insert an event to the database.
@@ -107,56 +932,24 @@ def ins_event(con, loc_id, event_id, event_list, dtst_id, prj_id, ref_id):
     :type ref_id: int
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
-        '''
-        INSERT INTO    nofa."event" (
-                           "locationID",
-                           "eventID",
-                           "samplingProtocol",
-                           "sampleSizeUnit",
-                           "sampleSizeValue",
-                           "samplingEffort",
-                           "dateStart",
-                           "dateEnd",
-                           "fieldNumber",
-                           "recordedBy",
-                           "eventRemarks",
-                           "reliability",
-                           "datasetID",
-                           "projectID",
-                           "referenceID")
-        VALUES         (   %(locationID)s,
-                           %(eventID)s,
-                           %(samplingProtocol)s,
-                           %(sampleSizeUnit)s,
-                           %(sampleSizeValue)s,
-                           %(samplingEffort)s,
-                           %(dateStart)s,
-                           %(dateEnd)s,
-                           %(fieldNumber)s,
-                           %(recordedBy)s,
-                           %(eventRemarks)s,
-                           %(reliability)s,
-                           %(datasetID)s,
-                           %(projectID)s,
-                           %(referenceID)s)
-        ''',
-        {'locationID': loc_id,
-         'eventID': event_id,
-         'samplingProtocol': event_list[0],
-         'sampleSizeUnit': event_list[1],
-         'sampleSizeValue': event_list[2],
-         'samplingEffort': event_list[3],
-         'dateStart': event_list[4],
-         'dateEnd': event_list[5],
-         'fieldNumber': event_list[6],
-         'recordedBy': event_list[7],
-         'eventRemarks': event_list[8],
-         'reliability': event_list[9],
-         'datasetID': dtst_id,
-         'projectID': prj_id,
-         'referenceID': ref_id})
+    ins_events(
+        con,
+        [get_event_row(
+            loc_id, event_id, event_list, dtst_id, prj_id, ref_id)])
+
+
+def ins_events(con, event_rows):
+    """
+    Insert events to the database.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param event_rows: A list of event rows, see :func:`get_event_row`.
+    :type event_rows: list
+    """
+
+    _ins_rows(
+        con, u'nofa."event"', _EVENT_COLS, event_rows, u'nofa_ins_event')
 
 
 def get_txn_id(con, txn):
@@ -172,8 +965,9 @@ def get_txn_id(con, txn):
     :rtype: int
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    cur = _exec_stmt(
+        con,
+        u'nofa_get_txn_id',
         '''
         SELECT      "taxonID"
         FROM        nofa."l_taxon"
@@ -199,8 +993,9 @@ def get_ectp_id(con, ectp):
     :rtype: int
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    cur = _exec_stmt(
+        con,
+        u'nofa_get_ectp_id',
         '''
         SELECT      "ecotypeID"
         FROM        nofa."l_ecotype"
@@ -213,6 +1008,47 @@ def get_ectp_id(con, ectp):
     return ectp_id
 
 
+def get_occ_row(occ_id, txn_id, ectp_id, occ_row_list, event_id):
+    """
+    Returns an occurrence row that is used for inserting occurrences.
+
+    :param occ_id: An occurrence ID.
+    :type occ_id: uuid.UUID
+    :param txn_id: A taxon ID.
+    :type txn_id: int
+    :param ectp_id: An ecotype ID, None when there is no ecotype.
+    :type ectp_id: int
+    :param occ_row_list: A list of data in the row in the occurrence table.
+    :type occ_row_list: list
+    :param event_id: An event ID.
+    :type event_id: uuid.UUID
+
+    :returns: An occurrence row.
+    :rtype: dict
+    """
+
+    occ_row = {
+        'occurrenceID': occ_id,
+        'taxonID': txn_id,
+        'ecotypeID': ectp_id,
+        'organismQuantityType': occ_row_list[2],
+        'organismQuantity': occ_row_list[3],
+        'occurrenceStatus': occ_row_list[4],
+        'populationTrend': occ_row_list[5],
+        'recordNumber': occ_row_list[6],
+        'occurrenceRemarks': occ_row_list[7],
+        'establishmentMeans': occ_row_list[8],
+        'establishmentRemarks': occ_row_list[9],
+        'spawningCondition': occ_row_list[10],
+        'spawningLocation': occ_row_list[11],
+        'verifiedBy': occ_row_list[12],
+        'verifiedDate': occ_row_list[13],
+        'modified': datetime.datetime.now(),
+        'eventID': event_id}
+
+    return occ_row
+
+
 def ins_occ(con, occ_id, txn_id, ectp_id, occ_row_list, event_id):
     """
     insert an occurrence to the database.
@@ -229,67 +1065,46 @@ def ins_occ(con, occ_id, txn_id, ectp_id, occ_row_list, event_id):
     :type occ_row_list: list
     :param event_id: An event ID.
     :type event_id: uuid.UUID
+    """
 
-    :returns: An ecotype ID, None when there is no ecotype.
-    :rtype: int
+    ins_occs(
+        con,
+        [get_occ_row(occ_id, txn_id, ectp_id, occ_row_list, event_id)])
+
+
+def ins_occs(con, occ_rows):
     """
+    Insert occurrences to the database.
 
-    cur = _get_db_cur(con)
-    cur.execute(
-        '''
-        INSERT INTO    nofa."occurrence" (
-                           "occurrenceID",
-                           "taxonID",
-                           "ecotypeID",
-                           "organismQuantityType",
-                           "organismQuantity",
-                           "occurrenceStatus",
-                           "populationTrend",
-                           "recordNumber",
-                           "occurrenceRemarks",
-                           "establishmentMeans",
-                           "establishmentRemarks",
-                           "spawningCondition",
-                           "spawningLocation",
-                           "verifiedBy",
-                           "verifiedDate",
-                           "modified",
-                           "eventID")
-        VALUES         (   %(occurrenceID)s,
-                           %(taxonID)s,
-                           %(ecotypeID)s,
-                           %(organismQuantityType)s,
-                           %(organismQuantity)s,
-                           %(occurrenceStatus)s,
-                           %(populationTrend)s,
-                           %(recordNumber)s,
-                           %(occurrenceRemarks)s,
-                           %(establishmentMeans)s,
-                           %(establishmentRemarks)s,
-                           %(spawningCondition)s,
-                           %(spawningLocation)s,
-                           %(verifiedBy)s,
-                           %(verifiedDate)s,
-                           %(modified)s,
-                           %(eventID)s)
-        ''',
-        {'occurrenceID': occ_id,
-         'taxonID': txn_id,
-         'ecotypeID': ectp_id,
-         'organismQuantityType': occ_row_list[2],
-         'organismQuantity': occ_row_list[3],
-         'occurrenceStatus': occ_row_list[4],
-         'populationTrend': occ_row_list[5],
-         'recordNumber': occ_row_list[6],
-         'occurrenceRemarks': occ_row_list[7],
-         'establishmentMeans': occ_row_list[8],
-         'establishmentRemarks': occ_row_list[9],
-         'spawningCondition': occ_row_list[10],
-         'spawningLocation': occ_row_list[11],
-         'verifiedBy': occ_row_list[12],
-         'verifiedDate': occ_row_list[13],
-         'modified': datetime.datetime.now(),
-         'eventID': event_id})
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param occ_rows: A list of occurrence rows, see :func:`get_occ_row`.
+    :type occ_rows: list
+    """
+
+    _ins_rows(
+        con, u'nofa."occurrence"', _OCC_COLS, occ_rows, u'nofa_ins_occ')
+
+
+def get_txncvg_row(txn_id, event_id):
+    """
+    Returns a taxon coverage row that is used for inserting
+    taxon coverages.
+
+    :param txn_id: A taxon ID.
+    :type txn_id: int
+    :param event_id: An event ID.
+    :type event_id: uuid.UUID
+
+    :returns: A taxon coverage row.
+    :rtype: dict
+    """
+
+    txncvg_row = {
+        'taxonID': txn_id,
+        'eventID': event_id}
+
+    return txncvg_row
 
 
 def ins_txncvg(con, txn_id, event_id):
@@ -304,17 +1119,23 @@ def ins_txncvg(con, txn_id, event_id):
     :type event_id: uuid.UUID
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
-        '''
-        INSERT INTO     nofa."samplingTaxaRange"(
-                            "taxonID",
-                            "eventID")
-        VALUES         (   %(taxonID)s,
-                           %(eventID)s)
-        ''',
-        {'taxonID': txn_id,
-         'eventID': event_id})
+    ins_txncvgs(con, [get_txncvg_row(txn_id, event_id)])
+
+
+def ins_txncvgs(con, txncvg_rows):
+    """
+    Insert taxon coverages into the database.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param txncvg_rows: A list of taxon coverage rows,
+        see :func:`get_txncvg_row`.
+    :type txncvg_rows: list
+    """
+
+    _ins_rows(
+        con, u'nofa."samplingTaxaRange"', _TXNCVG_COLS, txncvg_rows,
+        u'nofa_ins_txncvg')
 
 
 def chck_locid(con, locid):
@@ -330,8 +1151,9 @@ def chck_locid(con, locid):
     :rtype: bool
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    cur = _exec_stmt(
+        con,
+        u'nofa_chck_locid',
         '''
         SELECT      "locationID"
         FROM        nofa."location"
@@ -349,6 +1171,42 @@ def chck_locid(con, locid):
     return resp
 
 
+def chck_locids(con, locids):
+    """
+    Checks which of the given location IDs are not in the database.
+    All location IDs are checked in one query.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param locids: A list of location IDs, valid *UUID* strings.
+    :type locids: list
+
+    :returns: A list of location IDs that were not found,
+        in the order they were given.
+    :rtype: list
+    """
+
+    if len(locids) == 0:
+        return []
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT      "locationID"
+        FROM        nofa."location"
+        WHERE       "locationID" = ANY(%s::uuid[])
+        ''',
+        (list(locids),))
+
+    fnd_locid_set = set([str(l[0]) for l in cur.fetchall()])
+
+    ms_locid_list = [
+        locid for locid in locids
+        if str(uuid.UUID(locid)) not in fnd_locid_set]
+
+    return ms_locid_list
+
+
 def get_locid_from_nvl(con, nvl):
     """
     Returns a location ID based on the given `Norwegian VatLnr`.
@@ -362,8 +1220,9 @@ def get_locid_from_nvl(con, nvl):
     :rtype: str
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    cur = _exec_stmt(
+        con,
+        u'nofa_get_locid_from_nvl',
         '''
         SELECT      "locationID"
         FROM        nofa."location"
@@ -376,6 +1235,48 @@ def get_locid_from_nvl(con, nvl):
     return locid
 
 
+def get_locids_from_nvls(con, nvls):
+    """
+    Returns location IDs based on the given `Norwegian VatLnr` codes.
+    All codes are resolved in one query.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param nvls: A list of `Norwegian VatLnr` codes.
+    :type nvls: list
+
+    :returns:
+     | A tuple containing:
+     |    - *dict* -- a dictionary, key - `Norwegian VatLnr`,
+     |      value - location ID
+     |    - *list* -- a list of `Norwegian VatLnr` codes that were
+     |      not found, in the order they were given
+    :rtype: tuple
+    """
+
+    if len(nvls) == 0:
+        return ({}, [])
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT      DISTINCT ON ("no_vatn_lnr")
+                    "no_vatn_lnr",
+                    "locationID"
+        FROM        nofa."location"
+        WHERE       "no_vatn_lnr" = ANY(%s)
+        ORDER BY    "no_vatn_lnr", "locationID"
+        ''',
+        (list(nvls),))
+
+    nvl_locid_dict = dict(cur.fetchall())
+
+    ms_nvl_list = [nvl for nvl in nvls if nvl not in nvl_locid_dict]
+
+    return (nvl_locid_dict, ms_nvl_list)
+
+
+@_cached(u'm_dataset')
 def get_dtst_info(con, dtst_id):
     """
     Returns information about a dataset with the given ID.
@@ -417,6 +1318,7 @@ def get_dtst_info(con, dtst_id):
     return (dtst_items, dtst_hdrs)
 
 
+@_cached(u'm_project')
 def get_prj_info(con, prj_id):
     """
     Returns information about a project with the given project name
@@ -459,6 +1361,7 @@ def get_prj_info(con, prj_id):
     return (prj_items, prj_hdrs)
 
 
+@_cached(u'm_reference')
 def get_ref_info(con, ref_id):
     """
     Returns information about a reference with the given reference ID.
@@ -500,6 +1403,7 @@ def get_ref_info(con, ref_id):
     return (ref_items, ref_hdrs)
 
 
+@_cached(u'l_taxon')
 def get_fam_dict(con):
     """
     Returns a defaultdict with family as keys and taxons as values.
@@ -534,6 +1438,7 @@ def get_fam_dict(con):
     return fam_dict
 
 
+@_cached(u'location')
 def get_cntry_code_list(con):
     """
     Returns a list of country codes that is used to populate
@@ -560,6 +1465,7 @@ def get_cntry_code_list(con):
     return cntry_code_list
 
 
+@_cached(u'location')
 def get_cnty_list(con, cntry_code):
     """
     Returns a list of counties that is used to populate
@@ -591,6 +1497,7 @@ def get_cnty_list(con, cntry_code):
     return cnty_list
 
 
+@_cached(u'location')
 def get_muni_list(con, cntry_code, cnty):
     """
     Returns a list of municipalities that is used to populate
@@ -629,6 +1536,60 @@ def get_muni_list(con, cntry_code, cnty):
     return muni_list
 
 
+@_cached(u'location', u'location_admin')
+def get_admin_idx_list(con):
+    """
+    Returns a list of distinct combinations of country, county
+    and municipality that is used to build an administrative index.
+    When materialized view `plugin.location_admin` exists it is read
+    instead of the location table.
+    Ranks keep the order of counties and municipalities
+    given by the database collation.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns:
+     | A list of tuples containing:
+     |    - *str* -- country code
+     |    - *str* -- county
+     |    - *str* -- municipality
+     |    - *int* -- county rank
+     |    - *int* -- municipality rank
+    :rtype: list
+    """
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT      to_regclass('plugin.location_admin') IS NOT NULL
+        ''')
+
+    if cur.fetchone()[0]:
+        admin_tbl = u'plugin.location_admin'
+    else:
+        admin_tbl = u'nofa."location"'
+
+    cur.execute(
+        u'''
+        SELECT      "countryCode",
+                    "county",
+                    "municipality",
+                    dense_rank() OVER (ORDER BY "county") cnty_rank,
+                    dense_rank() OVER (ORDER BY "municipality") muni_rank
+        FROM        (SELECT     DISTINCT
+                                "countryCode",
+                                "county",
+                                "municipality"
+                     FROM       {}) a
+        ORDER BY    "countryCode", cnty_rank, muni_rank
+        '''.format(admin_tbl))
+    admin_idx_list = cur.fetchall()
+
+    return admin_idx_list
+
+
+@_cached(u'm_dataset')
 def get_dtst_list(con):
     """
     Returns a list with information about datasets that is used to populate
@@ -715,6 +1676,7 @@ def split_dtst_str(dtst_str):
     return (id, name)
 
 
+@_cached(u'm_project')
 def get_prj_list(con):
     """
     Returns a list with information about projects that is used to populate
@@ -833,6 +1795,7 @@ def get_prj_id(con, prj_name, prj_org):
     return prj_id
 
 
+@_cached(u'm_reference')
 def get_ref_list(con):
     """
     Returns a list with information about references that is used to populate
@@ -927,6 +1890,48 @@ def split_ref_str(ref_str):
     return (au, ttl, yr, id)
 
 
+@_cached(u'l_taxon', u'l_ecotype')
+def get_txn_idx_list(con):
+    """
+    Returns a list of taxons with their ecotypes that is used to build
+    a taxonomy index.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns:
+     | A list of tuples containing:
+     |    - *int* -- taxon ID
+     |    - *str* -- scientific name
+     |    - *str* -- family
+     |    - *str* -- taxon rank
+     |    - *int* -- ecotype ID, None when the taxon has no ecotype
+     |    - *str* -- ecotype vernacular name, None when the taxon has
+     |      no ecotype
+    :rtype: list
+    """
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT      t."taxonID",
+                    t."scientificName",
+                    t."family",
+                    t."taxonRank",
+                    e."ecotypeID",
+                    e."vernacularName"
+        FROM        nofa."l_taxon" t
+                    LEFT JOIN
+                    nofa."l_ecotype" e ON e."taxonID" = t."taxonID"
+        WHERE       t."scientificName" IS NOT NULL
+        ORDER BY    t."scientificName", e."vernacularName"
+        ''')
+    txn_idx_list = cur.fetchall()
+
+    return txn_idx_list
+
+
+@_cached(u'l_taxon')
 def get_txn_list(con):
     """
     Returns a list of taxons that is used to populate taxon combo box.
@@ -953,6 +1958,7 @@ def get_txn_list(con):
     return txn_list
 
 
+@_cached(u'l_ecotype', u'l_taxon')
 def get_ectp_list(con, txn_name):
     """
     Returns a list of ecotypes that is used to populate ecotype combo box.
@@ -984,6 +1990,7 @@ def get_ectp_list(con, txn_name):
     return ectp_list
 
 
+@_cached(u'l_organismQuantityType')
 def get_oqt_list(con):
     """
     Returns a list of organism quantity types that is used to populate
@@ -1009,6 +2016,7 @@ def get_oqt_list(con):
     return oqt_list
 
 
+@_cached(u'l_occurrenceStatus')
 def get_occstat_list(con):
     """
     Returns a list of occurrence statuses that is used to populate
@@ -1034,6 +2042,7 @@ def get_occstat_list(con):
     return occstat_list
 
 
+@_cached(u'l_populationTrend')
 def get_poptrend_list(con):
     """
     Returns a list of population trends that is used to populate
@@ -1060,6 +2069,7 @@ def get_poptrend_list(con):
     return poptrend_list
 
 
+@_cached(u'l_establishmentMeans')
 def get_estbms_list(con):
     """
     Returns a list of establishment means that is used to populate
@@ -1085,6 +2095,7 @@ def get_estbms_list(con):
     return estbms_list
 
 
+@_cached(u'l_samplingProtocol')
 def get_smpp_list(con):
     """
     Returns a list of sampling protocols that is used to populate
@@ -1110,6 +2121,7 @@ def get_smpp_list(con):
     return smpp_list
 
 
+@_cached(u'l_reliability')
 def get_reliab_list(con):
     """
     Returns a list of reliabilities that is used to populate
@@ -1135,6 +2147,7 @@ def get_reliab_list(con):
     return relia_list
 
 
+@_cached(u'l_sampleSizeUnit')
 def get_smpsu_list(con):
     """
     Returns a list of sample size units that is used to populate
@@ -1160,6 +2173,7 @@ def get_smpsu_list(con):
     return smpsu_list
 
 
+@_cached(u'l_spawningCondition')
 def get_spwnc_list(con):
     """
     Returns a list of spawning conditions that is used to populate
@@ -1185,6 +2199,7 @@ def get_spwnc_list(con):
     return spwnc_list
 
 
+@_cached(u'l_spawningLocation')
 def get_spwnl_list(con):
     """
     Returns a list of spawning locations that is used to populate
@@ -1210,6 +2225,7 @@ def get_spwnl_list(con):
     return spwnl_list
 
 
+@_cached(u'm_dataset')
 def get_inst_list(con):
     """
     Returns a list of institutions that is used to populate
@@ -1236,6 +2252,7 @@ def get_inst_list(con):
     return inst_list
 
 
+@_cached(u'm_dataset')
 def get_acs_list(con):
     """
     Returns a list of access rights that is used to populate
@@ -1335,6 +2352,8 @@ def ins_dtst(con, dtst_list):
          'informationWithheld': dtst_list[8],
          'dataGeneralizations': dtst_list[9]})
 
+    invalidate(u'm_dataset')
+
 
 def ins_prj(con, prj_list):
     """
@@ -1383,11 +2402,14 @@ def ins_prj(con, prj_list):
          'financer': prj_list[7],
          'remarks': prj_list[8]})
 
+    invalidate(u'm_project')
+
     id = cur.fetchone()[0]
 
     return id
 
 
+@_cached(u'l_referenceType')
 def get_reftp_list(con):
     """
     Returns a list of reference types that is used to populate
@@ -1461,94 +2483,250 @@ def ins_ref(con, ref_list):
          'volume': ref_list[7],
          'page': ref_list[8]})
 
+    invalidate(u'm_reference')
+
     id = cur.fetchone()[0]
 
     return id
 
 
-def get_pt_str(x, y):
+def get_ewkb_hex(x, y, srid=25833, multi=False):
+    """
+    Returns a hex-encoded EWKB of a point with the given coordinates.
+    It is built locally so that a geometry can be sent to the database
+    without transforming it there.
+
+    :param x: X coordinate.
+    :type x: float
+    :param y: Y coordinate.
+    :type y: float
+    :param srid: SRID.
+    :type srid: int
+    :param multi: True for a multi point, False for a point.
+    :type multi: bool
+
+    :returns: A hex-encoded EWKB.
+    :rtype: str
+    """
+
+    # little endian, geometry type with SRID flag
+    pt_wkb = struct.pack('<BIdd', 1, 1, float(x), float(y))
+
+    if multi:
+        ewkb = struct.pack('<BII', 1, 4 | 0x20000000, int(srid)) \
+            + struct.pack('<I', 1) \
+            + pt_wkb
+    else:
+        ewkb = struct.pack('<BII', 1, 1 | 0x20000000, int(srid)) \
+            + pt_wkb[5:]
+
+    ewkb_hex = ewkb.encode('hex').upper()
+
+    return ewkb_hex
+
+
+def get_nrst_locid(con, utm33_geom, radius=None):
+    """
+    Returns an ID of the nearest location.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param utm33_geom: A geometry in UTM33 (EPSG: 25833).
+    :type utm33_geom: str
+    :param radius: A radius in meters within which the nearest lake
+        is searched for, :data:`NRST_RADIUS` when None.
+    :type radius: float
+
+    :returns: A location ID. None where there is no lake within
+        the given distance.
+    :rtype: uuid.UUID
+    """
+
+    loc_cand_list = get_nrst_loc_cands(con, utm33_geom, radius, 1)
+
+    try:
+        locid = loc_cand_list[0][0]
+    except IndexError:
+        locid = None
+
+    return locid
+
+
+def get_nrst_loc_cands(con, utm33_geom, radius=None, k=5):
     """
-    Returns a point string with the given coordinates.
+    Returns the nearest locations in the nearest lake.
+    Both lakes and locations are ordered by the KNN operator `<->`
+    so that their spatial indexes are used.
 
-    :param x: X coordinate.
-    :type x: float
-    :param y: Y coordinate.
-    :type y: float
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param utm33_geom: A geometry in UTM33 (EPSG: 25833).
+    :type utm33_geom: str
+    :param radius: A radius in meters within which the nearest lake
+        is searched for, :data:`NRST_RADIUS` when None.
+    :type radius: float
+    :param k: A maximum number of locations.
+    :type k: int
 
-    :returns: A point string.
-    :rtype: str
+    :returns:
+     | A list of tuples ordered by distance, empty when there is no lake
+     | within the given distance, containing:
+     |    - *uuid.UUID* -- a location ID
+     |    - *int* -- a lake ID
+     |    - *float* -- a distance to the location in meters
+    :rtype: list
     """
 
-    pt_str = 'POINT({} {})'.format(x, y)
+    if radius is None:
+        radius = NRST_RADIUS
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        WITH        lake AS (
+                        SELECT      id
+                        FROM        nofa.lake
+                        WHERE       ST_DWithin(%(geom)s, geom, %(radius)s)
+                        ORDER BY    geom <-> %(geom)s
+                        LIMIT       1)
+        SELECT      loc."locationID",
+                    lake.id,
+                    ST_Distance(%(geom)s, loc.geom) dist
+        FROM        lake
+                    JOIN nofa."location" loc
+                        ON loc."waterBodyID" = lake.id
+        ORDER BY    loc.geom <-> %(geom)s
+        LIMIT       %(k)s
+        ''',
+        {'geom': utm33_geom, 'radius': radius, 'k': k})
+
+    loc_cand_list = cur.fetchall()
 
-    return pt_str
+    return loc_cand_list
 
 
-def get_utm33_geom(con, geom_str, srid):
+def get_nrst_locids(con, utm33_geoms, radius=None):
     """
-    Returns a geometry in UTM33 (EPSG: 25833).
+    Returns IDs of the nearest locations of the given points.
+    For every point the nearest lake within the given radius is found
+    and then the nearest location in that lake.
+    All points are resolved in one query.
 
     :param con: A connection.
     :type con: psycopg2.connection
-    :param geom_str: A geometry string.
-    :type geom_str: str
-    :param srid: SRID.
-    :type srid: int
+    :param utm33_geoms: A list of geometries in UTM33 (EPSG: 25833),
+        see :func:`get_ewkb_hex`.
+    :type utm33_geoms: list
+    :param radius: A radius in meters within which the nearest lake
+        is searched for, :data:`NRST_RADIUS` when None.
+    :type radius: float
 
-    :returns: A geometry in UTM33 (EPSG: 25833).
-    :rtype: str
+    :returns:
+     | A list of tuples, one for every point in the given order,
+     | containing:
+     |    - *uuid.UUID* -- a location ID, None when there is no lake
+     |      within the given distance
+     |    - *int* -- a lake ID, None when there is no lake
+     |      within the given distance
+     |    - *float* -- a distance to the location in meters
+    :rtype: list
     """
 
+    if len(utm33_geoms) == 0:
+        return []
+
+    if radius is None:
+        radius = NRST_RADIUS
+
     cur = _get_db_cur(con)
     cur.execute(
         '''
-        SELECT      ST_Transform(
-                        ST_GeomFromText(%s, %s),
-                        25833)
+        SELECT      loc."locationID",
+                    lake.id,
+                    loc.dist
+        FROM        unnest(%(geoms)s::geometry[])
+                        WITH ORDINALITY utm33(geom, ord)
+                    LEFT JOIN LATERAL
+                    (SELECT     l.id
+                     FROM       nofa.lake l
+                     WHERE      ST_DWithin(utm33.geom, l.geom, %(radius)s)
+                     ORDER BY   l.geom <-> utm33.geom
+                     LIMIT      1) lake ON TRUE
+                    LEFT JOIN LATERAL
+                    (SELECT     lo."locationID",
+                                ST_Distance(utm33.geom, lo.geom) dist
+                     FROM       nofa."location" lo
+                     WHERE      lo."waterBodyID" = lake.id
+                     ORDER BY   lo.geom <-> utm33.geom
+                     LIMIT      1) loc ON TRUE
+        ORDER BY    utm33.ord
         ''',
-        (geom_str, srid,))
+        {'geoms': list(utm33_geoms),
+         'radius': radius})
 
-    utm33_geom = cur.fetchone()[0]
+    nrst_locid_list = cur.fetchall()
 
-    return utm33_geom
+    return nrst_locid_list
 
 
-def get_nrst_locid(con, utm33_geom):
+def get_tile_lake_loc_lists(con, xmin, ymin, xmax, ymax):
     """
-    Returns an ID of the nearest location.
+    Returns lakes whose bounding boxes intersect the given extent
+    and all locations in these lakes.
+    It is used to load a tile of a local location index.
 
     :param con: A connection.
     :type con: psycopg2.connection
-    :param utm33_geom: A geometry in UTM33 (EPSG: 25833).
-    :type utm33_geom: str
+    :param xmin: Minimum X coordinate in UTM33 (EPSG: 25833).
+    :type xmin: float
+    :param ymin: Minimum Y coordinate in UTM33 (EPSG: 25833).
+    :type ymin: float
+    :param xmax: Maximum X coordinate in UTM33 (EPSG: 25833).
+    :type xmax: float
+    :param ymax: Maximum Y coordinate in UTM33 (EPSG: 25833).
+    :type ymax: float
 
-    :returns: A location ID. None where there is no lake within
-        the given distance.
-    :rtype: uuid.UUID
+    :returns:
+     | A tuple containing:
+     |    - *list* -- a list of tuples containing lake ID
+     |      and WKT geometry
+     |    - *list* -- a list of tuples containing location ID, lake ID,
+     |      X coordinate and Y coordinate
+    :rtype: tuple
     """
 
+    ext = {'xmin': xmin, 'ymin': ymin, 'xmax': xmax, 'ymax': ymax}
+
     cur = _get_db_cur(con)
     cur.execute(
         '''
-        SELECT      "locationID"
+        SELECT      id,
+                    ST_AsText(geom)
+        FROM        nofa.lake
+        WHERE       geom && ST_MakeEnvelope(
+                        %(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 25833)
+        ''',
+        ext)
+
+    lake_list = cur.fetchall()
+
+    cur.execute(
+        '''
+        SELECT      loc."locationID",
+                    loc."waterBodyID",
+                    ST_X(ST_Centroid(loc.geom)),
+                    ST_Y(ST_Centroid(loc.geom))
         FROM        nofa."location" loc
-        WHERE "waterBodyID" = (
-        SELECT id
-        FROM nofa.lake lake
-        WHERE ST_DWithin(%s, lake.geom, 100.0)
-        ORDER BY    ST_Distance(%s, lake.geom)
-        LIMIT       1)
-        ORDER BY    ST_Distance(%s, loc.geom)
-        LIMIT 1;
+                    JOIN nofa.lake lake
+                        ON loc."waterBodyID" = lake.id
+        WHERE       lake.geom && ST_MakeEnvelope(
+                        %(xmin)s, %(ymin)s, %(xmax)s, %(ymax)s, 25833)
         ''',
-        (utm33_geom,utm33_geom,utm33_geom,))
+        ext)
 
-    try:
-        locid = cur.fetchone()[0]
-    except:
-        locid = None
+    loc_list = cur.fetchall()
 
-    return locid
+    return (lake_list, loc_list)
 
 
 def ins_new_loc(con, locid, utm33_geom, verb_loc):
@@ -1583,23 +2761,7 @@ def ins_new_loc(con, locid, utm33_geom, verb_loc):
          'geom': utm33_geom,
          'verbatimLocality': verb_loc})
 
-
-def get_mpt_str(x, y):
-    """
-    Returns a multi point string with the given coordinates.
-
-    :param x: X coordinate.
-    :type x: float
-    :param y: Y coordinate.
-    :type y: float
-
-    :returns: A multi point string.
-    :rtype: str
-    """
-
-    mpt_str = 'MULTIPOINT({} {})'.format(x, y)
-
-    return mpt_str
+    invalidate(u'location')
 
 
 def get_loc_by_fltrs(con, wb, cntry_code, cnty, muni):
@@ -1650,6 +2812,42 @@ def get_loc_by_fltrs(con, wb, cntry_code, cnty, muni):
     return locid_list
 
 
+def get_occ_log_row(occ_id, event_id, dtst_id, prj_id, ref_id, loc_id, usr):
+    """
+    Returns an occurrence log row that is used for inserting
+    occurrence logs.
+
+    :param occ_id: An occurrence ID.
+    :type occ_id: uuid.UUID
+    :param event_id: An event ID.
+    :type event_id: uuid.UUID
+    :param dtst_id: A dataset ID.
+    :type dtst_id: str
+    :param prj_id: A project ID.
+    :type prj_id: str
+    :param ref_id: A reference ID.
+    :type ref_id: int
+    :param loc_id: A location ID.
+    :type loc_id: uuid.UUID
+    :param usr: An username.
+    :type usr: str
+
+    :returns: An occurrence log row.
+    :rtype: dict
+    """
+
+    occ_log_row = {
+        'occurrence_id': occ_id,
+        'event_id': event_id,
+        'dataset_id': dtst_id,
+        'project_id': prj_id,
+        'reference_id': ref_id,
+        'location_id': loc_id,
+        'username': usr}
+
+    return occ_log_row
+
+
 def ins_occ_log(con, occ_id, event_id, dtst_id, prj_id, ref_id, loc_id, usr):
     """
     Insert an occurrence log to the database.
@@ -1672,32 +2870,26 @@ def ins_occ_log(con, occ_id, event_id, dtst_id, prj_id, ref_id, loc_id, usr):
     :type usr: str
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
-        '''
-        INSERT INTO     plugin.occurrence_log (
-                            occurrence_id,
-                            event_id,
-                            dataset_id,
-                            project_id,
-                            reference_id,
-                            location_id,
-                            username)
-        VALUES          (   %(occurrence_id)s,
-                            %(event_id)s,
-                            %(dataset_id)s,
-                            %(project_id)s,
-                            %(reference_id)s,
-                            %(location_id)s,
-                            %(username)s)
-        ''',
-        {'occurrence_id': occ_id,
-         'event_id': event_id,
-         'dataset_id': dtst_id,
-         'project_id': prj_id,
-         'reference_id': ref_id,
-         'location_id': loc_id,
-         'username': usr})
+    ins_occ_logs(
+        con,
+        [get_occ_log_row(
+            occ_id, event_id, dtst_id, prj_id, ref_id, loc_id, usr)])
+
+
+def ins_occ_logs(con, occ_log_rows):
+    """
+    Insert occurrence logs to the database.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param occ_log_rows: A list of occurrence log rows,
+        see :func:`get_occ_log_row`.
+    :type occ_log_rows: list
+    """
+
+    _ins_rows(
+        con, u'plugin.occurrence_log', _OCC_LOG_COLS, occ_log_rows,
+        u'nofa_ins_occ_log')
 
 
 def ins_loc_log(con, id, name, usr):
@@ -1730,6 +2922,38 @@ def ins_loc_log(con, id, name, usr):
          'username': usr})
 
 
+def get_event_log_row(loc_id, event_id, dtst_id, prj_id, ref_id, usr):
+    """
+    Returns an event log row that is used for inserting event logs.
+
+    :param loc_id: A location ID.
+    :type loc_id: str
+    :param event_id: An event ID.
+    :type event_id: uuid.UUID
+    :param dtst_id: A dataset ID.
+    :type dtst_id: str
+    :param prj_id: A project ID.
+    :type prj_id: str
+    :param ref_id: A reference ID.
+    :type ref_id: int
+    :param usr: An username.
+    :type usr: str
+
+    :returns: An event log row.
+    :rtype: dict
+    """
+
+    event_log_row = {
+        'event_id': event_id,
+        'location_id': loc_id,
+        'dataset_id': dtst_id,
+        'project_id': prj_id,
+        'reference_id': ref_id,
+        'username': usr}
+
+    return event_log_row
+
+
 def ins_event_log(con, loc_id, event_id, dtst_id, prj_id, ref_id, usr):
     """
     Insert an event log to the database.
@@ -1750,29 +2974,25 @@ def ins_event_log(con, loc_id, event_id, dtst_id, prj_id, ref_id, usr):
     :type usr: str
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
-        '''
-        INSERT INTO     plugin.event_log(
-                            event_id,
-                            location_id,
-                            dataset_id,
-                            project_id,
-                            reference_id,
-                            username)
-        VALUES          (   %(event_id)s,
-                            %(location_id)s,
-                            %(dataset_id)s,
-                            %(project_id)s,
-                            %(reference_id)s,
-                            %(username)s)
-        ''',
-        {'event_id': event_id,
-         'location_id': loc_id,
-         'dataset_id': dtst_id,
-         'project_id': prj_id,
-         'reference_id': ref_id,
-         'username': usr})
+    ins_event_logs(
+        con,
+        [get_event_log_row(loc_id, event_id, dtst_id, prj_id, ref_id, usr)])
+
+
+def ins_event_logs(con, event_log_rows):
+    """
+    Insert event logs to the database.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param event_log_rows: A list of event log rows,
+        see :func:`get_event_log_row`.
+    :type event_log_rows: list
+    """
+
+    _ins_rows(
+        con, u'plugin.event_log', _EVENT_LOG_COLS, event_log_rows,
+        u'nofa_ins_event_log')
 
 
 def ins_dtst_log(con, id, usr):
@@ -1850,13 +3070,147 @@ def ins_ref_log(con, id, usr):
          'username': usr})
 
 
+def _get_hist_list(con, sql, params, page_size, key):
+    """
+    Executes the given history query and returns its result.
+    The query has to order rows by insert timestamp and an ID in the first
+    column and use `key_ts`, `key_id` and `page_size` parameters
+    for keyset pagination. The key of a row is a tuple of its insert
+    timestamp and the ID, so deep pages cost as much as the first one.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param sql: A query.
+    :type sql: str
+    :param params: A dictionary of filter parameters.
+    :type params: dict
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page.
+    :type key: tuple
+
+    :returns:
+     | A tuple containing:
+     |    - *list* -- a list of rows
+     |    - *list* -- a list of headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
+    :rtype: tuple
+    """
+
+    qry_params = dict(params)
+    qry_params[u'key_ts'] = None
+    qry_params[u'key_id'] = None
+    qry_params[u'page_size'] = None
+
+    if key is None:
+        hist_cnt = _get_est_cnt(con, sql, qry_params)
+    else:
+        hist_cnt = None
+        qry_params[u'key_ts'], qry_params[u'key_id'] = key
+
+    # no limit without a page size
+    qry_params[u'page_size'] = page_size
+
+    cur = _get_db_cur(con)
+    cur.execute(sql, qry_params)
+
+    hist_rows = cur.fetchall()
+    hist_hdrs = [d[0] for d in cur.description]
+
+    if page_size is not None and len(hist_rows) == page_size:
+        last_row = hist_rows[-1]
+        hist_key = (
+            last_row[hist_hdrs.index(u'insert_timestamp')], last_row[0])
+    else:
+        hist_key = None
+
+    return (hist_rows, hist_hdrs, hist_key, hist_cnt)
+
+
+def _get_hist_fltr_params(
+        usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+    """
+    Returns parameters of history filters.
+    Dates are turned into half-open timestamp ranges and the username
+    is compared for equality unless it contains `%`, so that filters
+    can use indexes.
+
+    :param usr: An username or a `LIKE` pattern, None for all users.
+    :type usr: str
+    :param ins_dt_strt: Insert date start.
+    :type ins_dt_strt: datetime.date
+    :param ins_dt_end: Insert date end, inclusive.
+    :type ins_dt_end: datetime.date
+    :param upd_dt_strt: Update date start.
+    :type upd_dt_strt: datetime.date
+    :param upd_dt_end: Update date end, inclusive.
+    :type upd_dt_end: datetime.date
+
+    :returns: A dictionary of filter parameters.
+    :rtype: dict
+    """
+
+    day = datetime.timedelta(days=1)
+
+    if usr is not None and u'%' in usr:
+        usr_ptn = usr
+        usr = None
+    else:
+        usr_ptn = None
+
+    fltr_params = {
+        u'usr': usr,
+        u'usr_ptn': usr_ptn,
+        u'ins_ts_strt': ins_dt_strt,
+        u'ins_ts_end': ins_dt_end + day,
+        u'upd_ts_strt': upd_dt_strt,
+        u'upd_ts_end': upd_dt_end + day}
+
+    return fltr_params
+
+
+def _get_est_cnt(con, sql, params):
+    """
+    Returns a number of rows of the given query estimated by the planner.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    :param sql: A query.
+    :type sql: str
+    :param params: A dictionary of parameters.
+    :type params: dict
+
+    :returns: An estimated number of rows.
+    :rtype: int
+    """
+
+    cur = _get_db_cur(con)
+    cur.execute(u'EXPLAIN (FORMAT JSON) ' + sql, params)
+
+    plan = cur.fetchone()[0]
+
+    if isinstance(plan, basestring):
+        plan = json.loads(plan)
+
+    est_cnt = int(plan[0][u'Plan'][u'Plan Rows'])
+
+    return est_cnt
+
+
 def get_hist_occ_list(
-        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end,
+        page_size=None, key=None):
     """
     Returns a list of history occurrences that is used to populate
     occurrence history table.
     Also returns a list of history occurrences headers.
     Data are filtered based on input values.
+    Without a page size all rows are returned,
+    otherwise one page that starts after the given key.
 
     :param con: A connection.
     :type con: psycopg2.connection
@@ -1870,16 +3224,25 @@ def get_hist_occ_list(
     :type upd_dt_strt: datetime.date
     :param upd_dt_end: Update date end.
     :type upd_dt_end: datetime.date
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page, see :func:`_get_hist_list`.
+    :type key: tuple
 
     :returns:
      | A tuple containing:
      |    - *list* -- a list of history occurrences
-     |     - *list* -- a list of history occurrences headers
+     |    - *list* -- a list of history occurrences headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
     :rtype: tuple
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    return _get_hist_list(
+        con,
         '''
         SELECT      occurrence_id,
                     event_id,
@@ -1891,34 +3254,41 @@ def get_hist_occ_list(
                     insert_timestamp,
                     update_timestamp
         FROM        plugin.occurrence_log
-        WHERE       (%(username)s IS NULL OR "username" LIKE %(username)s)
+        WHERE       (%(usr)s IS NULL OR username = %(usr)s)
                     AND
-                    date(insert_timestamp)
-                        BETWEEN %(ins_dt_strt)s AND %(ins_dt_end)s
+                    (%(usr_ptn)s IS NULL OR username LIKE %(usr_ptn)s)
                     AND
-                    date(update_timestamp)
-                        BETWEEN %(upd_dt_strt)s AND %(upd_dt_end)s
+                    insert_timestamp >= %(ins_ts_strt)s
+                    AND
+                    insert_timestamp < %(ins_ts_end)s
+                    AND
+                    update_timestamp >= %(upd_ts_strt)s
+                    AND
+                    update_timestamp < %(upd_ts_end)s
+                    AND
+                    (%(key_ts)s IS NULL
+                     OR
+                     (insert_timestamp, occurrence_id)
+                        > (%(key_ts)s, %(key_id)s))
+        ORDER BY    insert_timestamp, occurrence_id
+        LIMIT       %(page_size)s
         ''',
-        {'username': usr,
-         'ins_dt_strt': ins_dt_strt,
-         'ins_dt_end': ins_dt_end,
-         'upd_dt_strt': upd_dt_strt,
-         'upd_dt_end': upd_dt_end})
-
-    hist_occ_list = cur.fetchall()
-
-    hist_occ_hdrs = [d[0] for d in cur.description]
-
-    return (hist_occ_list, hist_occ_hdrs)
+        _get_hist_fltr_params(
+            usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end),
+        page_size,
+        key)
 
 
 def get_hist_loc_list(
-        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end,
+        page_size=None, key=None):
     """
     Returns a list of history locations that is used to populate
     location history table.
     Also returns a list of history locations headers.
     Data are filtered based on input values.
+    Without a page size all rows are returned,
+    otherwise one page that starts after the given key.
 
     :param con: A connection.
     :type con: psycopg2.connection
@@ -1932,16 +3302,25 @@ def get_hist_loc_list(
     :type upd_dt_strt: datetime.date
     :param upd_dt_end: Update date end.
     :type upd_dt_end: datetime.date
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page, see :func:`_get_hist_list`.
+    :type key: tuple
 
     :returns:
      | A tuple containing:
      |    - *list* -- a list of history locations
      |    - *list* -- a list of history locations headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
     :rtype: tuple
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    return _get_hist_list(
+        con,
         '''
         SELECT      location_id,
                     location_name,
@@ -1949,34 +3328,41 @@ def get_hist_loc_list(
                     insert_timestamp,
                     update_timestamp
         FROM        plugin.location_log
-        WHERE       (%(username)s IS NULL OR "username" LIKE %(username)s)
+        WHERE       (%(usr)s IS NULL OR username = %(usr)s)
+                    AND
+                    (%(usr_ptn)s IS NULL OR username LIKE %(usr_ptn)s)
+                    AND
+                    insert_timestamp >= %(ins_ts_strt)s
+                    AND
+                    insert_timestamp < %(ins_ts_end)s
                     AND
-                    date(insert_timestamp)
-                        BETWEEN %(ins_dt_strt)s AND %(ins_dt_end)s
+                    update_timestamp >= %(upd_ts_strt)s
                     AND
-                    date(update_timestamp)
-                        BETWEEN %(upd_dt_strt)s AND %(upd_dt_end)s
+                    update_timestamp < %(upd_ts_end)s
+                    AND
+                    (%(key_ts)s IS NULL
+                     OR
+                     (insert_timestamp, location_id)
+                        > (%(key_ts)s, %(key_id)s))
+        ORDER BY    insert_timestamp, location_id
+        LIMIT       %(page_size)s
         ''',
-        {'username': usr,
-         'ins_dt_strt': ins_dt_strt,
-         'ins_dt_end': ins_dt_end,
-         'upd_dt_strt': upd_dt_strt,
-         'upd_dt_end': upd_dt_end})
-
-    hist_loc_list = cur.fetchall()
-
-    hist_loc_hdrs = [d[0] for d in cur.description]
-
-    return (hist_loc_list, hist_loc_hdrs)
+        _get_hist_fltr_params(
+            usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end),
+        page_size,
+        key)
 
 
 def get_hist_event_list(
-        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end,
+        page_size=None, key=None):
     """
     Returns a list of history events that is used to populate
     event history table.
     Also returns a list of history events headers.
     Data are filtered based on input values.
+    Without a page size all rows are returned,
+    otherwise one page that starts after the given key.
 
     :param con: A connection.
     :type con: psycopg2.connection
@@ -1990,16 +3376,25 @@ def get_hist_event_list(
     :type upd_dt_strt: datetime.date
     :param upd_dt_end: Update date end.
     :type upd_dt_end: datetime.date
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page, see :func:`_get_hist_list`.
+    :type key: tuple
 
     :returns:
      | A tuple containing:
      |    - *list* -- a list of history events
      |    - *list* -- a list of history events headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
     :rtype: tuple
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    return _get_hist_list(
+        con,
         '''
         SELECT      event_id,
                     location_id,
@@ -2010,34 +3405,41 @@ def get_hist_event_list(
                     insert_timestamp,
                     update_timestamp
         FROM        plugin.event_log
-        WHERE       (%(username)s IS NULL OR "username" LIKE %(username)s)
+        WHERE       (%(usr)s IS NULL OR username = %(usr)s)
+                    AND
+                    (%(usr_ptn)s IS NULL OR username LIKE %(usr_ptn)s)
+                    AND
+                    insert_timestamp >= %(ins_ts_strt)s
                     AND
-                    date(insert_timestamp)
-                        BETWEEN %(ins_dt_strt)s AND %(ins_dt_end)s
+                    insert_timestamp < %(ins_ts_end)s
                     AND
-                    date(update_timestamp)
-                        BETWEEN %(upd_dt_strt)s AND %(upd_dt_end)s
+                    update_timestamp >= %(upd_ts_strt)s
+                    AND
+                    update_timestamp < %(upd_ts_end)s
+                    AND
+                    (%(key_ts)s IS NULL
+                     OR
+                     (insert_timestamp, event_id)
+                        > (%(key_ts)s, %(key_id)s))
+        ORDER BY    insert_timestamp, event_id
+        LIMIT       %(page_size)s
         ''',
-        {'username': usr,
-         'ins_dt_strt': ins_dt_strt,
-         'ins_dt_end': ins_dt_end,
-         'upd_dt_strt': upd_dt_strt,
-         'upd_dt_end': upd_dt_end})
-
-    hist_event_list = cur.fetchall()
-
-    hist_event_hdrs = [d[0] for d in cur.description]
-
-    return (hist_event_list, hist_event_hdrs)
+        _get_hist_fltr_params(
+            usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end),
+        page_size,
+        key)
 
 
 def get_hist_dtst_list(
-        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end,
+        page_size=None, key=None):
     """
     Returns a list of history datasets that is used to populate
     dataset history table.
     Also returns a list of history datasets headers.
     Data are filtered based on input values.
+    Without a page size all rows are returned,
+    otherwise one page that starts after the given key.
 
     :param con: A connection.
     :type con: psycopg2.connection
@@ -2051,50 +3453,66 @@ def get_hist_dtst_list(
     :type upd_dt_strt: datetime.date
     :param upd_dt_end: Update date end.
     :type upd_dt_end: datetime.date
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page, see :func:`_get_hist_list`.
+    :type key: tuple
 
     :returns:
      | A tuple containing:
      |    - *list* -- a list of history datasets
      |    - *list* -- a list of history datasets headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
     :rtype: tuple
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    return _get_hist_list(
+        con,
         '''
         SELECT      dataset_id,
                     username,
                     insert_timestamp,
                     update_timestamp
         FROM        plugin.dataset_log
-        WHERE       (%(username)s IS NULL OR "username" LIKE %(username)s)
+        WHERE       (%(usr)s IS NULL OR username = %(usr)s)
+                    AND
+                    (%(usr_ptn)s IS NULL OR username LIKE %(usr_ptn)s)
                     AND
-                    date(insert_timestamp)
-                        BETWEEN %(ins_dt_strt)s AND %(ins_dt_end)s
+                    insert_timestamp >= %(ins_ts_strt)s
                     AND
-                    date(update_timestamp)
-                        BETWEEN %(upd_dt_strt)s AND %(upd_dt_end)s
+                    insert_timestamp < %(ins_ts_end)s
+                    AND
+                    update_timestamp >= %(upd_ts_strt)s
+                    AND
+                    update_timestamp < %(upd_ts_end)s
+                    AND
+                    (%(key_ts)s IS NULL
+                     OR
+                     (insert_timestamp, dataset_id)
+                        > (%(key_ts)s, %(key_id)s))
+        ORDER BY    insert_timestamp, dataset_id
+        LIMIT       %(page_size)s
         ''',
-        {'username': usr,
-         'ins_dt_strt': ins_dt_strt,
-         'ins_dt_end': ins_dt_end,
-         'upd_dt_strt': upd_dt_strt,
-         'upd_dt_end': upd_dt_end})
-
-    hist_dtst_list = cur.fetchall()
-
-    hist_dtst_hdrs = [d[0] for d in cur.description]
-
-    return (hist_dtst_list, hist_dtst_hdrs)
+        _get_hist_fltr_params(
+            usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end),
+        page_size,
+        key)
 
 
 def get_hist_prj_list(
-        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end,
+        page_size=None, key=None):
     """
     Returns a list of history projects that is used to populate
     project history table.
     Also returns a list of history projects headers.
     Data are filtered based on input values.
+    Without a page size all rows are returned,
+    otherwise one page that starts after the given key.
 
     :param con: A connection.
     :type con: psycopg2.connection
@@ -2108,50 +3526,66 @@ def get_hist_prj_list(
     :type upd_dt_strt: datetime.date
     :param upd_dt_end: Update date end.
     :type upd_dt_end: datetime.date
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page, see :func:`_get_hist_list`.
+    :type key: tuple
 
     :returns:
      | A tuple containing:
      |    - *list* -- a list of history projects
      |    - *list* -- a list of history projects headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
     :rtype: tuple
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    return _get_hist_list(
+        con,
         '''
         SELECT      project_id,
                     username,
                     insert_timestamp,
                     update_timestamp
         FROM        plugin.project_log
-        WHERE       (%(username)s IS NULL OR "username" LIKE %(username)s)
+        WHERE       (%(usr)s IS NULL OR username = %(usr)s)
+                    AND
+                    (%(usr_ptn)s IS NULL OR username LIKE %(usr_ptn)s)
+                    AND
+                    insert_timestamp >= %(ins_ts_strt)s
+                    AND
+                    insert_timestamp < %(ins_ts_end)s
+                    AND
+                    update_timestamp >= %(upd_ts_strt)s
                     AND
-                    date(insert_timestamp)
-                        BETWEEN %(ins_dt_strt)s AND %(ins_dt_end)s
+                    update_timestamp < %(upd_ts_end)s
                     AND
-                    date(update_timestamp)
-                        BETWEEN %(upd_dt_strt)s AND %(upd_dt_end)s
+                    (%(key_ts)s IS NULL
+                     OR
+                     (insert_timestamp, project_id)
+                        > (%(key_ts)s, %(key_id)s))
+        ORDER BY    insert_timestamp, project_id
+        LIMIT       %(page_size)s
         ''',
-        {'username': usr,
-         'ins_dt_strt': ins_dt_strt,
-         'ins_dt_end': ins_dt_end,
-         'upd_dt_strt': upd_dt_strt,
-         'upd_dt_end': upd_dt_end})
-
-    hist_prj_list = cur.fetchall()
-
-    hist_prj_hdrs = [d[0] for d in cur.description]
-
-    return (hist_prj_list, hist_prj_hdrs)
+        _get_hist_fltr_params(
+            usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end),
+        page_size,
+        key)
 
 
 def get_hist_ref_list(
-        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end):
+        con, usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end,
+        page_size=None, key=None):
     """
     Returns a list of history references that is used to populate
     reference history table.
     Also returns a list of history references headers.
     Data are filtered based on input values.
+    Without a page size all rows are returned,
+    otherwise one page that starts after the given key.
 
     :param con: A connection.
     :type con: psycopg2.connection
@@ -2165,43 +3599,57 @@ def get_hist_ref_list(
     :type upd_dt_strt: datetime.date
     :param upd_dt_end: Update date end.
     :type upd_dt_end: datetime.date
+    :param page_size: A page size, None for all rows.
+    :type page_size: int
+    :param key: A key of the last row of the previous page,
+        None for the first page, see :func:`_get_hist_list`.
+    :type key: tuple
 
     :returns:
      | A tuple containing:
      |    - *list* -- a list of history references
      |    - *list* -- a list of history references headers
+     |    - *tuple* -- a key of the last row, None when there are
+     |      no more pages
+     |    - *int* -- an estimated number of all rows, None for pages
+     |      after the first one
     :rtype: tuple
     """
 
-    cur = _get_db_cur(con)
-    cur.execute(
+    return _get_hist_list(
+        con,
         '''
         SELECT      reference_id,
                     username,
                     insert_timestamp,
                     update_timestamp
         FROM        plugin.reference_log
-        WHERE       (%(username)s IS NULL OR "username" LIKE %(username)s)
+        WHERE       (%(usr)s IS NULL OR username = %(usr)s)
+                    AND
+                    (%(usr_ptn)s IS NULL OR username LIKE %(usr_ptn)s)
+                    AND
+                    insert_timestamp >= %(ins_ts_strt)s
+                    AND
+                    insert_timestamp < %(ins_ts_end)s
                     AND
-                    date(insert_timestamp)
-                        BETWEEN %(ins_dt_strt)s AND %(ins_dt_end)s
+                    update_timestamp >= %(upd_ts_strt)s
                     AND
-                    date(update_timestamp)
-                        BETWEEN %(upd_dt_strt)s AND %(upd_dt_end)s
+                    update_timestamp < %(upd_ts_end)s
+                    AND
+                    (%(key_ts)s IS NULL
+                     OR
+                     (insert_timestamp, reference_id)
+                        > (%(key_ts)s, %(key_id)s))
+        ORDER BY    insert_timestamp, reference_id
+        LIMIT       %(page_size)s
         ''',
-        {'username': usr,
-         'ins_dt_strt': ins_dt_strt,
-         'ins_dt_end': ins_dt_end,
-         'upd_dt_strt': upd_dt_strt,
-         'upd_dt_end': upd_dt_end})
-
-    hist_ref_list = cur.fetchall()
-
-    hist_ref_hdrs = [d[0] for d in cur.description]
-
-    return (hist_ref_list, hist_ref_hdrs)
+        _get_hist_fltr_params(
+            usr, ins_dt_strt, ins_dt_end, upd_dt_strt, upd_dt_end),
+        page_size,
+        key)
 
 
+@_cached(u'pg_user')
 def get_usr_list(con):
     """
     Returns a list of users whose accounts are active.
@@ -2230,6 +3678,7 @@ def get_usr_list(con):
     return usr_list
 
 
+@_cached(u'columns')
 def get_col_def_val(con, schema, tbl, col):
     """
     Returns a column default value for the given table in the given schema.
@@ -2266,3 +3715,170 @@ def get_col_def_val(con, schema, tbl, col):
     col_def_val = cur.fetchone()[0]
 
     return col_def_val
+
+
+def load_lkp_lists(con):
+    """
+    Loads lookup lists, metadata lists, the taxonomy index list
+    and occurrence column defaults in one query and stores them
+    in the cache, so that the functions returning them
+    do not query the database until the cache expires.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+    """
+
+    cur = _get_db_cur(con)
+    cur.execute(
+        '''
+        SELECT  json_build_object(
+                    'oqt',
+                    (SELECT     json_agg(
+                                    "organismQuantityType"
+                                    ORDER BY "organismQuantityType")
+                     FROM       nofa."l_organismQuantityType"),
+                    'occstat',
+                    (SELECT     json_agg(
+                                    "occurrenceStatus"
+                                    ORDER BY "occurrenceStatus")
+                     FROM       nofa."l_occurrenceStatus"),
+                    'poptrend',
+                    (SELECT     json_agg(
+                                    "populationTrend"
+                                    ORDER BY "populationTrend")
+                     FROM       nofa."l_populationTrend"
+                     WHERE      "populationTrend" IS NOT NULL),
+                    'estbms',
+                    (SELECT     json_agg(
+                                    "establishmentMeans"
+                                    ORDER BY "establishmentMeans")
+                     FROM       nofa."l_establishmentMeans"),
+                    'smpp',
+                    (SELECT     json_agg(
+                                    "samplingProtocol"
+                                    ORDER BY "samplingProtocol")
+                     FROM       nofa."l_samplingProtocol"),
+                    'reliab',
+                    (SELECT     json_agg(
+                                    "reliability"
+                                    ORDER BY "reliability")
+                     FROM       nofa."l_reliability"),
+                    'smpsu',
+                    (SELECT     json_agg(
+                                    "sampleSizeUnit"
+                                    ORDER BY "sampleSizeUnit")
+                     FROM       nofa."l_sampleSizeUnit"),
+                    'spwnc',
+                    (SELECT     json_agg(
+                                    "spawningCondition"
+                                    ORDER BY "spawningCondition")
+                     FROM       nofa."l_spawningCondition"),
+                    'spwnl',
+                    (SELECT     json_agg(
+                                    "spawningLocation"
+                                    ORDER BY "spawningLocation")
+                     FROM       nofa."l_spawningLocation"),
+                    'reftp',
+                    (SELECT     json_agg(
+                                    "referenceType"
+                                    ORDER BY "referenceType")
+                     FROM       nofa."l_referenceType"),
+                    'inst',
+                    (SELECT     json_agg(
+                                    DISTINCT "institutionCode"
+                                    ORDER BY "institutionCode")
+                     FROM       nofa."m_dataset"),
+                    'acs',
+                    (SELECT     json_agg(
+                                    DISTINCT "accessRights"
+                                    ORDER BY "accessRights")
+                     FROM       nofa."m_dataset"),
+                    'dtst',
+                    (SELECT     json_agg(
+                                    json_build_array(
+                                        "datasetID",
+                                        "datasetName")
+                                    ORDER BY "datasetID", "datasetName")
+                     FROM       nofa."m_dataset"),
+                    'prj',
+                    (SELECT     json_agg(
+                                    json_build_array(
+                                        "projectName",
+                                        "organisation")
+                                    ORDER BY "projectName", "organisation")
+                     FROM       nofa."m_project"),
+                    'ref',
+                    (SELECT     json_agg(
+                                    json_build_array(
+                                        "referenceID",
+                                        "author",
+                                        "titel",
+                                        "year")
+                                    ORDER BY "author", "titel")
+                     FROM       nofa."m_reference"),
+                    'txn_idx',
+                    (SELECT     json_agg(
+                                    json_build_array(
+                                        t."taxonID",
+                                        t."scientificName",
+                                        t."family",
+                                        t."taxonRank",
+                                        e."ecotypeID",
+                                        e."vernacularName")
+                                    ORDER BY
+                                        t."scientificName",
+                                        e."vernacularName")
+                     FROM       nofa."l_taxon" t
+                                LEFT JOIN
+                                nofa."l_ecotype" e
+                                    ON e."taxonID" = t."taxonID"
+                     WHERE      t."scientificName" IS NOT NULL),
+                    'occ_col_def',
+                    (SELECT     json_object_agg(
+                                    column_name,
+                                    column_default)
+                     FROM       information_schema.columns
+                     WHERE      table_schema = 'nofa'
+                                AND
+                                table_name = 'occurrence'))
+        ''')
+    lkp_dict = cur.fetchone()[0]
+
+    if isinstance(lkp_dict, basestring):
+        lkp_dict = json.loads(lkp_dict)
+
+    # aggregates of no rows are null
+    for lkp_key, lkp_val in lkp_dict.items():
+        if lkp_val is None:
+            lkp_dict[lkp_key] = {} if lkp_key == u'occ_col_def' else []
+
+    lkp_list = [
+        (get_oqt_list, (), lkp_dict[u'oqt']),
+        (get_occstat_list, (), lkp_dict[u'occstat']),
+        (get_poptrend_list, (), lkp_dict[u'poptrend']),
+        (get_estbms_list, (), lkp_dict[u'estbms']),
+        (get_smpp_list, (), lkp_dict[u'smpp']),
+        (get_reliab_list, (), lkp_dict[u'reliab']),
+        (get_smpsu_list, (), lkp_dict[u'smpsu']),
+        (get_spwnc_list, (), lkp_dict[u'spwnc']),
+        (get_spwnl_list, (), lkp_dict[u'spwnl']),
+        (get_reftp_list, (), lkp_dict[u'reftp']),
+        (get_inst_list, (), lkp_dict[u'inst']),
+        (get_acs_list, (), lkp_dict[u'acs']),
+        (get_dtst_list,
+         (),
+         [get_dtst_str(d[0], d[1]) for d in lkp_dict[u'dtst']]),
+        (get_prj_list,
+         (),
+         [get_prj_str(p[0], p[1]) for p in lkp_dict[u'prj']]),
+        (get_ref_list,
+         (),
+         [get_ref_str(r[1], r[2], r[3], r[0]) for r in lkp_dict[u'ref']]),
+        (get_txn_idx_list, (), [tuple(t) for t in lkp_dict[u'txn_idx']])]
+
+    for col, col_def_val in lkp_dict[u'occ_col_def'].items():
+        lkp_list.append(
+            (get_col_def_val, ('nofa', 'occurrence', col), col_def_val))
+
+    for fnc, args, val in lkp_list:
+        _seed_cache(con, fnc, args, val)
@@ -189,9 +189,13 @@ class ConDlg(QDialog):
 
             QgsApplication.processEvents()
 
-            self.mc.con = db.get_con(con_info)
+            self.mc.rel_con()
+            self.mc.con = self.mc.con_pool.get_con(con_info)
 
             if db.chck_nofa_tbls(self.mc.con):
+                # lookup lists are loaded while the dialog is still open
+                self.mc.ins_mw.warm_up()
+
                 QMessageBox.information(
                     self,
                     u'Success',
@@ -204,8 +208,7 @@ class ConDlg(QDialog):
                     u'Connection succeeded but the database is not NOFA.')
                 self.ok_btn.setEnabled(False)
 
-                self.mc.con.close()
-                self.mc.con = None
+                self.mc.rel_con(True)
         except psycopg2.OperationalError:
             self.mc.con = None
             self.ok_btn.setEnabled(False)
@@ -0,0 +1,311 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ DbTaskMngr
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from PyQt4.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+import threading
+import traceback
+
+import psycopg2
+
+from .. import instr
+
+# one thread per history table so that they are filled at once
+MAX_THRD_CNT = 6
+
+
+class DbTaskSgnls(QObject):
+    """
+    Signals of a database task, they are delivered in the main thread.
+    """
+
+    # task, result
+    done = pyqtSignal(object, object)
+    # task, exception, formatted traceback
+    fail = pyqtSignal(object, object, object)
+
+
+class DbTask(QRunnable):
+    """
+    A task that runs a database function with its own pooled connection
+    in a thread of a thread pool.
+    """
+
+    def __init__(self, mc, key, act, fnc, args, done_cb, fail_cb):
+        """
+        Constructor.
+
+        :param mc: A reference to the main class.
+        :type mc: object
+        :param key: A task key, a new task with the same key
+            supersedes this one.
+        :type key: object
+        :param act: An action of queries of the task.
+        :type act: str
+        :param fnc: A function taking a connection as the first argument.
+        :type fnc: function
+        :param args: Other arguments of the function.
+        :type args: tuple
+        :param done_cb: A function called with the result.
+        :type done_cb: function
+        :param fail_cb: A function called with an exception
+            and a formatted traceback.
+        :type fail_cb: function
+        """
+
+        super(DbTask, self).__init__()
+
+        # the task is kept by its manager until it is finished
+        self.setAutoDelete(False)
+
+        self.con_pool = mc.con_pool
+        self.con_info = mc.con_info
+        self.key = key
+        self.act = act
+        self.fnc = fnc
+        self.args = args
+        self.done_cb = done_cb
+        self.fail_cb = fail_cb
+
+        self.sgnls = DbTaskSgnls()
+
+        self.lock = threading.Lock()
+        self.con = None
+        self.cncld = False
+
+    def cncl(self):
+        """
+        Cancels the task, a running statement is cancelled
+        in the database.
+        """
+
+        with self.lock:
+            self.cncld = True
+
+            if self.con is not None:
+                try:
+                    self.con.cancel()
+                except psycopg2.Error:
+                    pass
+
+    def run(self):
+        """
+        Runs the function and emits its result or its exception.
+        """
+
+        try:
+            with instr.Act(self.act):
+                con = self.con_pool.get_con(self.con_info)
+
+                with self.lock:
+                    self.con = con
+
+                try:
+                    if self.cncld:
+                        rslt = None
+                    else:
+                        rslt = self.fnc(con, *self.args)
+                finally:
+                    # the connection is not cancelled once it is returned
+                    with self.lock:
+                        self.con = None
+
+                    self.con_pool.put_con(con)
+        except Exception as e:
+            self.sgnls.fail.emit(self, e, traceback.format_exc())
+        else:
+            self.sgnls.done.emit(self, rslt)
+
+
+class DbTaskMngr(QObject):
+    """
+    A manager of database tasks.
+
+    Results are delivered in the main thread, results of superseded
+    and cancelled tasks are dropped.
+    """
+
+    def __init__(self, mc, parent=None, max_thrd_cnt=MAX_THRD_CNT):
+        """
+        Constructor.
+
+        :param mc: A reference to the main class.
+        :type mc: object
+        :param parent: A parent object.
+        :type parent: QObject
+        :param max_thrd_cnt: A maximum number of threads.
+        :type max_thrd_cnt: int
+        """
+
+        super(DbTaskMngr, self).__init__(parent)
+
+        self.mc = mc
+
+        self.thrd_pool = QThreadPool(self)
+        self.thrd_pool.setMaxThreadCount(max_thrd_cnt)
+
+        # key -> current task
+        self.task_dict = {}
+        # all unfinished tasks
+        self.task_set = set()
+
+    def run(self, key, fnc, args, done_cb, fail_cb=None, act=None):
+        """
+        Runs the given function in a task.
+        A running task with the same key is cancelled.
+
+        :param key: A task key.
+        :type key: object
+        :param fnc: A function taking a connection as the first argument.
+        :type fnc: function
+        :param args: Other arguments of the function.
+        :type args: tuple
+        :param done_cb: A function called with the result.
+        :type done_cb: function
+        :param fail_cb: A function called with an exception
+            and a formatted traceback, None to raise the exception
+            in the main thread.
+        :type fail_cb: function
+        :param act: An action of queries of the task, the key when None.
+        :type act: str
+
+        :returns: A task.
+        :rtype: DbTask
+        """
+
+        self.cncl(key)
+
+        task = DbTask(
+            self.mc, key, act if act is not None else key,
+            fnc, args, done_cb, fail_cb)
+
+        task.sgnls.done.connect(self._fin_task)
+        task.sgnls.fail.connect(self._fail_task)
+
+        self.task_dict[key] = task
+        self.task_set.add(task)
+
+        self.thrd_pool.start(task)
+
+        return task
+
+    def cncl(self, key):
+        """
+        Cancels a task with the given key.
+
+        :param key: A task key.
+        :type key: object
+        """
+
+        task = self.task_dict.pop(key, None)
+
+        if task is not None:
+            task.cncl()
+
+    def get_task(self, key):
+        """
+        Returns a running task with the given key.
+
+        :param key: A task key.
+        :type key: object
+
+        :returns: A task, None when no task with the key is running.
+        :rtype: DbTask
+        """
+
+        return self.task_dict.get(key)
+
+    def cncl_all(self, wait=True, excl_keys=()):
+        """
+        Cancels all tasks.
+
+        :param wait: True to wait until all tasks are finished,
+            False otherwise.
+        :type wait: bool
+        :param excl_keys: Keys of tasks that are kept running.
+        :type excl_keys: tuple
+        """
+
+        for key in list(self.task_dict.keys()):
+            if key not in excl_keys:
+                self.cncl(key)
+
+        if wait:
+            self.thrd_pool.waitForDone()
+
+    def _is_cur(self, task):
+        """
+        Forgets the given finished task and checks if it is current.
+
+        :param task: A task.
+        :type task: DbTask
+
+        :returns: True when the task was neither superseded nor cancelled,
+            False otherwise.
+        :rtype: bool
+        """
+
+        self.task_set.discard(task)
+
+        if self.task_dict.get(task.key) is not task:
+            return False
+
+        del self.task_dict[task.key]
+
+        return not task.cncld
+
+    def _fin_task(self, task, rslt):
+        """
+        Delivers the result of the given task.
+
+        :param task: A task.
+        :type task: DbTask
+        :param rslt: A result.
+        :type rslt: object
+        """
+
+        if self._is_cur(task):
+            task.done_cb(rslt)
+
+    def _fail_task(self, task, e, tb):
+        """
+        Delivers the exception of the given task.
+
+        :param task: A task.
+        :type task: DbTask
+        :param e: An exception.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        if not self._is_cur(task):
+            return
+
+        if task.fail_cb is None:
+            raise e
+
+        task.fail_cb(e, tb)
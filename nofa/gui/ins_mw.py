@@ -33,12 +33,12 @@ from qgis.gui import QgsMapToolEmitPoint
 from PyQt4 import QtGui, uic
 from PyQt4.QtCore import (
     QSettings, QCoreApplication, Qt, QObject, QDate, QDateTime, QObject,
-    QSignalMapper, QUrl)
+    QSignalMapper, QUrl, QThread)
 from PyQt4.QtGui import (
     QMessageBox, QTreeWidgetItem, QListWidgetItem, QTableWidget,
     QTableWidgetItem, QMainWindow, QDoubleValidator, QIntValidator, QComboBox,
     QLineEdit, QDateEdit, QAbstractItemView, QValidator, QBrush, QColor,
-    QPlainTextEdit, QTextCursor, QWidget)
+    QPlainTextEdit, QTextCursor, QWidget, QProgressBar, QPushButton, QLabel)
 from PyQt4.QtWebKit import QWebView
 
 from collections import defaultdict, OrderedDict
@@ -46,17 +46,23 @@ import os
 import psycopg2
 import psycopg2.extras
 import datetime
+import time
+import traceback
 import urllib
 import uuid
 import sys
 
+import db_task
 import de
 import doc_wdgs
 import dtst_dlg
+import ins_wrkr
 import prj_dlg
+import loc_idx
 import ref_dlg
+import trf
 import vald
-from .. import db, ordered_set
+from .. import db, instr, lkp_snap, ordered_set, txn_idx, admin_idx
 
 
 class ActLyrExc(Exception):
@@ -107,6 +113,25 @@ class OccNotFldExc(Exception):
     pass
 
 
+class EctpNfExc(Exception):
+    """
+    A custom exception when an ecotype of an occurrence was not found.
+    """
+
+    def __init__(self, m, ectp):
+        """
+        Constructor.
+
+        :param m: An occurrence table row.
+        :type m: int
+        :param ectp: An ecotype that was not found.
+        :type ectp: str
+        """
+
+        self.m = m
+        self.ectp = ectp
+
+
 class NoLocExc(Exception):
     """
     A custom exception when no location is provided.
@@ -327,6 +352,48 @@ class InsMw(QMainWindow, FORM_CLASS):
         self.nxt_week_dt = self.today_dt + datetime.timedelta(days=7)
         self.fltr_str_dt = datetime.datetime(2017, 1, 1)
 
+        # number of rows shown in a history table at once
+        self.hist_page_size = 500
+
+        # number of rows after which insert is committed, 0 - commit once
+        self.cmt_size = int(self.settings.value(u'cmt_size', 0))
+
+        # running insert
+        self.ins_thrd = None
+        self.ins_wrkr = None
+        # events of a partly committed insert that were not inserted
+        self.rsm_snap = None
+
+        # search, preview and history run in background tasks
+        self.db_task_mngr = db_task.DbTaskMngr(self.mc, self)
+
+        self.txn_idx = txn_idx.TxnIdx()
+        self.admin_idx = admin_idx.AdminIdx()
+
+        # data loaded by a warm-up and a connection information it is for
+        self.prep_data = None
+        self.prep_con_info = None
+        # True when widgets are populated once the warm-up finishes
+        self.prep_pend = False
+        self.prep_strt_ts = None
+
+        # 1 - save lookup lists to populate widgets on the next start
+        if int(self.settings.value(u'lkp_snap', 1)):
+            self.snap_dir = os.path.join(
+                QgsApplication.qgisSettingsDirPath(), self.app_name)
+        else:
+            self.snap_dir = None
+        # snapshot widgets were populated from until it is revalidated
+        self.snap_dict = None
+
+        self.trf_svc = trf.TrfSvc()
+
+        # 1 - find the nearest locations in a local index of lakes
+        if int(self.settings.value(u'loc_idx', 0)):
+            self.loc_idx = loc_idx.LocIdx()
+        else:
+            self.loc_idx = None
+
         # self.def_clr = self.ins_btn.palette().background().color()
         self.grn_clr = QColor(177, 234, 177)
         self.red_clr = QColor(234, 177, 177)
@@ -342,6 +409,7 @@ class InsMw(QMainWindow, FORM_CLASS):
         self._build_main_tab_wdgs()
         self._build_hist_tab_wdgs()
         self._build_doc_tab_wdgs()
+        self._build_ins_prog_wdgs()
 
         self.main_tabwdg.setCurrentIndex(0)
         self.loc_tabwdg.setCurrentIndex(0)
@@ -483,6 +551,17 @@ class InsMw(QMainWindow, FORM_CLASS):
             self.hist_prj_tbl: db.get_hist_prj_list,
             self.hist_ref_tbl: db.get_hist_ref_list}
 
+        # history table -> key of its last row, None when all rows are shown
+        self.hist_key_dict = {}
+        # history table -> original tab text
+        self.hist_tab_txt_dict = {}
+
+        for tbl in self.hist_tbls_fnc_dict.keys():
+            self.hist_tab_txt_dict[tbl] = self.hist_tabwdg.tabText(
+                self.hist_tabwdg.indexOf(tbl.parentWidget()))
+            tbl.verticalScrollBar().valueChanged.connect(
+                lambda val, tbl=tbl: self._fetch_hist_page(tbl))
+
         self.hist_input_wdgs = [
             self.usr_cb,
             self.hist_ins_dtstrt_de,
@@ -511,6 +590,36 @@ class InsMw(QMainWindow, FORM_CLASS):
         self.url_le.setText(doc_url_str)
         self.web_view.load(QUrl(doc_url_str))
 
+    def _build_ins_prog_wdgs(self):
+        """
+        Builds and sets up insert progress widgets in status bar.
+        """
+
+        self.ins_prog_lbl = QLabel(self)
+        self.statusBar().addPermanentWidget(self.ins_prog_lbl)
+
+        self.ins_prog_pb = QProgressBar(self)
+        self.statusBar().addPermanentWidget(self.ins_prog_pb)
+
+        self.ins_cncl_btn = QPushButton(u'Cancel', self)
+        self.ins_cncl_btn.clicked.connect(self._cncl_ins)
+        self.statusBar().addPermanentWidget(self.ins_cncl_btn)
+
+        self._set_ins_prog_vis(False)
+
+    def _set_ins_prog_vis(self, bl):
+        """
+        Shows or hides insert progress widgets.
+
+        :param bl: True to show widgets, False to hide them.
+        :type bl: bool
+        """
+
+        self.ins_prog_lbl.setVisible(bl)
+        self.ins_prog_pb.setVisible(bl)
+        self.ins_cncl_btn.setVisible(bl)
+        self.ins_cncl_btn.setEnabled(bl)
+
     def _create_loc_tbl(self):
         """
         Creates an occurrence table with one row.
@@ -743,16 +852,39 @@ class InsMw(QMainWindow, FORM_CLASS):
 
     def _srch_loc(self):
         """
-        Searches for location.
+        Searches for location in a background task.
         Data are filtered based on information in widgets.
+        A search that is still running is cancelled.
         """
 
         wb, cntry_code, cnty, muni = self._loc_fltrs
 
         self.loc_load_btn.setEnabled(False)
+        self.lake_name_statlbl.setText(u'Searching...')
 
-        locid_list = db.get_loc_by_fltrs(
-            self.mc.con, wb, cntry_code, cnty, muni)
+        self.db_task_mngr.run(
+            u'search',
+            db.get_loc_by_fltrs,
+            (wb, cntry_code, cnty, muni),
+            lambda locid_list: self._fin_srch_loc(
+                locid_list, wb, cntry_code, cnty, muni),
+            self._fail_db_task)
+
+    def _fin_srch_loc(self, locid_list, wb, cntry_code, cnty, muni):
+        """
+        Finishes searching for location.
+
+        :param locid_list: A list of found location IDs.
+        :type locid_list: list
+        :param wb: A water body.
+        :type wb: str
+        :param cntry_code: A country code.
+        :type cntry_code: str
+        :param cnty: A county.
+        :type cnty: str
+        :param muni: A municipality.
+        :type muni: str
+        """
 
         loc_count = len(locid_list)
 
@@ -768,6 +900,20 @@ class InsMw(QMainWindow, FORM_CLASS):
         self.lake_name_statlbl.setText(
             u'Found {} location(s).'.format(loc_count))
 
+    def _fail_db_task(self, e, tb):
+        """
+        Reports a failed database task.
+
+        :param e: An exception raised in the task.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        QgsMessageLog.logMessage(tb, self.app_name, QgsMessageLog.CRITICAL)
+
+        QMessageBox.critical(self, u'Error', u'Query failed:\n{}'.format(e))
+
     def _get_val_txt(self, txt, forbi=False, all=False):
         """
         Returns a validated text.
@@ -1133,6 +1279,13 @@ class InsMw(QMainWindow, FORM_CLASS):
             self.iface.mapCanvas().unsetMapTool(self.coord_cnvs_tool)
             self.iface.mapCanvas().setMapTool(self.last_map_tool)
 
+        # the insert is rolled back and its connection is returned
+        if self.ins_wrkr is not None:
+            self.ins_wrkr.cncl()
+            self._end_ins()
+
+        self.db_task_mngr.cncl_all()
+
     def _act_coord_cnvs_tool(self):
         """
         Activates a tool that allows user to set coordinates by mouse click.
@@ -1241,9 +1394,7 @@ class InsMw(QMainWindow, FORM_CLASS):
         :rtype: tuple
         """
 
-        trf = QgsCoordinateTransform(in_crs, out_crs)
-
-        out_x, out_y = trf.transform(QgsPoint(in_x, in_y))
+        out_x, out_y = self.trf_svc.trf_pt(in_crs, out_crs, in_x, in_y)
 
         return (out_x, out_y)
 
@@ -1404,118 +1555,150 @@ class InsMw(QMainWindow, FORM_CLASS):
     def _preview_loc(self):
         """
         Previews all locations in the location table.
-        It adds two layer to map canvas:
+        Locations are checked in the database in a background task,
+        then it adds two layer to map canvas:
 
             - layer of existing locations
             - layer of new locations.
         """
 
         try:
-            locid_list = []
-
             tbl = self.loc_tbl
 
             new_loc_feat_list = []
 
+            rslv_args = self._get_loc_rslv_args()
+            nrst_row_set = set(rslv_args[3])
+
             for m in range(tbl.rowCount()):
                 row_data = self._get_row_data(tbl, m)
 
-                loc_met = row_data[0]
+                # coordinates - new
+                if row_data[0] == self.loc_met_list[1] \
+                        and m not in nrst_row_set:
+                    new_loc_feat_list.append(
+                        self._get_new_loc_feat(m, row_data))
 
-                # locationID
-                if loc_met == self.loc_met_list[0]:
-                    locid = self._get_locid_locid(m, row_data)
-                # coordinates
-                elif loc_met == self.loc_met_list[1]:
-                    new_loc_feat, locid = self._get_new_loc_feat_locid_coor(
-                        m, row_data)
+            self.db_task_mngr.run(
+                u'preview',
+                self._rslv_locids,
+                rslv_args,
+                lambda locid_dict: self._add_preview_lyrs(
+                    locid_dict, new_loc_feat_list),
+                self._fail_preview)
+        except (LocidMtyExc, LocidFmtExc, CoorMtyExc, NvlMtyExc) as e:
+            self._warn_loc_exc(e)
 
-                    if new_loc_feat:
-                        new_loc_feat_list.append(new_loc_feat)
-                # nvl
-                elif loc_met == self.loc_met_list[2]:
-                    locid = self._get_locid_nvl(m, row_data)
+    def _add_preview_lyrs(self, locid_dict, new_loc_feat_list):
+        """
+        Adds preview layers to map canvas.
 
-                if locid:
-                    locid_list.append(locid)
+        :param locid_dict: A location ID dictionary,
+            see :meth:`_rslv_locids`.
+        :type locid_dict: dict
+        :param new_loc_feat_list: A list of new location features.
+        :type new_loc_feat_list: list
+        """
 
-            if len(locid_list) != 0:
-                exg_loc_lyr = self._get_loc_lyr(
-                    locid_list, u'preview_location-existing')
+        locid_list = [
+            locid_dict[m] for m in sorted(locid_dict) if locid_dict[m]]
 
-                if exg_loc_lyr.isValid():
-                    QgsMapLayerRegistry.instance().addMapLayer(exg_loc_lyr)
+        if len(locid_list) != 0:
+            exg_loc_lyr = self._get_loc_lyr(
+                locid_list, u'preview_location-existing')
 
-            if len(new_loc_feat_list) != 0:
-                new_loc_lyr = QgsVectorLayer(
-                    u'Point?crs={}'.format(self._utm33_crs.authid()),
-                    u'preview_location-new',
-                    u'memory')
+            if exg_loc_lyr.isValid():
+                QgsMapLayerRegistry.instance().addMapLayer(exg_loc_lyr)
 
-                dp = new_loc_lyr.dataProvider()
-                dp.addFeatures(new_loc_feat_list)
-                new_loc_lyr.updateExtents()
+        if len(new_loc_feat_list) != 0:
+            new_loc_lyr = QgsVectorLayer(
+                u'Point?crs={}'.format(self._utm33_crs.authid()),
+                u'preview_location-new',
+                u'memory')
 
-                if new_loc_lyr.isValid():
-                    QgsMapLayerRegistry.instance().addMapLayer(new_loc_lyr)
-        except LocidMtyExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
+            dp = new_loc_lyr.dataProvider()
+            dp.addFeatures(new_loc_feat_list)
+            new_loc_lyr.updateExtents()
+
+            if new_loc_lyr.isValid():
+                QgsMapLayerRegistry.instance().addMapLayer(new_loc_lyr)
+
+    def _fail_preview(self, e, tb):
+        """
+        Reports a failed preview.
+
+        :param e: An exception raised in the task.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        if isinstance(e, (LocidNfExc, NvlNfExc)):
+            self._warn_loc_exc(e)
+        else:
+            self._fail_db_task(e, tb)
+
+    def _warn_loc_exc(self, e):
+        """
+        Selects a location table cell of the given exception
+        and warns about it.
+
+        :param e: A location exception.
+        :type e: Exception
+        """
+
+        self.main_tb.setCurrentWidget(self.loc_wdg)
+
+        if isinstance(e, LocidMtyExc):
             self.loc_tbl.setCurrentCell(e.m, 1)
             QMessageBox.warning(
                 self,
                 u'locationID',
                 u'locationID of selected row is empty.')
-        except LocidFmtExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
+        elif isinstance(e, LocidFmtExc):
             self.loc_tbl.setCurrentCell(e.m, 1)
             QMessageBox.warning(
                 self,
                 u'locationID',
                 u'locationID "{}" is not UUID.'.format(e.locid))
-        except LocidNfExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
+        elif isinstance(e, LocidNfExc):
             self.loc_tbl.setCurrentCell(e.m, 1)
             QMessageBox.warning(
                 self,
                 u'locationID',
                 u'locationID "{}" was not found.'.format(e.locid))
-        except CoorMtyExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
+        elif isinstance(e, CoorMtyExc):
             self.loc_tbl.setCurrentCell(e.m, 5)
             QMessageBox.warning(
                 self,
                 u'coordinates',
                 u'Both X and Y coordinates must be entered.')
-        except NvlMtyExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
+        elif isinstance(e, NvlMtyExc):
             self.loc_tbl.setCurrentCell(e.m, 7)
             QMessageBox.warning(
                 self,
                 u'Norwegian VatLnr',
                 u'Norwegian VatLnr of selected row is empty.')
-        except NvlNfExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
+        elif isinstance(e, NvlNfExc):
             self.loc_tbl.setCurrentCell(e.m, 7)
             QMessageBox.warning(
                 self,
                 u'Norwegian VatLnr',
                 u'Norwegian VatLnr code "{}" was not found.'.format(e.nvl))
 
-    def _get_new_loc_feat_locid_coor(self, m, row_data):
+    def _get_new_loc_feat(self, m, row_data):
         """
-        Returns a new location feature or a location ID.
-        It is used for 'coordinates' method.
+        Returns a new location feature.
+        It is used for 'coordinates' method with 'new' option.
         Checks if both X and Y coordinates are entered.
-        Based on option it returns a new location feature
-        or returns location ID of the nearest location.
 
         :param m: A location table row.
         :type m: int
         :param row_data: Data in location table row.
         :type row_data: list
 
-        :returns: A location ID of new location or the nearest location.
-        :rtype: str
+        :returns: A new location feature.
+        :rtype: QgsFeature
         """
 
         try:
@@ -1524,23 +1707,14 @@ class InsMw(QMainWindow, FORM_CLASS):
             raise CoorMtyExc(m)
 
         crs = self.crs_dict[crs_desc]
-        srid = crs.authid().split(u':')[1]
 
-        new_loc_feat = None
-        locid = None
+        out_crs = self._utm33_crs
+        out_x, out_y = self._trf_coord(crs, out_crs, x, y)
+        pnt_geom = QgsGeometry.fromPoint(QgsPoint(out_x, out_y))
+        new_loc_feat = QgsFeature()
+        new_loc_feat.setGeometry(pnt_geom)
 
-        # new
-        if opt == self.opt_list[0]:
-            out_crs = self._utm33_crs
-            out_x, out_y = self._trf_coord(crs, out_crs, x, y)
-            pnt_geom = QgsGeometry.fromPoint(QgsPoint(out_x, out_y))
-            new_loc_feat = QgsFeature()
-            new_loc_feat.setGeometry(pnt_geom)
-        # nearest
-        elif opt == self.opt_list[1]:
-            locid = self._get_nrst_locid(x, y, srid)
-
-        return (new_loc_feat, locid)
+        return new_loc_feat
 
     @property
     def _utm33_crs(self):
@@ -1558,17 +1732,38 @@ class InsMw(QMainWindow, FORM_CLASS):
     def _fetch_schema(self):
         """
         Fetches a schema based on what tab is active.
-        If the main tab is active it fetches data from `NOFA` schema,
+        If the main tab is active it fetches data from `NOFA` schema
+        when any lookup table changed,
         otherwise it fetches data from `plugin` schema.
         """
 
         idx = self.main_tabwdg.currentIndex()
 
         if idx == 0:
-            self._fetch_nofa_schema()
+            self._rfsh_nofa_schema()
         elif idx == 1:
             self._fetch_plugin_schema()
 
+    def _rfsh_nofa_schema(self):
+        """
+        Fetches data from the `NOFA` schema again when versions
+        of its lookup tables changed since the last check.
+        Indices are reloaded only when their tables changed.
+        """
+
+        chngd_tbl_set = set(db.chck_tbl_vers(self.mc.con))
+
+        if not chngd_tbl_set:
+            return
+
+        if chngd_tbl_set & set(db.get_txn_idx_list.cache_tbls):
+            self.txn_idx = txn_idx.get_txn_idx(self.mc.con)
+
+        if u'location_admin' in chngd_tbl_set:
+            self.admin_idx = admin_idx.get_admin_idx(self.mc.con)
+
+        self._fetch_nofa_schema()
+
     def _fetch_plugin_schema(self):
         """
         Fetches data from the `plugin` schema and populates tables.
@@ -1595,14 +1790,119 @@ class InsMw(QMainWindow, FORM_CLASS):
 
     def _fill_hist_tbls(self):
         """
-        Fills all history tables.
+        Fills all history tables, every table in a background task.
+        Tasks of previous filters that are still running are cancelled.
         """
 
-        hist_fltrs = self._hist_fltrs
+        # filters are kept so that next pages are filtered the same way
+        self.hist_fltrs = self._hist_fltrs
 
         for tbl, fnc in self.hist_tbls_fnc_dict.items():
-            tbl_list, tbl_hdrs = fnc(self.mc.con, *hist_fltrs)
-            self._create_tbl_hist_tab(tbl, tbl_list, tbl_hdrs)
+            self.hist_key_dict[tbl] = None
+
+            self.db_task_mngr.run(
+                (u'history', tbl),
+                fnc,
+                self.hist_fltrs + (self.hist_page_size,),
+                lambda rslt, tbl=tbl: self._fill_hist_tbl(tbl, *rslt),
+                self._fail_db_task,
+                u'history')
+
+    def _fill_hist_tbl(self, tbl, tbl_rows, tbl_hdrs, tbl_key, tbl_cnt):
+        """
+        Fills the given history table with its first page.
+
+        :param tbl: A history table.
+        :type tbl: QTableWidget
+        :param tbl_rows: A list of rows.
+        :type tbl_rows: list
+        :param tbl_hdrs: A list of headers.
+        :type tbl_hdrs: list
+        :param tbl_key: A key of the last row, None when there are
+            no more pages.
+        :type tbl_key: tuple
+        :param tbl_cnt: An estimated number of all rows.
+        :type tbl_cnt: int
+        """
+
+        self._create_tbl_hist_tab(tbl, tbl_rows, tbl_hdrs)
+
+        self.hist_key_dict[tbl] = tbl_key
+
+        self.hist_tabwdg.setTabText(
+            self.hist_tabwdg.indexOf(tbl.parentWidget()),
+            u'{} (~{})'.format(self.hist_tab_txt_dict[tbl], tbl_cnt))
+
+    def _fetch_hist_page(self, tbl):
+        """
+        Adds the next page of rows to the given history table
+        when it is scrolled to the bottom.
+
+        :param tbl: A history table.
+        :type tbl: QTableWidget
+        """
+
+        key = self.hist_key_dict.get(tbl)
+
+        if key is None:
+            return
+
+        scroll_bar = tbl.verticalScrollBar()
+
+        if scroll_bar.value() < scroll_bar.maximum():
+            return
+
+        # prevents fetching the same page again while this one is fetched
+        self.hist_key_dict[tbl] = None
+
+        self.db_task_mngr.run(
+            (u'history', tbl),
+            self.hist_tbls_fnc_dict[tbl],
+            self.hist_fltrs + (self.hist_page_size, key),
+            lambda rslt, tbl=tbl: self._add_hist_tbl_page(tbl, *rslt),
+            lambda e, tb, tbl=tbl, key=key: self._fail_hist_page(
+                tbl, key, e, tb),
+            u'history')
+
+    def _fail_hist_page(self, tbl, key, e, tb):
+        """
+        Reports a failed fetch of the next page of the given history table.
+        The key is restored so that the page can be fetched again.
+
+        :param tbl: A history table.
+        :type tbl: QTableWidget
+        :param key: A key of the last row of the table.
+        :type key: tuple
+        :param e: An exception raised in the task.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        self.hist_key_dict[tbl] = key
+
+        self._fail_db_task(e, tb)
+
+    def _add_hist_tbl_page(self, tbl, tbl_rows, tbl_hdrs, tbl_key, tbl_cnt):
+        """
+        Adds the next page of rows to the given history table.
+
+        :param tbl: A history table.
+        :type tbl: QTableWidget
+        :param tbl_rows: A list of rows.
+        :type tbl_rows: list
+        :param tbl_hdrs: A list of headers.
+        :type tbl_hdrs: list
+        :param tbl_key: A key of the last row, None when there are
+            no more pages.
+        :type tbl_key: tuple
+        :param tbl_cnt: None for pages after the first one.
+        :type tbl_cnt: int
+        """
+
+        self._add_hist_tbl_rows(tbl, tbl_rows)
+
+        self.hist_key_dict[tbl] = tbl_key
 
     @property
     def _hist_fltrs(self):
@@ -1746,58 +2046,50 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         self.txncvg_tw.expandToDepth(0)
 
+    @instr.Act(u'insert')
     def _ins(self):
         """
         Inserts the data into the database.
+        Widgets are checked and their data are collected here,
+        locations are resolved in a background task
+        and the insert runs in a background thread.
         """
 
-        try:
-            self.chck_mand_wdgs(self.mtdt_mand_wdgs, MtdtNotFldExc)
-            self._chck_occ_tbl()
-
-            locid_list = self._get_loc_list()
-
-            event_list = self.get_wdg_list(self.event_input_wdgs)
-
-            dtst_id = self._get_dtst_id()
-            prj_id = self._get_prj_id()
-            ref_id = self._get_ref_id()
-
-            for loc_id in locid_list:
-
-                event_id = uuid.uuid4()
-
-                db.ins_event(
-                    self.mc.con,
-                    loc_id, event_id, event_list, dtst_id, prj_id, ref_id)
-
-                db.ins_event_log(
-                    self.mc.con,
-                    loc_id, event_id, dtst_id, prj_id, ref_id,
-                    self.mc.con_info[self.mc.usr_str])
-
-                self._ins_txncvg(event_id)
+        if self.rsm_snap is not None:
+            rsm_snap = self.rsm_snap
 
-                for m in range(self.occ_tbl.rowCount()):
-                    occ_id = uuid.uuid4()
+            btn = QMessageBox.question(
+                self,
+                u'Resume',
+                u'The previous insert was not finished.\n'
+                u'Insert only its remaining {} event(s)?\n'
+                u'Choose No to insert the current data again.'.format(
+                    len(rsm_snap[u'locid_list'])),
+                QMessageBox.Yes | QMessageBox.No | QMessageBox.Cancel)
 
-                    occ_row_list = self._get_occ_row_list(m)
+            if btn == QMessageBox.Cancel:
+                return
 
-                    txn_id = db.get_txn_id(self.mc.con, occ_row_list[0])
+            self.rsm_snap = None
 
-                    ectp = occ_row_list[1]
-                    ectp_id = db.get_ectp_id(self.mc.con, ectp)
+            if btn == QMessageBox.Yes:
+                self._strt_ins(rsm_snap)
+                return
 
-                    db.ins_occ(
-                        self.mc.con,
-                        occ_id, txn_id, ectp_id, occ_row_list, event_id)
+        try:
+            self.chck_mand_wdgs(self.mtdt_mand_wdgs, MtdtNotFldExc)
+            self._chck_occ_tbl()
 
-                    db.ins_occ_log(
-                        self.mc.con,
-                        occ_id, event_id, dtst_id, prj_id, ref_id, loc_id,
-                        self.mc.con_info[self.mc.usr_str])
+            rslv_args = self._get_loc_rslv_args()
+            ins_snap = self._get_ins_snap()
 
-            QMessageBox.information(self, u'Saved', u'Data correctly saved.')
+            self.db_task_mngr.run(
+                u'insert',
+                self._rslv_locids,
+                rslv_args,
+                lambda locid_dict: self._strt_rslvd_ins(ins_snap, locid_dict),
+                self._fail_rslv_ins,
+                u'insert')
         except MtdtNotFldExc as e:
             self.main_tb.setCurrentWidget(e.wdg.parent())
             e.wdg.setFocus()
@@ -1808,50 +2100,254 @@ class InsMw(QMainWindow, FORM_CLASS):
         except OccNotFldExc:
             QMessageBox.warning(
                 self, u'Taxon', u'Select taxon.')
-        except LocidMtyExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
-            self.loc_tbl.setCurrentCell(e.m, 1)
-            QMessageBox.warning(
-                self,
-                u'locationID',
-                u'locationID of selected row is empty.')
-        except LocidFmtExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
-            self.loc_tbl.setCurrentCell(e.m, 1)
-            QMessageBox.warning(
-                self,
-                u'locationID',
-                u'locationID "{}" is not UUID.'.format(e.locid))
-        except LocidNfExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
-            self.loc_tbl.setCurrentCell(e.m, 1)
-            QMessageBox.warning(
-                self,
-                u'locationID',
-                u'locationID "{}" was not found.'.format(e.locid))
-        except CoorMtyExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
-            self.loc_tbl.setCurrentCell(e.m, 5)
-            QMessageBox.warning(
-                self,
-                u'coordinates',
-                u'Both X and Y coordinates must be entered.')
-        except NvlMtyExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
-            self.loc_tbl.setCurrentCell(e.m, 7)
+        except EctpNfExc as e:
+            self.occ_tbl.selectRow(e.m)
             QMessageBox.warning(
                 self,
-                u'Norwegian VatLnr',
-                u'Norwegian VatLnr of selected row is empty.')
-        except NvlNfExc as e:
-            self.main_tb.setCurrentWidget(self.loc_wdg)
-            self.loc_tbl.setCurrentCell(e.m, 7)
-            QMessageBox.warning(
+                u'Ecotype',
+                u'Ecotype "{}" of the selected taxon was not found.'.format(
+                    e.ectp))
+        except (LocidMtyExc, LocidFmtExc, CoorMtyExc, NvlMtyExc) as e:
+            self._warn_loc_exc(e)
+        except Exception as e:
+            QgsMessageLog.logMessage(
+                traceback.format_exc(), self.app_name, QgsMessageLog.CRITICAL)
+            QMessageBox.critical(
+                self, u'Error', u'Insert failed:\n{}'.format(e))
+
+    def _get_ins_snap(self):
+        """
+        Returns a snapshot of data to be inserted.
+        It is collected from widgets in the main thread,
+        location IDs are added by :meth:`_strt_rslvd_ins`
+        when they are resolved and the insert itself runs in a worker.
+
+        :returns:
+         | A snapshot dictionary:
+         |    - *new_loc_dict* -- new locations,
+         |      see :meth:`_get_new_loc_dict`
+         |    - *event_list* -- data from event input widgets
+         |    - *dtst_id*, *prj_id*, *ref_id* -- metadata IDs
+         |    - *usr* -- an username
+         |    - *txncvg_id_list* -- taxon IDs of taxonomic coverage
+         |    - *occ_list* -- occurrences, see :meth:`_get_occ_list`
+        :rtype: dict
+        """
+
+        ins_snap = {
+            u'new_loc_dict': self._get_new_loc_dict(),
+            u'event_list': self.get_wdg_list(self.event_input_wdgs),
+            u'dtst_id': self._get_dtst_id(),
+            u'prj_id': self._get_prj_id(),
+            u'ref_id': self._get_ref_id(),
+            u'usr': self.mc.con_info[self.mc.usr_str],
+            u'txncvg_id_list': self._ckd_txn_ids,
+            u'occ_list': self._get_occ_list()}
+
+        return ins_snap
+
+    def _strt_rslvd_ins(self, ins_snap, locid_dict):
+        """
+        Adds resolved location IDs to the given snapshot and starts
+        inserting it.
+
+        :param ins_snap: A snapshot of data to be inserted,
+            see :meth:`_get_ins_snap`.
+        :type ins_snap: dict
+        :param locid_dict: A location ID dictionary,
+            see :meth:`_rslv_locids`.
+        :type locid_dict: dict
+        """
+
+        # an insert was resumed meanwhile
+        if self.ins_wrkr is not None:
+            return
+
+        try:
+            locid_list, new_loc_list = self._get_loc_list(
+                locid_dict, ins_snap.pop(u'new_loc_dict'))
+        except LocidMtyExc as e:
+            self._warn_loc_exc(e)
+            return
+
+        ins_snap[u'locid_list'] = locid_list
+        ins_snap[u'new_loc_list'] = new_loc_list
+
+        self._strt_ins(ins_snap)
+
+    def _fail_rslv_ins(self, e, tb):
+        """
+        Reports failed resolving of locations to be inserted.
+
+        :param e: An exception raised in the task.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        if isinstance(e, (LocidNfExc, NvlNfExc)):
+            self._warn_loc_exc(e)
+        else:
+            self._fail_db_task(e, tb)
+
+    def _strt_ins(self, ins_snap):
+        """
+        Starts inserting the given snapshot in a background thread.
+
+        :param ins_snap: A snapshot of data to be inserted.
+        :type ins_snap: dict
+        """
+
+        self.ins_btn.setEnabled(False)
+
+        self.ins_prog_lbl.setText(u'Inserting...')
+        # busy until the first rows are written
+        self.ins_prog_pb.setRange(0, 0)
+        self._set_ins_prog_vis(True)
+
+        self.ins_thrd = QThread(self)
+        self.ins_wrkr = ins_wrkr.InsWrkr(
+            self.mc.con_pool, self.mc.con_info, ins_snap, self.cmt_size)
+        self.ins_wrkr.moveToThread(self.ins_thrd)
+
+        self.ins_thrd.started.connect(self.ins_wrkr.run)
+        self.ins_wrkr.prog.connect(self._upd_ins_prog)
+        self.ins_wrkr.fin.connect(self._fin_ins)
+        self.ins_wrkr.err.connect(self._fail_ins)
+
+        self.ins_thrd.start()
+
+    def _upd_ins_prog(self, row_cnt, row_tot, rows_per_s):
+        """
+        Updates insert progress widgets.
+
+        :param row_cnt: A number of rows written to the database.
+        :type row_cnt: int
+        :param row_tot: A number of rows in total.
+        :type row_tot: int
+        :param rows_per_s: A number of rows written per second.
+        :type rows_per_s: float
+        """
+
+        self.ins_prog_pb.setRange(0, max(row_tot, 1))
+        self.ins_prog_pb.setValue(row_cnt)
+        self.ins_prog_lbl.setText(
+            u'{} of {} row(s), {:.0f} rows/s'.format(
+                row_cnt, row_tot, rows_per_s))
+
+    def _cncl_ins(self):
+        """
+        Cancels the running insert.
+        """
+
+        if self.ins_wrkr is not None:
+            self.ins_cncl_btn.setEnabled(False)
+            self.ins_prog_lbl.setText(u'Cancelling...')
+            self.ins_wrkr.cncl()
+
+    def _end_ins(self):
+        """
+        Stops the insert thread and restores widgets.
+        """
+
+        self.ins_thrd.quit()
+        self.ins_thrd.wait()
+
+        self.ins_wrkr.deleteLater()
+        self.ins_thrd.deleteLater()
+
+        self.ins_wrkr = None
+        self.ins_thrd = None
+
+        self._set_ins_prog_vis(False)
+        self.ins_btn.setEnabled(True)
+
+    def _fin_ins(self, event_cnt, cncld):
+        """
+        Finishes the insert.
+
+        :param event_cnt: A number of committed events.
+        :type event_cnt: int
+        :param cncld: True when the insert was cancelled.
+        :type cncld: bool
+        """
+
+        # the insert was stopped when the plugin was unloaded
+        if self.ins_wrkr is None:
+            return
+
+        rsm_msg = self._set_rsm_snap(self.ins_wrkr.ins_snap, event_cnt)
+
+        self._end_ins()
+
+        if cncld:
+            QMessageBox.information(
                 self,
-                u'Norwegian VatLnr',
-                u'Norwegian VatLnr code "{}" was not found.'.format(e.nvl))
-        except:
-            QMessageBox.information(self, u'Error', u'Something went wrong.')
+                u'Cancelled',
+                u'Insert cancelled, {} event(s) saved.{}'.format(
+                    event_cnt, rsm_msg))
+        else:
+            QMessageBox.information(self, u'Saved', u'Data correctly saved.')
+
+    def _fail_ins(self, e, tb):
+        """
+        Reports a failed insert.
+        Rows committed before the failure are kept
+        and the insert can be resumed.
+
+        :param e: An exception raised in the worker.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        if self.ins_wrkr is None:
+            return
+
+        cmt_event_cnt = self.ins_wrkr.cmt_event_cnt
+        rsm_msg = self._set_rsm_snap(self.ins_wrkr.ins_snap, cmt_event_cnt)
+
+        self._end_ins()
+
+        QgsMessageLog.logMessage(tb, self.app_name, QgsMessageLog.CRITICAL)
+
+        QMessageBox.critical(
+            self,
+            u'Error',
+            u'Insert failed, {} event(s) saved:\n{}{}'.format(
+                cmt_event_cnt, e, rsm_msg))
+
+    def _set_rsm_snap(self, ins_snap, cmt_event_cnt):
+        """
+        Keeps events of the given snapshot that were not committed
+        so that the next insert can resume with them
+        instead of inserting committed events again.
+
+        :param ins_snap: A snapshot of the finished insert.
+        :type ins_snap: dict
+        :param cmt_event_cnt: A number of committed events.
+        :type cmt_event_cnt: int
+
+        :returns: A message for the user, an empty string when nothing
+            was committed or everything was committed.
+        :rtype: str
+        """
+
+        self.rsm_snap = None
+
+        if cmt_event_cnt == 0 \
+                or cmt_event_cnt >= len(ins_snap[u'locid_list']):
+            return u''
+
+        # new locations are committed with the first chunk
+        rsm_snap = dict(ins_snap)
+        rsm_snap[u'locid_list'] = ins_snap[u'locid_list'][cmt_event_cnt:]
+        rsm_snap[u'new_loc_list'] = []
+
+        self.rsm_snap = rsm_snap
+
+        return u'\nPress Insert to resume with the remaining {} event(s).'\
+            .format(len(rsm_snap[u'locid_list']))
 
     def _chck_occ_tbl(self):
         """
@@ -1865,15 +2361,98 @@ class InsMw(QMainWindow, FORM_CLASS):
                 self.occ_tbl.selectRow(m)
                 raise OccNotFldExc()
 
-    def _get_loc_list(self):
+    def _get_new_loc_dict(self):
         """
-        Returns a location ID list.
+        Returns new locations of 'coordinates' rows. They are used
+        for rows without the nearest location.
 
-        :returns: A location ID list.
-        :rtype: list
+        :returns:
+         | A new location dictionary:
+         |    - key - *int* -- location table row
+         |    - value - *tuple* -- a new location, see :meth:`_get_new_loc`
+        :rtype: dict
+        """
+
+        new_loc_dict = {}
+
+        tbl = self.loc_tbl
+
+        for m in range(tbl.rowCount()):
+            row_data = self._get_row_data(tbl, m)
+
+            # coordinates
+            if row_data[0] == self.loc_met_list[1]:
+                new_loc_dict[m] = self._get_new_loc(m, row_data)
+
+        return new_loc_dict
+
+    def _get_loc_list(self, locid_dict, new_loc_dict):
+        """
+        Returns a location ID list and a list of new locations.
+        New locations are inserted by the insert worker.
+        It does not use widgets so that the location table can change
+        while locations are resolved.
+
+        :param locid_dict: A location ID dictionary,
+            see :meth:`_rslv_locids`.
+        :type locid_dict: dict
+        :param new_loc_dict: A new location dictionary,
+            see :meth:`_get_new_loc_dict`.
+        :type new_loc_dict: dict
+
+        :returns:
+         | A tuple containing:
+         |    - *list* -- a location ID list
+         |    - *list* -- a list of new locations,
+         |      see :meth:`_get_new_loc`
+        :rtype: tuple
         """
 
         locid_list = []
+        new_loc_list = []
+
+        for m in sorted(set(locid_dict) | set(new_loc_dict)):
+            # locationID, nearest, nvl
+            if m in locid_dict:
+                locid = locid_dict[m]
+            # new
+            else:
+                new_loc = new_loc_dict[m]
+                new_loc_list.append(new_loc)
+                locid = new_loc[0]
+
+            if locid == 'None':
+                raise LocidMtyExc(m)
+
+            locid_list.append(locid)
+
+        return (locid_list, new_loc_list)
+
+    def _get_loc_rslv_args(self):
+        """
+        Returns arguments of :meth:`_rslv_locids` read from
+        the location table. Rows are checked and coordinates
+        of the nearest locations are transformed to UTM33.
+
+        :returns:
+         | A tuple containing:
+         |    - *dict* -- a location ID dictionary of 'locationID' rows
+         |    - *OrderedDict* -- location IDs and first rows with them
+         |    - *OrderedDict* -- `Norwegian VatLnr` codes and rows
+         |      with them
+         |    - *list* -- rows of 'nearest' coordinates
+         |    - *list* -- UTM33 points of 'nearest' coordinates
+        :rtype: tuple
+        """
+
+        locid_dict = {}
+        # location ID -> first location table row with it
+        locid_row_dict = OrderedDict()
+        # Norwegian VatLnr -> location table rows with it
+        nvl_row_dict = OrderedDict()
+        # CRS description -> location table rows and points
+        # of 'nearest' coordinates
+        nrst_pt_dict = OrderedDict()
 
         tbl = self.loc_tbl
 
@@ -1885,25 +2464,105 @@ class InsMw(QMainWindow, FORM_CLASS):
             # locationID
             if loc_met == self.loc_met_list[0]:
                 locid = self._get_locid_locid(m, row_data)
+                locid_row_dict.setdefault(locid, m)
+                locid_dict[m] = locid
             # coordinates
             elif loc_met == self.loc_met_list[1]:
-                locid = self._get_locid_coor(m, row_data)
-                if locid == 'None':
-                    raise LocidMtyExc(m)
+                try:
+                    crs_desc, opt, x, y, verb_loc = self._extr_coor_list(
+                        row_data)
+                except TypeError:
+                    raise CoorMtyExc(m)
+
+                # nearest
+                if opt == self.opt_list[1]:
+                    nrst_pt_dict.setdefault(crs_desc, []).append((m, x, y))
             # nvl
             elif loc_met == self.loc_met_list[2]:
-                locid = self._get_locid_nvl(m, row_data)
+                nvl = self._get_nvl(m, row_data)
+                nvl_row_dict.setdefault(nvl, []).append(m)
+
+        nrst_row_list = []
+        utm33_pt_list = []
+
+        for crs_desc, pt_list in nrst_pt_dict.items():
+            crs_utm33_pt_list = self.trf_svc.trf_pts(
+                self.crs_dict[crs_desc],
+                self._utm33_crs,
+                [(x, y) for m, x, y in pt_list])
+
+            nrst_row_list.extend(m for m, x, y in pt_list)
+            utm33_pt_list.extend(crs_utm33_pt_list)
+
+        return (
+            locid_dict, locid_row_dict, nvl_row_dict,
+            nrst_row_list, utm33_pt_list)
+
+    def _rslv_locids(
+            self, con, locid_dict, locid_row_dict, nvl_row_dict,
+            nrst_row_list, utm33_pt_list):
+        """
+        Returns location IDs of rows in the location table resolved
+        in the database. It does not use widgets so that it can run
+        in a database task.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param locid_dict: A location ID dictionary of 'locationID' rows.
+        :type locid_dict: dict
+        :param locid_row_dict: Location IDs and first rows with them.
+        :type locid_row_dict: OrderedDict
+        :param nvl_row_dict: `Norwegian VatLnr` codes and rows with them.
+        :type nvl_row_dict: OrderedDict
+        :param nrst_row_list: Rows of 'nearest' coordinates.
+        :type nrst_row_list: list
+        :param utm33_pt_list: UTM33 points of 'nearest' coordinates.
+        :type utm33_pt_list: list
 
-            locid_list.append(locid)
+        :returns:
+         | A location ID dictionary:
+         |    - key - *int* -- location table row
+         |    - value - *str* -- location ID
+        :rtype: dict
+        """
 
-        print(locid_list)
-        return locid_list
+        locid_dict = dict(locid_dict)
+
+        ms_locid_list = db.chck_locids(con, locid_row_dict.keys())
+
+        if len(ms_locid_list) != 0:
+            locid = ms_locid_list[0]
+            raise LocidNfExc(locid_row_dict[locid], locid)
+
+        nvl_locid_dict, ms_nvl_list = db.get_locids_from_nvls(
+            con, nvl_row_dict.keys())
+
+        if len(ms_nvl_list) != 0:
+            nvl = ms_nvl_list[0]
+            raise NvlNfExc(nvl_row_dict[nvl][0], nvl)
+
+        for nvl, m_list in nvl_row_dict.items():
+            for m in m_list:
+                locid_dict[m] = nvl_locid_dict[nvl]
+
+        if self.loc_idx is not None:
+            nrst_locid_list = self.loc_idx.get_nrst_locids(con, utm33_pt_list)
+        else:
+            nrst_locid_list = db.get_nrst_locids(
+                con,
+                [db.get_ewkb_hex(x, y) for x, y in utm33_pt_list])
+
+        for m, (locid, lake_id, dist) in zip(nrst_row_list, nrst_locid_list):
+            locid_dict[m] = str(locid)
+
+        return locid_dict
 
     def _get_locid_locid(self, m, row_data):
         """
         Returns a location ID. It is used for 'locationID' method.
-        Checks if location ID is empty, if it a valid *UUID*
-        and if it exists in the database.
+        Checks if location ID is empty and if it a valid *UUID*.
+        Existence in the database is checked for all rows at once
+        by :meth:`_rslv_locids`.
 
         :param m: A location table row.
         :type m: int
@@ -1924,25 +2583,26 @@ class InsMw(QMainWindow, FORM_CLASS):
         except ValueError:
             raise LocidFmtExc(m, locid)
 
-        if not db.chck_locid(self.mc.con, locid):
-            raise LocidNfExc(m, locid)
-
         return locid
 
-    def _get_locid_coor(self, m, row_data):
+    def _get_new_loc(self, m, row_data):
         """
-        Returns a location ID. It is used for 'coordinates' method.
+        Returns a new location. It is used for 'coordinates' method
+        with 'new' option, the nearest locations are found
+        for all rows at once by :meth:`_rslv_locids`.
         Checks if both X and Y coordinates are entered.
-        Based on option it inserts new location or returns location ID
-        of the nearest location.
 
         :param m: A location table row.
         :type m: int
         :param row_data: Data in location table row.
         :type row_data: list
 
-        :returns: A location ID of new location or the nearest location.
-        :rtype: str
+        :returns:
+         | A tuple containing:
+         |    - *uuid.UUID* -- a location ID
+         |    - *str* -- a geometry in UTM33 (EPSG: 25833)
+         |    - *str* -- a verbatim locality
+        :rtype: tuple
         """
 
         try:
@@ -1950,62 +2610,29 @@ class InsMw(QMainWindow, FORM_CLASS):
         except TypeError:
             raise CoorMtyExc(m)
 
-        srid = self.crs_dict[crs_desc].authid().split(u':')[1]
-
-        # new
-        if opt == self.opt_list[0]:
-            locid = uuid.uuid4()
+        utm33_x, utm33_y = self._trf_coord(
+            self.crs_dict[crs_desc], self._utm33_crs, x, y)
 
-            mpt_str = db.get_mpt_str(x, y)
-            utm33_geom = db.get_utm33_geom(self.mc.con, mpt_str, srid)
-            db.ins_new_loc(self.mc.con, locid, utm33_geom, verb_loc)
-            db.ins_loc_log(
-                self.mc.con,
-                locid,
-                verb_loc,
-                self.mc.con_info[self.mc.usr_str])
-        # nearest
-        elif opt == self.opt_list[1]:
-            locid = self._get_nrst_locid(x, y, srid)
+        locid = uuid.uuid4()
 
-        return locid
+        utm33_geom = db.get_ewkb_hex(utm33_x, utm33_y, multi=True)
 
-    def _get_nrst_locid(self, x, y, srid):
-        """
-        Returns a location ID of the nearest location.
-
-        :param x: X coordinate.
-        :type x: float
-        :param y: Y coordinate.
-        :type y: float
-        :param srid: SRID.
-        :type srid: int
+        return (locid, utm33_geom, verb_loc)
 
-        :returns: A location ID of the nearest location.
-        :rtype: str
+    def _get_nvl(self, m, row_data):
         """
-
-        pt_str = db.get_pt_str(x, y)
-        utm33_geom = db.get_utm33_geom(self.mc.con, pt_str, srid)
-        locid = db.get_nrst_locid(self.mc.con, utm33_geom)
-
-        locid = str(locid)
-
-        return locid
-
-    def _get_locid_nvl(self, m, row_data):
-        """
-        Returns a location ID. It is used for 'Norwegian VatLnr' method.
+        Returns a Norwegian VatLnr. It is used for 'Norwegian VatLnr' method.
         Checks if Norwegian VatLnr is empty.
-        It searches for location ID with the given Norwegian VatLnr.
+        Location IDs are resolved for all rows at once
+        by :meth:`_rslv_locids`.
 
         :param m: A location table row.
         :type m: int
         :param row_data: Data in location table row.
         :type row_data: list
 
-        :returns: A location ID with the given Norwegian VatLnr.
-        :rtype: str
+        :returns: A Norwegian VatLnr.
+        :rtype: int
         """
 
         try:
@@ -2013,12 +2640,7 @@ class InsMw(QMainWindow, FORM_CLASS):
         except TypeError:
             raise NvlMtyExc(m)
 
-        try:
-            locid = db.get_locid_from_nvl(self.mc.con, nvl)
-        except TypeError:
-            raise NvlNfExc(m, nvl)
-
-        return locid
+        return nvl
 
     def get_wdg_list(self, wdgs, pydate=True, forbi=False):
         """
@@ -2129,18 +2751,50 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         return occ_row_list
 
-    def _ins_txncvg(self, event_id):
+    def _get_occ_list(self):
         """
-        Inserts all checked taxons into the database.
+        Returns an occurrence list. Taxon and ecotype IDs are resolved
+        only once for each row in the occurrence table.
 
-        :param event_id: An event ID.
-        :type event_id: uuid.UUID
+        :returns:
+         | A list of tuples containing:
+         |    - *int* -- taxon ID
+         |    - *int* -- ecotype ID, None when there is no ecotype
+         |    - *list* -- a list of data in the row in the occurrence table
+        :rtype: list
         """
 
-        for txn in self._ckd_txns:
-            txn_id = db.get_txn_id(self.mc.con, txn)
+        occ_list = []
+
+        for m in range(self.occ_tbl.rowCount()):
+            occ_row_list = self._get_occ_row_list(m)
+
+            txn_id = self.txn_idx.get_txn_id(occ_row_list[0])
+            ectp_id = self.txn_idx.get_ectp_id(
+                occ_row_list[1], occ_row_list[0])
 
-            db.ins_txncvg(self.mc.con, txn_id, event_id)
+            # an occurrence is not inserted without its chosen ecotype
+            if occ_row_list[1] is not None and ectp_id is None:
+                raise EctpNfExc(m, occ_row_list[1])
+
+            occ_list.append((txn_id, ectp_id, occ_row_list))
+
+        return occ_list
+
+    @property
+    def _ckd_txn_ids(self):
+        """
+        Returns IDs of all checked taxons
+        from the taxon coverage tree widget.
+
+        :returns: A list of IDs of all checked taxons.
+        :rtype: list
+        """
+
+        txn_id_list = [
+            self.txn_idx.get_txn_id(txn) for txn in self._ckd_txns]
+
+        return txn_id_list
 
     @property
     def _ckd_txns(self):
@@ -2314,11 +2968,266 @@ class InsMw(QMainWindow, FORM_CLASS):
                 u'{}: {}'.format(hdr, unicode(item) if item else u''))
             lw.addItem(lw_item)
 
+    def warm_up(self, rvld=False):
+        """
+        Starts loading data needed by :meth:`prep` in a database task
+        right after a connection is made, so that the window can be shown
+        without waiting for the database.
+        A running warm-up for the same connection is kept.
+
+        :param rvld: True to revalidate a snapshot widgets were populated
+            from, False otherwise.
+        :type rvld: bool
+        """
+
+        con_info = self.mc.con_info
+
+        task = self.db_task_mngr.get_task(u'prep')
+
+        if task is not None and task.con_info == con_info:
+            return
+
+        self.prep_data = None
+        self.prep_con_info = con_info
+
+        if not rvld:
+            self.snap_dict = None
+
+        self.db_task_mngr.run(
+            u'prep',
+            self._load_prep_data,
+            (self._get_snap_path(con_info), rvld),
+            self._fin_warm_up,
+            self._fail_warm_up)
+
+    def _get_snap_path(self, con_info):
+        """
+        Returns a path to a snapshot file of lookup lists
+        of the given connection.
+
+        :param con_info: A connection information dictionary.
+        :type con_info: dict
+
+        :returns: A path to a snapshot file, None when snapshots are off.
+        :rtype: str
+        """
+
+        if self.snap_dir is None:
+            return None
+
+        snap_path = lkp_snap.get_snap_path(
+            self.snap_dir,
+            con_info[self.mc.host_str],
+            con_info[self.mc.port_str],
+            con_info[self.mc.db_str])
+
+        return snap_path
+
+    def _load_prep_data(self, con, snap_path, rvld):
+        """
+        Loads lookup lists in one query and indices built from them
+        and saves them to a snapshot file.
+        It runs in a database task.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param snap_path: A path to a snapshot file, None not to save
+            a snapshot.
+        :type snap_path: str
+        :param rvld: True to load also lists that are cached,
+            False otherwise.
+        :type rvld: bool
+
+        :returns:
+         | A tuple containing:
+         |    - *nofa.txn_idx.TxnIdx* -- a taxonomy index
+         |    - *nofa.admin_idx.AdminIdx* -- an administrative index
+         |    - *dict* -- a snapshot of cached lookup lists
+        :rtype: tuple
+        """
+
+        # versions are read first so that changes during loading
+        # are found by the next check
+        db.chck_tbl_vers(con)
+
+        # administrative lists are not part of the lookup query
+        if rvld:
+            db.invalidate(*db.get_admin_idx_list.cache_tbls)
+
+        db.load_lkp_lists(con)
+
+        prep_data = (
+            txn_idx.get_txn_idx(con),
+            admin_idx.get_admin_idx(con),
+            db.get_cache_snap(con))
+
+        if snap_path is not None:
+            try:
+                lkp_snap.save_snap(
+                    snap_path, db.get_schema_stamp(con), prep_data[2])
+            except (IOError, OSError) as e:
+                QgsMessageLog.logMessage(
+                    u'Snapshot not saved: {}'.format(e),
+                    self.app_name,
+                    QgsMessageLog.WARNING)
+
+        return prep_data
+
+    def _load_lkp_snap(self):
+        """
+        Loads lookup lists from a snapshot file saved for the current
+        database and schema and prepares data to populate widgets.
+
+        :returns: True when a snapshot was loaded, False otherwise.
+        :rtype: bool
+        """
+
+        snap_path = self._get_snap_path(self.mc.con_info)
+
+        if snap_path is None:
+            return False
+
+        snap_dict = lkp_snap.load_snap(
+            snap_path, db.get_schema_stamp(self.mc.con))
+
+        if snap_dict is None:
+            return False
+
+        db.load_cache_snap(self.mc.con, snap_dict)
+
+        self.prep_data = (
+            txn_idx.get_txn_idx(self.mc.con),
+            admin_idx.get_admin_idx(self.mc.con),
+            snap_dict)
+        self.prep_con_info = self.mc.con_info
+        self.snap_dict = snap_dict
+
+        return True
+
+    def _rvld_lkp_snap(self, prep_data):
+        """
+        Populates widgets again when lookup lists in the database
+        differ from the snapshot widgets were populated from.
+
+        :param prep_data: Data loaded by :meth:`_load_prep_data`.
+        :type prep_data: tuple
+        """
+
+        snap_dict = self.snap_dict
+        new_snap_dict = prep_data[2]
+
+        self.snap_dict = None
+        self.prep_con_info = None
+
+        if all(new_snap_dict.get(key) == val
+               for key, val in snap_dict.items()):
+            return
+
+        self.txn_idx, self.admin_idx = prep_data[:2]
+
+        self._fetch_nofa_schema()
+
+        QgsMessageLog.logMessage(
+            u'Lookup lists changed since the last start, '
+            u'widgets were populated again.',
+            self.app_name)
+
+    def _fin_warm_up(self, prep_data):
+        """
+        Keeps data loaded by the warm-up and populates widgets
+        when the window is waiting for them.
+
+        :param prep_data: Data loaded by :meth:`_load_prep_data`.
+        :type prep_data: tuple
+        """
+
+        if self.snap_dict is not None and not self.prep_pend:
+            self._rvld_lkp_snap(prep_data)
+            return
+
+        self.snap_dict = None
+        self.prep_data = prep_data
+
+        if self.prep_pend:
+            self._fin_prep()
+
+    def _fail_warm_up(self, e, tb):
+        """
+        Reports a failed warm-up, the user is told only when the window
+        is waiting for it.
+
+        :param e: An exception raised in the task.
+        :type e: Exception
+        :param tb: A formatted traceback.
+        :type tb: str
+        """
+
+        self.prep_con_info = None
+        self.snap_dict = None
+
+        if not self.prep_pend:
+            QgsMessageLog.logMessage(
+                u'Warm-up failed:\n{}'.format(tb),
+                self.app_name,
+                QgsMessageLog.WARNING)
+            return
+
+        self.prep_pend = False
+        self.statusBar().clearMessage()
+
+        self._fail_db_task(e, tb)
+
     def prep(self):
         """
         Prepares the whole plugin to be shown.
+        Widgets are populated from a snapshot of the last start
+        at once or when the warm-up finishes,
+        the time it takes is written to the log.
+        """
+
+        self.prep_strt_ts = time.time()
+
+        # results of the previous connection are not wanted anymore
+        self.db_task_mngr.cncl_all(False, (u'prep',))
+        self.rsm_snap = None
+
+        # tiles are loaded lazily for the new connection
+        if self.loc_idx is not None:
+            self.loc_idx.clear()
+
+        self.prep_pend = True
+        self.ins_btn.setEnabled(False)
+        self.statusBar().showMessage(u'Loading...')
+
+        con_info = self.mc.con_info
+
+        task = self.db_task_mngr.get_task(u'prep')
+
+        if self.prep_data is not None and self.prep_con_info == con_info:
+            self._fin_prep()
+        elif (task is None or task.con_info != con_info) \
+                and self._load_lkp_snap():
+            self._fin_prep()
+            self.warm_up(True)
+        else:
+            self.warm_up()
+
+    @instr.Act(u'prep')
+    def _fin_prep(self):
+        """
+        Populates widgets with data loaded by the warm-up.
+        Data are used only once so that the next preparation
+        loads them again.
         """
 
+        strt_miss_cnt = db.get_cache_stats()[u'miss']
+
+        self.txn_idx, self.admin_idx = self.prep_data[:2]
+
+        self.prep_data = None
+        self.prep_con_info = None
+        self.prep_pend = False
+
         self._fetch_nofa_schema()
 
         self._rst_loc_tbl()
@@ -2327,6 +3236,15 @@ class InsMw(QMainWindow, FORM_CLASS):
         self._rst_occ_tbl()
         self._rst_txncvg_tw()
 
+        self.statusBar().clearMessage()
+        self.ins_btn.setEnabled(self.ins_thrd is None)
+
+        QgsMessageLog.logMessage(
+            u'Prepared in {:.3f} s, {} list(s) not loaded in advance.'.format(
+                time.time() - self.prep_strt_ts,
+                db.get_cache_stats()[u'miss'] - strt_miss_cnt),
+            self.app_name)
+
     def _fetch_nofa_schema(self):
         """
         Fetches data from the `NOFA` schema and populates widgets.
@@ -2518,8 +3436,8 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         loc_cb_dict = {
             self.cntry_code_cb: [
-                db.get_cntry_code_list,
-                [self.mc.con],
+                self.admin_idx.get_cntry_code_list,
+                [],
                 self.all_str],
             self.loc_edit_crs_cb: [
                 self._get_srs_desc_list,
@@ -2559,8 +3477,8 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         cnty_cb_dict = {
             self.cnty_cb: [
-                db.get_cnty_list,
-                [self.mc.con, self._cntry_code],
+                self.admin_idx.get_cnty_list,
+                [self._cntry_code],
                 self.all_str]}
 
         return cnty_cb_dict
@@ -2579,8 +3497,8 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         muni_cb_dict = {
             self.muni_cb: [
-                db.get_muni_list,
-                [self.mc.con, self._cntry_code, self._cnty],
+                self.admin_idx.get_muni_list,
+                [self._cntry_code, self._cnty],
                 self.all_str]}
 
         return muni_cb_dict
@@ -2627,8 +3545,8 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         ectp_cb_dict = {
             self.ectp_cb: [
-                db.get_ectp_list,
-                [self.mc.con, self._txn],
+                self.txn_idx.get_ectp_list,
+                [self._txn],
                 self.mty_str]}
 
         return ectp_cb_dict
@@ -2766,8 +3684,8 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         occ_mand_cb_dict = {
             self.txn_cb: [
-                db.get_txn_list,
-                [self.mc.con],
+                self.txn_idx.get_txn_list,
+                [],
                 self.sel_str],
             self.occstat_cb: [
                 db.get_occstat_list,
@@ -2795,7 +3713,7 @@ class InsMw(QMainWindow, FORM_CLASS):
 
         self.txncvg_tw.clear()
 
-        fam_dict = db.get_fam_dict(self.mc.con)
+        fam_dict = self.txn_idx.fam_dict
 
         root_item = QTreeWidgetItem(self.txncvg_tw, ["All"])
         root_item.setCheckState(0, Qt.Unchecked)
@@ -3001,8 +3919,7 @@ class InsMw(QMainWindow, FORM_CLASS):
 
     def _create_tbl_hist_tab(self, tbl, tbl_list, tbl_hdrs):
         """
-        Creates a table with one row.
-        This method is used for creating tables in the history tab.
+        Creates a table in the history tab.
 
         :param tbl: A table.
         :type tbl: QTableWidget
@@ -3016,11 +3933,29 @@ class InsMw(QMainWindow, FORM_CLASS):
         tbl.setSelectionBehavior(QTableWidget.SelectItems)
         tbl.setSelectionMode(QTableWidget.ExtendedSelection)
         tbl.setEditTriggers(QAbstractItemView.NoEditTriggers)
-        tbl.setSortingEnabled(True)
         tbl.setHorizontalHeaderLabels(tbl_hdrs)
-        tbl.setRowCount(len(tbl_list))
+        tbl.setRowCount(0)
+
+        self._add_hist_tbl_rows(tbl, tbl_list)
+
+        tbl.resizeColumnsToContents()
 
-        for m, row in enumerate(tbl_list):
+    def _add_hist_tbl_rows(self, tbl, tbl_list):
+        """
+        Adds rows to the end of a table in the history tab.
+
+        :param tbl: A table.
+        :type tbl: QTableWidget
+        :param tbl_list: Table list.
+        :type tbl_list: list
+        """
+
+        tbl.setSortingEnabled(False)
+
+        row_cnt = tbl.rowCount()
+        tbl.setRowCount(row_cnt + len(tbl_list))
+
+        for m, row in enumerate(tbl_list, row_cnt):
             for n, item in enumerate(row):
                 if isinstance(item, datetime.datetime):
                     item = QDateTime(item)
@@ -3031,7 +3966,7 @@ class InsMw(QMainWindow, FORM_CLASS):
                 tbl_item.setData(Qt.EditRole, item)
                 tbl.setItem(m, n, tbl_item)
 
-        tbl.resizeColumnsToContents()
+        tbl.setSortingEnabled(True)
 
     def _add_tbl_mty_row_items(self, tbl, tbl_hdrs, m):
         """
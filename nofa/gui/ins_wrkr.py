@@ -0,0 +1,257 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ InsWrkr
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from PyQt4.QtCore import QObject, pyqtSignal
+
+import threading
+import time
+import traceback
+import uuid
+
+import psycopg2
+import psycopg2.extensions
+
+from .. import db, instr
+
+
+# seconds between two progress reports
+PROG_INTVL = 0.25
+
+
+class InsCnclExc(Exception):
+    """
+    A custom exception when an insert is cancelled.
+    """
+
+    pass
+
+
+class InsWrkr(QObject):
+    """
+    A worker that inserts a snapshot of the main window
+    with its own connection in a background thread.
+
+    Rows are committed once at the end unless a commit size is set,
+    then they are committed in chunks and when the insert fails
+    or is cancelled only the current chunk is rolled back.
+    """
+
+    # rows written, rows in total, rows written per second
+    prog = pyqtSignal(int, int, float)
+    # events committed, True when the insert was cancelled
+    fin = pyqtSignal(int, bool)
+    # exception, formatted traceback
+    err = pyqtSignal(object, object)
+
+    def __init__(self, con_pool, con_info, ins_snap, cmt_size):
+        """
+        Constructor.
+
+        :param con_pool: A connection pool.
+        :type con_pool: nofa.con_pool.ConPool
+        :param con_info: A connection information dictionary.
+        :type con_info: dict
+        :param ins_snap: A snapshot of data to be inserted,
+            see :meth:`nofa.gui.ins_mw.InsMw._get_ins_snap`.
+        :type ins_snap: dict
+        :param cmt_size: A number of rows after which the transaction
+            is committed, 0 to commit only once at the end.
+        :type cmt_size: int
+        """
+
+        super(InsWrkr, self).__init__()
+
+        self.con_pool = con_pool
+        self.con_info = con_info
+        self.ins_snap = ins_snap
+        self.cmt_size = cmt_size
+
+        self.lock = threading.Lock()
+        self.con = None
+        self.cncld = False
+        self.cmt_event_cnt = 0
+
+        self.row_tot = 0
+        self.wrt_row_cnt = 0
+        self.strt_ts = None
+        self.prog_ts = 0
+
+    def cncl(self):
+        """
+        Cancels the insert. It is called from the main thread,
+        a running statement is cancelled in the database.
+        """
+
+        with self.lock:
+            self.cncld = True
+
+            if self.con is not None:
+                try:
+                    self.con.cancel()
+                except psycopg2.Error:
+                    pass
+
+    def run(self):
+        """
+        Runs the insert and emits a signal when it is finished.
+        """
+
+        try:
+            with instr.Act(u'insert'):
+                con = self.con_pool.get_con(self.con_info)
+
+                with self.lock:
+                    self.con = con
+
+                try:
+                    if self.cncld:
+                        raise InsCnclExc()
+
+                    self._ins()
+                finally:
+                    # the connection is not cancelled once it is returned
+                    with self.lock:
+                        self.con = None
+
+                    self.con_pool.put_con(con)
+        except InsCnclExc:
+            self.fin.emit(self.cmt_event_cnt, True)
+        except psycopg2.extensions.QueryCanceledError as e:
+            if self.cncld:
+                self.fin.emit(self.cmt_event_cnt, True)
+            else:
+                self.err.emit(e, traceback.format_exc())
+        except Exception as e:
+            self.err.emit(e, traceback.format_exc())
+        else:
+            self.fin.emit(self.cmt_event_cnt, False)
+
+    def _ins(self):
+        """
+        Inserts new locations, events, taxonomic coverages, occurrences
+        and their logs.
+        """
+
+        ins_snap = self.ins_snap
+
+        locid_list = ins_snap[u'locid_list']
+        event_list = ins_snap[u'event_list']
+        dtst_id = ins_snap[u'dtst_id']
+        prj_id = ins_snap[u'prj_id']
+        ref_id = ins_snap[u'ref_id']
+        usr = ins_snap[u'usr']
+        txncvg_id_list = ins_snap[u'txncvg_id_list']
+        occ_list = ins_snap[u'occ_list']
+
+        event_cnt = len(locid_list)
+
+        # events and their logs, taxonomic coverages, occurrences
+        # and their logs
+        self.row_tot = \
+            event_cnt * (2 + len(txncvg_id_list) + 2 * len(occ_list))
+        self.strt_ts = time.time()
+
+        with db.InsSess(self.con, wrt_cb=self._wrt) as ins_sess:
+            # new locations are inserted in the first chunk
+            for locid, utm33_geom, verb_loc in ins_snap[u'new_loc_list']:
+                db.ins_new_loc(self.con, locid, utm33_geom, verb_loc)
+                db.ins_loc_log(self.con, locid, verb_loc, usr)
+
+            for i, loc_id in enumerate(locid_list):
+                if self.cncld:
+                    raise InsCnclExc()
+
+                event_id = uuid.uuid4()
+
+                ins_sess.add_rows(
+                    db.ins_events,
+                    [db.get_event_row(
+                        loc_id, event_id, event_list,
+                        dtst_id, prj_id, ref_id)])
+                ins_sess.add_rows(
+                    db.ins_event_logs,
+                    [db.get_event_log_row(
+                        loc_id, event_id, dtst_id, prj_id, ref_id, usr)])
+
+                ins_sess.add_rows(
+                    db.ins_txncvgs,
+                    [db.get_txncvg_row(txn_id, event_id)
+                     for txn_id in txncvg_id_list])
+
+                occ_rows = []
+                occ_log_rows = []
+
+                for txn_id, ectp_id, occ_row_list in occ_list:
+                    occ_id = uuid.uuid4()
+
+                    occ_rows.append(db.get_occ_row(
+                        occ_id, txn_id, ectp_id, occ_row_list, event_id))
+                    occ_log_rows.append(db.get_occ_log_row(
+                        occ_id, event_id, dtst_id, prj_id, ref_id,
+                        loc_id, usr))
+
+                ins_sess.add_rows(db.ins_occs, occ_rows)
+                ins_sess.add_rows(db.ins_occ_logs, occ_log_rows)
+
+                if self.cmt_size and ins_sess.row_cnt >= self.cmt_size:
+                    ins_sess.cmt()
+                    self.cmt_event_cnt = i + 1
+
+            if self.cncld:
+                raise InsCnclExc()
+
+        self.cmt_event_cnt = event_cnt
+
+        self._emit_prog()
+
+    def _wrt(self, row_cnt):
+        """
+        Counts rows written by the insert session and reports progress.
+
+        :param row_cnt: A number of written rows.
+        :type row_cnt: int
+        """
+
+        self.wrt_row_cnt += row_cnt
+
+        if time.time() - self.prog_ts >= PROG_INTVL:
+            self._emit_prog()
+
+        # rows that are not committed yet are rolled back
+        if self.cncld:
+            raise InsCnclExc()
+
+    def _emit_prog(self):
+        """
+        Emits a number of written rows.
+        """
+
+        self.prog_ts = time.time()
+
+        self.prog.emit(
+            self.wrt_row_cnt,
+            self.row_tot,
+            self.wrt_row_cnt / max(self.prog_ts - self.strt_ts, 1e-6))
@@ -0,0 +1,305 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ LocIdx
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from qgis.core import (
+    QgsFeature, QgsGeometry, QgsPoint, QgsRectangle, QgsSpatialIndex)
+
+import math
+import threading
+import time
+
+from .. import db
+
+
+class LocIdx(object):
+    """
+    A local spatial index of lakes and their locations in UTM33
+    (EPSG: 25833) that answers nearest location queries
+    without a database round trip per point.
+
+    Lakes are loaded lazily in square tiles around queried points
+    and tiles are loaded again when they are older than their time to live.
+    The index can be queried from database tasks, queries are serialized.
+    """
+
+    def __init__(self, tile_size=10000.0, ttl=None):
+        """
+        Constructor.
+
+        :param tile_size: A tile size in meters.
+        :type tile_size: float
+        :param ttl: Seconds a tile is valid for,
+            time to live of cached locations when None.
+        :type ttl: int
+        """
+
+        self.tile_size = tile_size
+        self.ttl = ttl if ttl is not None else db.CACHE_TTL_DICT[u'location']
+
+        self.lock = threading.Lock()
+
+        self.clear()
+
+    def clear(self):
+        """
+        Removes all lakes and locations from the index.
+        """
+
+        with self.lock:
+            self.lake_sidx = QgsSpatialIndex()
+            # lake ID -> geometry
+            self.lake_geom_dict = {}
+            # lake ID -> location ID -> point
+            self.lake_loc_dict = {}
+            # (column, row) -> time the tile was loaded
+            self.tile_ts_dict = {}
+            # (column, row) -> IDs of lakes loaded for the tile
+            self.tile_lake_dict = {}
+
+    def _get_tile_keys(self, x, y, radius):
+        """
+        Returns keys of tiles that intersect a square
+        around the given point.
+
+        :param x: X coordinate.
+        :type x: float
+        :param y: Y coordinate.
+        :type y: float
+        :param radius: A half of the square side.
+        :type radius: float
+
+        :returns: A list of tile keys.
+        :rtype: list
+        """
+
+        col_min = int(math.floor((x - radius) / self.tile_size))
+        col_max = int(math.floor((x + radius) / self.tile_size))
+        row_min = int(math.floor((y - radius) / self.tile_size))
+        row_max = int(math.floor((y + radius) / self.tile_size))
+
+        tile_key_list = [
+            (col, row)
+            for col in range(col_min, col_max + 1)
+            for row in range(row_min, row_max + 1)]
+
+        return tile_key_list
+
+    def _load_tile(self, con, tile_key):
+        """
+        Loads lakes and locations of the given tile.
+        Lakes that are already in the index are replaced,
+        lakes loaded for the tile before that are not returned anymore
+        are removed unless another tile contains them.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param tile_key: A tile key.
+        :type tile_key: tuple
+        """
+
+        col, row = tile_key
+
+        lake_list, loc_list = db.get_tile_lake_loc_lists(
+            con,
+            col * self.tile_size,
+            row * self.tile_size,
+            (col + 1) * self.tile_size,
+            (row + 1) * self.tile_size)
+
+        lake_id_set = set([lake_id for lake_id, wkt in lake_list])
+
+        # lakes that were deleted or moved out of the tile
+        for lake_id in self.tile_lake_dict.get(tile_key, set()) - lake_id_set:
+            if not any(
+                    lake_id in other_lake_id_set
+                    for other_tile_key, other_lake_id_set
+                    in self.tile_lake_dict.items()
+                    if other_tile_key != tile_key):
+                self._del_lake(lake_id)
+
+        self.tile_lake_dict[tile_key] = lake_id_set
+
+        for lake_id, wkt in lake_list:
+            if lake_id in self.lake_geom_dict:
+                self.lake_sidx.deleteFeature(
+                    self._get_lake_feat(lake_id, self.lake_geom_dict[lake_id]))
+
+            geom = QgsGeometry.fromWkt(wkt)
+            self.lake_geom_dict[lake_id] = geom
+            self.lake_sidx.insertFeature(self._get_lake_feat(lake_id, geom))
+            self.lake_loc_dict[lake_id] = {}
+
+        for locid, lake_id, x, y in loc_list:
+            self.lake_loc_dict[lake_id][locid] = QgsPoint(x, y)
+
+        self.tile_ts_dict[tile_key] = time.time()
+
+    def _del_lake(self, lake_id):
+        """
+        Removes the given lake and its locations from the index.
+
+        :param lake_id: A lake ID.
+        :type lake_id: int
+        """
+
+        geom = self.lake_geom_dict.pop(lake_id, None)
+
+        if geom is not None:
+            self.lake_sidx.deleteFeature(self._get_lake_feat(lake_id, geom))
+
+        self.lake_loc_dict.pop(lake_id, None)
+
+    def _get_lake_feat(self, lake_id, geom):
+        """
+        Returns a lake feature that is stored in the spatial index.
+
+        :param lake_id: A lake ID.
+        :type lake_id: int
+        :param geom: A lake geometry.
+        :type geom: QgsGeometry
+
+        :returns: A lake feature.
+        :rtype: QgsFeature
+        """
+
+        lake_feat = QgsFeature(lake_id)
+        lake_feat.setGeometry(geom)
+
+        return lake_feat
+
+    def load(self, con, utm33_pt_list, radius=None):
+        """
+        Loads tiles needed by the given points
+        that are not loaded or are too old.
+
+        :param con: A connection.
+        :type con: psycopg2.connection
+        :param utm33_pt_list: A list of tuples containing X and Y
+            coordinates in UTM33 (EPSG: 25833).
+        :type utm33_pt_list: list
+        :param radius: A radius in meters within which the nearest lake
+            is searched for, :data:`nofa.db.NRST_RADIUS` when None.
+        :type radius: float
+        """
+
+        if radius is None:
+            radius = db.NRST_RADIUS
+
+        now = time.time()
+
+        tile_key_set = set()
+
+        for x, y in utm33_pt_list:
+            tile_key_set.update(self._get_tile_keys(x, y, radius))
+
+        for tile_key in sorted(tile_key_set):
+            ts = self.tile_ts_dict.get(tile_key)
+            if ts is None or now - ts > self.ttl:
+                self._load_tile(con, tile_key)
+
+    def get_nrst_locids(self, con, utm33_pt_list, radius=None):
+        """
+        Returns IDs of the nearest locations of the given points.
+        For every point the nearest lake within the given radius is found
+        and then the nearest location in that lake,
+        see :func:`nofa.db.get_nrst_locids`.
+
+        :param con: A connection used to load missing tiles.
+        :type con: psycopg2.connection
+        :param utm33_pt_list: A list of tuples containing X and Y
+            coordinates in UTM33 (EPSG: 25833).
+        :type utm33_pt_list: list
+        :param radius: A radius in meters within which the nearest lake
+            is searched for, :data:`nofa.db.NRST_RADIUS` when None.
+        :type radius: float
+
+        :returns:
+         | A list of tuples, one for every point in the given order,
+         | containing:
+         |    - *uuid.UUID* -- a location ID, None when there is no lake
+         |      within the given distance
+         |    - *int* -- a lake ID, None when there is no lake
+         |      within the given distance
+         |    - *float* -- a distance to the location in meters
+        :rtype: list
+        """
+
+        if radius is None:
+            radius = db.NRST_RADIUS
+
+        with self.lock:
+            self.load(con, utm33_pt_list, radius)
+
+            nrst_locid_list = []
+
+            for x, y in utm33_pt_list:
+                nrst_locid_list.append(self._get_nrst_locid(x, y, radius))
+
+        return nrst_locid_list
+
+    def _get_nrst_locid(self, x, y, radius):
+        """
+        Returns the nearest location of the given point.
+
+        :param x: X coordinate in UTM33 (EPSG: 25833).
+        :type x: float
+        :param y: Y coordinate in UTM33 (EPSG: 25833).
+        :type y: float
+        :param radius: A radius in meters within which the nearest lake
+            is searched for.
+        :type radius: float
+
+        :returns:
+         | A tuple containing:
+         |    - *uuid.UUID* -- a location ID
+         |    - *int* -- a lake ID
+         |    - *float* -- a distance to the location in meters
+        :rtype: tuple
+        """
+
+        pt_geom = QgsGeometry.fromPoint(QgsPoint(x, y))
+
+        lake_id = None
+        lake_dist = None
+
+        for cand_id in self.lake_sidx.intersects(
+                QgsRectangle(x - radius, y - radius, x + radius, y + radius)):
+            dist = self.lake_geom_dict[cand_id].distance(pt_geom)
+            if dist <= radius and (lake_dist is None or dist < lake_dist):
+                lake_id = cand_id
+                lake_dist = dist
+
+        locid = None
+        loc_dist = None
+
+        if lake_id is not None:
+            for cand_locid, pt in self.lake_loc_dict[lake_id].items():
+                dist = math.hypot(pt.x() - x, pt.y() - y)
+                if loc_dist is None or dist < loc_dist:
+                    locid = cand_locid
+                    loc_dist = dist
+
+        return (locid, lake_id, loc_dist)
@@ -0,0 +1,117 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TrfSvc
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from qgis.core import QgsCoordinateTransform, QgsPoint
+
+
+class TrfSvc(object):
+    """
+    A coordinate transformation service that keeps transformations
+    between pairs of CRSs so that they are created only once.
+    """
+
+    def __init__(self):
+        """
+        Constructor.
+        """
+
+        # (input CRS proj4, output CRS proj4) -> transformation
+        self.trf_dict = {}
+
+    def get_trf(self, in_crs, out_crs):
+        """
+        Returns a transformation from the input CRS to the output CRS.
+
+        :param in_crs: An input CRS.
+        :type in_crs: QgsCoordinateReferenceSystem
+        :param out_crs: An output CRS.
+        :type out_crs: QgsCoordinateReferenceSystem
+
+        :returns: A transformation.
+        :rtype: QgsCoordinateTransform
+        """
+
+        # custom CRSs have no authid, proj4 tells them apart
+        key = (in_crs.toProj4(), out_crs.toProj4())
+
+        try:
+            trf = self.trf_dict[key]
+        except KeyError:
+            trf = QgsCoordinateTransform(in_crs, out_crs)
+            self.trf_dict[key] = trf
+
+        return trf
+
+    def trf_pt(self, in_crs, out_crs, in_x, in_y):
+        """
+        Transforms the given X and Y coordinates from the input CRS
+        to the output CRS.
+
+        :param in_crs: An input CRS.
+        :type in_crs: QgsCoordinateReferenceSystem
+        :param out_crs: An output CRS.
+        :type out_crs: QgsCoordinateReferenceSystem
+        :param in_x: An input X coordinate.
+        :type in_x: float
+        :param in_y: An input Y coordinate.
+        :type in_y: float
+
+        :returns: X and Y coordinates in the output CRS.
+        :rtype: tuple
+        """
+
+        return self.trf_pts(in_crs, out_crs, [(in_x, in_y)])[0]
+
+    def trf_pts(self, in_crs, out_crs, in_pt_list):
+        """
+        Transforms the given points from the input CRS to the output CRS
+        locally with one transformation.
+
+        :param in_crs: An input CRS.
+        :type in_crs: QgsCoordinateReferenceSystem
+        :param out_crs: An output CRS.
+        :type out_crs: QgsCoordinateReferenceSystem
+        :param in_pt_list: A list of tuples containing X and Y coordinates
+            in the input CRS.
+        :type in_pt_list: list
+
+        :returns: A list of tuples containing X and Y coordinates
+            in the output CRS.
+        :rtype: list
+        """
+
+        if in_crs == out_crs:
+            return [(float(x), float(y)) for x, y in in_pt_list]
+
+        trf = self.get_trf(in_crs, out_crs)
+
+        out_pt_list = []
+
+        for in_x, in_y in in_pt_list:
+            out_pt = trf.transform(QgsPoint(float(in_x), float(in_y)))
+            out_pt_list.append((out_pt.x(), out_pt.y()))
+
+        return out_pt_list
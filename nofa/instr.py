@@ -0,0 +1,508 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ Instr
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from collections import OrderedDict
+import datetime
+import functools
+import io
+import json
+import re
+import sys
+import threading
+import time
+
+import psycopg2.extensions
+
+
+# milliseconds from which a query is written to the slow query log
+SLOW_QRY_MS = 500
+
+# diagnostics file the plans of explained queries are appended to,
+# None when queries are not explained
+EXPLAIN_PATH = None
+
+# functions whose SELECTs are explained in diagnostic mode
+EXPLAIN_FNCS = frozenset([
+    u'get_loc_by_fltrs',
+    u'get_nrst_loc_cands',
+    u'get_nrst_locids',
+    u'get_hist_occ_list',
+    u'get_hist_loc_list',
+    u'get_hist_event_list',
+    u'get_hist_dtst_list',
+    u'get_hist_prj_list',
+    u'get_hist_ref_list'])
+
+# action of queries run outside of any action
+OTHER_ACT = u'other'
+
+# name of the module whose functions are recorded as calling functions
+_DB_MOD = __name__.rsplit(u'.', 1)[0] + u'.db'
+
+# literals and repeated placeholders are replaced so that queries
+# differing only in their values have the same fingerprint
+_FP_RE_LIST = [
+    (re.compile(r"'(?:[^']|'')*'"), u'?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), u'?'),
+    (re.compile(r'\s+'), u' '),
+    (re.compile(r'\?(?:\s*,\s*\?)+'), u'?, ...'),
+    (re.compile(r'\(\?, \.\.\.\)(?:\s*,\s*\(\?, \.\.\.\))+'),
+     u'(?, ...), ...')]
+
+# maximum length of a fingerprint
+_FP_LEN = 200
+
+# (action, function, fingerprint) -> [count, seconds, max seconds, rows]
+_stats_dict = {}
+_stats_lock = threading.Lock()
+
+# current action of every thread
+_loc = threading.local()
+
+# function that writes a log message
+_log_cb = [None]
+
+_explain_lock = threading.Lock()
+
+
+def set_slow_qry_ms(ms):
+    """
+    Sets milliseconds from which a query is written to the slow query log.
+
+    :param ms: Milliseconds, 0 to log all queries.
+    :type ms: int
+    """
+
+    global SLOW_QRY_MS
+
+    SLOW_QRY_MS = int(ms)
+
+
+def set_explain_path(path):
+    """
+    Turns diagnostic mode on or off.
+    In diagnostic mode SELECTs of :data:`EXPLAIN_FNCS` are run again
+    under `EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON)` and their plans
+    are appended to the given file as JSON lines.
+
+    :param path: A path to a diagnostics file, None or an empty string
+        to turn diagnostic mode off.
+    :type path: str
+    """
+
+    global EXPLAIN_PATH
+
+    EXPLAIN_PATH = path if path else None
+
+
+def set_log_cb(cb):
+    """
+    Sets a function that writes slow queries and action summaries.
+
+    :param cb: A function taking a message, None to write nothing.
+    :type cb: function
+    """
+
+    _log_cb[0] = cb
+
+
+def _log(msg):
+    """
+    Writes the given message by the log function.
+
+    :param msg: A message.
+    :type msg: str
+    """
+
+    cb = _log_cb[0]
+
+    if cb is not None:
+        cb(msg)
+
+
+def get_fp(sql):
+    """
+    Returns a fingerprint of the given query.
+
+    :param sql: A query.
+    :type sql: str
+
+    :returns: A fingerprint.
+    :rtype: str
+    """
+
+    if isinstance(sql, bytes):
+        sql = sql.decode(u'utf-8', u'replace')
+
+    fp = sql
+
+    for fp_re, repl in _FP_RE_LIST:
+        fp = fp_re.sub(repl, fp)
+
+    fp = fp.strip()[:_FP_LEN]
+
+    return fp
+
+
+def _get_db_fnc():
+    """
+    Returns a name of the database function that runs the current query.
+    The nearest public function of the database module is preferred
+    over helper functions that start with an underscore.
+
+    :returns: A function name, None when the query does not come
+        from the database module.
+    :rtype: str
+    """
+
+    db_fnc = None
+
+    frame = sys._getframe(2)
+
+    while frame is not None:
+        if frame.f_globals.get(u'__name__') == _DB_MOD:
+            fnc = frame.f_code.co_name
+            if not fnc.startswith(u'_'):
+                return fnc
+            if db_fnc is None:
+                db_fnc = fnc
+
+        frame = frame.f_back
+
+    return db_fnc
+
+
+def get_act():
+    """
+    Returns the current action of this thread.
+
+    :returns: An action.
+    :rtype: str
+    """
+
+    act_list = getattr(_loc, u'act_list', None)
+
+    if not act_list:
+        return OTHER_ACT
+
+    return act_list[-1].name
+
+
+def _rec(fnc, sql, dur, row_cnt):
+    """
+    Records a query.
+
+    :param fnc: A name of the function that ran the query.
+    :type fnc: str
+    :param sql: A query.
+    :type sql: str
+    :param dur: Seconds the query took.
+    :type dur: float
+    :param row_cnt: A number of rows, -1 when it is not known.
+    :type row_cnt: int
+    """
+
+    act_list = getattr(_loc, u'act_list', None)
+
+    if act_list:
+        act = act_list[-1]
+        act.qry_cnt += 1
+        act.qry_dur += dur
+        act_name = act.name
+    else:
+        act_name = OTHER_ACT
+
+    fp = get_fp(sql)
+
+    with _stats_lock:
+        stats = _stats_dict.setdefault((act_name, fnc, fp), [0, 0.0, 0.0, 0])
+        stats[0] += 1
+        stats[1] += dur
+        stats[2] = max(stats[2], dur)
+        stats[3] += max(row_cnt, 0)
+
+    if dur * 1000 >= SLOW_QRY_MS:
+        _log(
+            u'Slow query ({:.0f} ms, {} row(s)) in {} of {}: {}'.format(
+                dur * 1000, row_cnt, fnc, act_name, fp))
+
+
+def get_stats():
+    """
+    Returns statistics of recorded queries.
+
+    :returns:
+     | A list of tuples ordered by total time, containing:
+     |    - *str* -- an action
+     |    - *str* -- a function
+     |    - *str* -- a fingerprint
+     |    - *int* -- a number of queries
+     |    - *float* -- total seconds
+     |    - *float* -- maximum seconds
+     |    - *int* -- a number of rows
+    :rtype: list
+    """
+
+    with _stats_lock:
+        stats_list = [
+            key + tuple(stats) for key, stats in _stats_dict.items()]
+
+    stats_list.sort(key=lambda stats: stats[4], reverse=True)
+
+    return stats_list
+
+
+def get_act_stats():
+    """
+    Returns statistics of recorded queries aggregated by action.
+
+    :returns: A dictionary with actions as keys and tuples containing
+        a number of queries, total seconds and a number of rows as values.
+    :rtype: dict
+    """
+
+    act_stats_dict = {}
+
+    for act, fnc, fp, cnt, dur, max_dur, row_cnt in get_stats():
+        act_cnt, act_dur, act_row_cnt = act_stats_dict.get(act, (0, 0.0, 0))
+        act_stats_dict[act] = (
+            act_cnt + cnt, act_dur + dur, act_row_cnt + row_cnt)
+
+    return act_stats_dict
+
+
+def rst_stats():
+    """
+    Removes all recorded statistics.
+    """
+
+    with _stats_lock:
+        _stats_dict.clear()
+
+
+class Act(object):
+    """
+    A user action whose queries are recorded together.
+    It is used either as a context manager or as a decorator of methods
+    without arguments, e.g. slots of `clicked` signals.
+    """
+
+    def __init__(self, name):
+        """
+        Constructor.
+
+        :param name: An action name.
+        :type name: str
+        """
+
+        self.name = name
+
+    def __enter__(self):
+        """
+        Makes this action the current action of this thread.
+        """
+
+        self.qry_cnt = 0
+        self.qry_dur = 0.0
+        self.strt_ts = time.time()
+
+        if not hasattr(_loc, u'act_list'):
+            _loc.act_list = []
+
+        _loc.act_list.append(self)
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb):
+        """
+        Restores the previous action and writes a summary of this action
+        when it ran any query.
+        """
+
+        _loc.act_list.remove(self)
+
+        if self.qry_cnt != 0:
+            _log(
+                u'{}: {} query(ies) in {:.3f} s, {:.3f} s in total.'.format(
+                    self.name,
+                    self.qry_cnt,
+                    self.qry_dur,
+                    time.time() - self.strt_ts))
+
+    def __call__(self, fnc):
+        """
+        Returns the given method running in this action.
+
+        :param fnc: A method without arguments.
+        :type fnc: function
+
+        :returns: A method running in this action.
+        :rtype: function
+        """
+
+        name = self.name
+
+        # an exact signature keeps Qt from passing signal arguments
+        @functools.wraps(fnc)
+        def _wrpr(obj):
+            with Act(name):
+                return fnc(obj)
+
+        return _wrpr
+
+
+class InstrCur(psycopg2.extensions.cursor):
+    """
+    A cursor that records its queries.
+    """
+
+    def _rec_call(self, meth, sql, *args):
+        """
+        Calls the given method of the base cursor and records the query.
+
+        :param meth: A method of the base cursor.
+        :type meth: function
+        :param sql: A query.
+        :type sql: str
+
+        :returns: What the method returns.
+        """
+
+        fnc = _get_db_fnc()
+
+        strt_ts = time.time()
+
+        try:
+            rslt = meth(self, sql, *args)
+        finally:
+            dur = time.time() - strt_ts
+            _rec(fnc, sql, dur, self.rowcount)
+
+        if EXPLAIN_PATH is not None \
+                and meth == psycopg2.extensions.cursor.execute \
+                and fnc in EXPLAIN_FNCS:
+            self._explain(fnc, sql, args[0], dur)
+
+        return rslt
+
+    def _explain(self, fnc, sql, vars, dur):
+        """
+        Runs the given SELECT again under `EXPLAIN ANALYZE`
+        and appends its plan with its parameters to the diagnostics file.
+        A failed explain is rolled back to a savepoint when it runs
+        in a transaction and it is only logged, diagnostic mode is turned
+        off when the file cannot be written.
+
+        :param fnc: A name of the function that ran the query.
+        :type fnc: str
+        :param sql: A query.
+        :type sql: str
+        :param vars: Parameters of the query.
+        :type vars: tuple
+        :param dur: Seconds the query took.
+        :type dur: float
+        """
+
+        if not get_fp(sql).upper().startswith((u'SELECT', u'WITH')):
+            return
+
+        con = self.connection
+        in_txn = con.get_transaction_status() \
+            != psycopg2.extensions.TRANSACTION_STATUS_IDLE
+
+        # a plain cursor so that the explain itself is not recorded
+        cur = con.cursor(cursor_factory=psycopg2.extensions.cursor)
+
+        try:
+            if in_txn:
+                cur.execute(u'SAVEPOINT nofa_explain')
+            try:
+                cur.execute(
+                    u'EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) ' + sql, vars)
+                plan = cur.fetchone()[0]
+            except psycopg2.Error as e:
+                if in_txn:
+                    cur.execute(u'ROLLBACK TO SAVEPOINT nofa_explain')
+                _log(u'Explain of {} failed: {}'.format(fnc, e))
+                return
+            finally:
+                if in_txn:
+                    cur.execute(u'RELEASE SAVEPOINT nofa_explain')
+        finally:
+            cur.close()
+
+        diag = OrderedDict([
+            (u'ts', datetime.datetime.now().isoformat()),
+            (u'act', get_act()),
+            (u'fnc', fnc),
+            (u'fp', get_fp(sql)),
+            (u'dur', dur),
+            (u'sql', sql),
+            (u'vars', vars),
+            (u'plan', plan)])
+
+        # diagnostic mode can be turned off by another thread meanwhile
+        explain_path = EXPLAIN_PATH
+
+        if explain_path is None:
+            return
+
+        # a diagnostics file that cannot be written must not break queries
+        try:
+            line = json.dumps(diag, default=unicode, ensure_ascii=False)
+
+            with _explain_lock:
+                with io.open(explain_path, u'a', encoding=u'utf-8') as f:
+                    f.write(unicode(line) + u'\n')
+        except (IOError, OSError, ValueError) as e:
+            _log(
+                u'Diagnostics not written to "{}", '
+                u'diagnostic mode is off: {}'.format(explain_path, e))
+            set_explain_path(None)
+
+    def execute(self, sql, vars=None):
+        """
+        Executes the given query and records it.
+        """
+
+        return self._rec_call(
+            psycopg2.extensions.cursor.execute, sql, vars)
+
+    def executemany(self, sql, vars_list):
+        """
+        Executes the given query for all parameters and records it.
+        """
+
+        return self._rec_call(
+            psycopg2.extensions.cursor.executemany, sql, vars_list)
+
+    def copy_expert(self, sql, file, size=8192):
+        """
+        Executes the given COPY statement and records it.
+        """
+
+        return self._rec_call(
+            psycopg2.extensions.cursor.copy_expert, sql, file, size)
@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ LkpSnap
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import cPickle
+import hashlib
+import os
+import zlib
+
+
+# increased when the format of snapshot files changes
+SNAP_VERS = 2
+
+
+def get_snap_path(snap_dir, host, port, db_name):
+    """
+    Returns a path to a snapshot file of the given database.
+
+    :param snap_dir: A directory snapshot files are stored in.
+    :type snap_dir: str
+    :param host: A host.
+    :type host: str
+    :param port: A port.
+    :type port: str
+    :param db_name: A database name.
+    :type db_name: str
+
+    :returns: A path to a snapshot file.
+    :rtype: str
+    """
+
+    db_key = u'{}:{}/{}'.format(host, port, db_name).encode(u'utf-8')
+
+    snap_path = os.path.join(
+        snap_dir, u'lkp_{}.snap'.format(hashlib.md5(db_key).hexdigest()))
+
+    return snap_path
+
+
+def load_snap(snap_path, schema_stamp):
+    """
+    Loads a snapshot of lookup lists from the given file.
+
+    :param snap_path: A path to a snapshot file.
+    :type snap_path: str
+    :param schema_stamp: A current schema stamp,
+        see :func:`nofa.db.get_schema_stamp`.
+    :type schema_stamp: str
+
+    :returns: A snapshot, see :func:`nofa.db.get_cache_snap`,
+        None when there is no snapshot, it cannot be read
+        or it was saved for another schema.
+    :rtype: dict
+    """
+
+    try:
+        with open(snap_path, u'rb') as f:
+            snap = cPickle.loads(zlib.decompress(f.read()))
+    except Exception:
+        return None
+
+    if snap.get(u'vers') != SNAP_VERS \
+            or snap.get(u'schema_stamp') != schema_stamp:
+        return None
+
+    return snap[u'snap_dict']
+
+
+def save_snap(snap_path, schema_stamp, snap_dict):
+    """
+    Saves a snapshot of lookup lists to the given file.
+    The file is replaced only when the whole snapshot is written.
+
+    :param snap_path: A path to a snapshot file.
+    :type snap_path: str
+    :param schema_stamp: A schema stamp,
+        see :func:`nofa.db.get_schema_stamp`.
+    :type schema_stamp: str
+    :param snap_dict: A snapshot, see :func:`nofa.db.get_cache_snap`.
+    :type snap_dict: dict
+    """
+
+    snap_dir = os.path.dirname(snap_path)
+
+    if not os.path.isdir(snap_dir):
+        os.makedirs(snap_dir)
+
+    snap = {
+        u'vers': SNAP_VERS,
+        u'schema_stamp': schema_stamp,
+        u'snap_dict': snap_dict}
+
+    tmp_path = snap_path + u'.tmp'
+
+    with open(tmp_path, u'wb') as f:
+        f.write(zlib.compress(cPickle.dumps(snap, cPickle.HIGHEST_PROTOCOL)))
+
+    # renaming does not replace an existing file on Windows
+    if os.path.exists(snap_path):
+        os.remove(snap_path)
+
+    os.rename(tmp_path, snap_path)
@@ -0,0 +1,149 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TxnIdx
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                             -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+from collections import defaultdict, OrderedDict
+
+from . import db
+
+
+# taxon ranks offered in the taxon combo box
+TXN_CB_RANKS = (u'species', u'hybrid', u'genus')
+
+
+class TxnIdx(object):
+    """
+    An in-memory index of taxons, families and ecotypes.
+    """
+
+    def __init__(self, txn_idx_list=()):
+        """
+        Constructor.
+
+        :param txn_idx_list: A list of taxons with their ecotypes,
+            see :func:`nofa.db.get_txn_idx_list`.
+        :type txn_idx_list: list
+        """
+
+        # scientific name -> taxon ID
+        self.txn_id_dict = {}
+        # family -> scientific names
+        self.fam_dict = defaultdict(list)
+        # scientific name -> OrderedDict(vernacular name -> ecotype ID)
+        self.ectp_dict = defaultdict(OrderedDict)
+        # vernacular name -> ecotype ID
+        self.ectp_id_dict = {}
+
+        self.txn_list = []
+
+        for txn_id, txn, fam, rank, ectp_id, ectp in txn_idx_list:
+            txn, fam, rank, ectp = [
+                db.get_unicode(val) for val in (txn, fam, rank, ectp)]
+
+            if txn not in self.txn_id_dict:
+                self.txn_id_dict[txn] = txn_id
+
+                if fam is not None:
+                    self.fam_dict[fam].append(txn)
+
+                if rank in TXN_CB_RANKS:
+                    self.txn_list.append(txn)
+
+            if ectp is not None:
+                self.ectp_dict[txn].setdefault(ectp, ectp_id)
+                self.ectp_id_dict.setdefault(ectp, ectp_id)
+
+    def get_txn_list(self):
+        """
+        Returns a list of taxons that is used to populate taxon combo box.
+
+        :returns: A list of taxons.
+        :rtype: list
+        """
+
+        return list(self.txn_list)
+
+    def get_txn_id(self, txn):
+        """
+        Returns a taxon ID based on the given scientific name.
+
+        :param txn: A taxon scientific name.
+        :type txn: str
+
+        :returns: A taxon ID.
+        :rtype: int
+        """
+
+        return self.txn_id_dict[db.get_unicode(txn)]
+
+    def get_ectp_list(self, txn):
+        """
+        Returns a list of ecotypes that is used to populate ecotype combo box.
+
+        :param txn: A taxon scientific name.
+        :type txn: str
+
+        :returns: A list of ecotypes.
+        :rtype: list
+        """
+
+        return list(self.ectp_dict.get(db.get_unicode(txn), {}).keys())
+
+    def get_ectp_id(self, ectp, txn=None):
+        """
+        Returns an ecotype ID based on the given vernacular name.
+        When a taxon is given, only its ecotypes are searched.
+
+        :param ectp: An ecotype vernacular name.
+        :type ectp: str
+        :param txn: A taxon scientific name.
+        :type txn: str
+
+        :returns: An ecotype ID, None when there is no ecotype.
+        :rtype: int
+        """
+
+        ectp = db.get_unicode(ectp)
+
+        if txn is not None:
+            return self.ectp_dict.get(db.get_unicode(txn), {}).get(ectp)
+
+        return self.ectp_id_dict.get(ectp)
+
+
+def get_txn_idx(con):
+    """
+    Returns a taxonomy index loaded in one query.
+
+    :param con: A connection.
+    :type con: psycopg2.connection
+
+    :returns: A taxonomy index.
+    :rtype: TxnIdx
+    """
+
+    txn_idx = TxnIdx(db.get_txn_idx_list(con))
+
+    return txn_idx
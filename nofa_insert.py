@@ -26,13 +26,14 @@
 
 from PyQt4.QtCore import QSettings, QTranslator, qVersion, QCoreApplication
 from PyQt4.QtGui import QAction, QIcon
+from qgis.core import QgsMessageLog
 
 import os
 import psycopg2
 import psycopg2.extras
 
-from nofa.gui import ins_mw, con_dlg
-from nofa import db
+from nofa.gui import ins_mw, con_dlg, db_task
+from nofa import db, con_pool, instr
 
 import sys
 
@@ -79,6 +80,23 @@ class NOFAInsert(object):
         self.sel_str = u'Select'
         self.none_str = str(None)
 
+        # 0 - no prepared statements, e.g. for PgBouncer transaction pooling
+        db.set_prep_stmts(bool(int(self.settings.value(u'prep_stmts', 1))))
+        # meters within which the nearest lake of coordinates is searched
+        db.set_nrst_radius(self.settings.value(u'nrst_radius', db.NRST_RADIUS))
+
+        # queries slower than this are written to the message log
+        instr.set_slow_qry_ms(
+            self.settings.value(u'slow_qry_ms', instr.SLOW_QRY_MS))
+        instr.set_log_cb(
+            lambda msg: QgsMessageLog.logMessage(msg, self.app_name))
+        # diagnostic mode, plans of slow-prone queries are appended here
+        instr.set_explain_path(self.settings.value(u'explain_path', u''))
+
+        # task threads, the main window and the insert worker
+        self.con_pool = con_pool.ConPool(max_idle=db_task.MAX_THRD_CNT + 2)
+        self.con = None
+
     def initGui(self):
         """Create the menu entries and toolbar icons inside the QGIS GUI."""
 
@@ -108,8 +126,12 @@ class NOFAInsert(object):
         self.iface.removePluginMenu(self.app_name, self.nofa_act)
         self.iface.removePluginMenu(self.app_name, self.con_act)
         self.iface.removeToolBarIcon(self.nofa_act)
+        # a running insert and tasks are stopped before connections close
         self.ins_mw.dsc_from_iface()
 
+        self.rel_con()
+        self.con_pool.close_all()
+
     @property
     def con_info(self):
         """
@@ -142,14 +164,25 @@ class NOFAInsert(object):
         self.con_dlg = con_dlg.ConDlg(self, con_info, u'Set up connection.')
         self.con_dlg.exec_()
 
+    def rel_con(self, close=False):
+        """
+        Returns the current connection to the connection pool.
+
+        :param close: True to close the connection instead of keeping it.
+        :type close: bool
+        """
+
+        self.con_pool.put_con(self.con, close)
+        self.con = None
+
     def run(self):
         """Runs method that performs all the real work."""
 
-        self.con = None
+        self.rel_con()
 
         try:
             con_info = self.con_info
-            self.con = db.get_con(con_info)
+            self.con = self.con_pool.get_con(con_info)
 
             if not db.chck_nofa_tbls(self.con):
                 self._open_con_dlg(con_info)
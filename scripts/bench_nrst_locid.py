@@ -0,0 +1,167 @@
+import random
+import time
+
+import psycopg2
+
+
+# connection parameters to a test db with PostGIS
+
+pg_host = r'<host>'
+pg_user = r'<username>'
+pg_pwd = '<password>'
+pg_db = r'<db>'
+pg_port = r'<port>'
+
+
+# compares the nearest location query with ST_Distance ordering
+# to the KNN query in nofa.db.get_nrst_loc_cands on a synthetic lake set,
+# everything is created in temporary tables
+lake_cnt = 20000
+loc_per_lake = 5
+pt_cnt = 1000
+radius = 100.0
+k = 5
+
+old_sql = u"""
+    SELECT      "locationID"
+    FROM        bench_location loc
+    WHERE "waterBodyID" = (
+    SELECT id
+    FROM bench_lake lake
+    WHERE ST_DWithin(%(geom)s, lake.geom, %(radius)s)
+    ORDER BY    ST_Distance(%(geom)s, lake.geom)
+    LIMIT       1)
+    ORDER BY    ST_Distance(%(geom)s, loc.geom)
+    LIMIT 1;
+    """
+
+knn_sql = u"""
+    WITH        lake AS (
+                    SELECT      id
+                    FROM        bench_lake
+                    WHERE       ST_DWithin(%(geom)s, geom, %(radius)s)
+                    ORDER BY    geom <-> %(geom)s
+                    LIMIT       1)
+    SELECT      loc."locationID",
+                lake.id,
+                ST_Distance(%(geom)s, loc.geom) dist
+    FROM        lake
+                JOIN bench_location loc
+                    ON loc."waterBodyID" = lake.id
+    ORDER BY    loc.geom <-> %(geom)s
+    LIMIT       %(k)s
+    """
+
+try:
+    con = psycopg2.connect(
+        "host={} dbname={} user={} password= {} port={}"
+        .format(pg_host, pg_db, pg_user, pg_pwd, pg_port))
+    print u'connection successful'
+except:
+    print u'connection error'
+
+cur = con.cursor()
+
+
+# lakes are buffered points on a grid with 1 km spacing in UTM33,
+# locations are random points inside them
+cur.execute(
+    """
+    CREATE TEMPORARY TABLE  bench_lake
+    AS
+    SELECT      i id,
+                ST_Buffer(
+                    ST_SetSRID(
+                        ST_MakePoint(
+                            200000 + (i % 200) * 1000,
+                            6600000 + (i / 200) * 1000),
+                        25833),
+                    50 + random() * 300,
+                    8) geom
+    FROM        generate_series(0, %(lake_cnt)s - 1) i;
+
+    CREATE TEMPORARY TABLE  bench_location
+    AS
+    SELECT      md5(lake.id || '_' || j)::uuid "locationID",
+                lake.id "waterBodyID",
+                ST_SetSRID(
+                    ST_MakePoint(
+                        ST_X(ST_Centroid(lake.geom)) + (random() - 0.5) * 80,
+                        ST_Y(ST_Centroid(lake.geom)) + (random() - 0.5) * 80),
+                    25833) geom
+    FROM        bench_lake lake,
+                generate_series(1, %(loc_per_lake)s) j;
+
+    CREATE INDEX    ON bench_lake USING gist (geom);
+    CREATE INDEX    ON bench_location USING gist (geom);
+    CREATE INDEX    ON bench_location ("waterBodyID");
+    ANALYZE         bench_lake;
+    ANALYZE         bench_location;
+    """,
+    {'lake_cnt': lake_cnt, 'loc_per_lake': loc_per_lake})
+
+print u'{} lakes and {} locations created'.format(
+    lake_cnt, lake_cnt * loc_per_lake)
+
+
+# random points over the grid, some of them out of reach of any lake
+pt_list = []
+
+for i in range(pt_cnt):
+    x = 200000 + random.uniform(0, 200) * 1000
+    y = 6600000 + random.uniform(0, lake_cnt / 200) * 1000
+    cur.execute(
+        """
+        SELECT      ST_SetSRID(ST_MakePoint(%s, %s), 25833)::text
+        """,
+        (x, y))
+    pt_list.append(cur.fetchone()[0])
+
+
+def run(sql, name):
+    """
+    Runs the given query for every point and prints the elapsed time.
+
+    :param sql: A query.
+    :type sql: str
+    :param name: A name printed with the time.
+    :type name: str
+
+    :returns: A list of the nearest location IDs.
+    :rtype: list
+    """
+
+    locid_list = []
+
+    strt = time.time()
+
+    for geom in pt_list:
+        cur.execute(sql, {'geom': geom, 'radius': radius, 'k': k})
+        row = cur.fetchone()
+        locid_list.append(row[0] if row else None)
+
+    dur = time.time() - strt
+
+    print u'{}: {:.3f} s, {:.3f} ms per point'.format(
+        name, dur, dur / pt_cnt * 1000)
+
+    return locid_list
+
+
+# the first run of each query warms up the cache
+run(old_sql, u'ST_Distance (warm-up)')
+run(knn_sql, u'KNN (warm-up)')
+old_locid_list = run(old_sql, u'ST_Distance')
+knn_locid_list = run(knn_sql, u'KNN')
+
+diff_cnt = sum(
+    1 for old_locid, knn_locid in zip(old_locid_list, knn_locid_list)
+    if old_locid != knn_locid)
+
+print u'{} of {} points differ'.format(diff_cnt, pt_cnt)
+print u'{} points without lake'.format(old_locid_list.count(None))
+
+
+con.close()
+
+print u'connection closed'
@@ -0,0 +1,113 @@
+import psycopg2
+
+
+# connection parameters to NODA DB official db
+
+pg_host = r'<host>'
+pg_user = r'<username>'
+pg_pwd = '<password>'
+pg_db = r'<db>'
+pg_port = r'<port>'
+
+
+# migrations of plugin schema, run after create_log_tbls.py
+# and on existing deployments, every migration is applied only once,
+# creating an index blocks writes to its table until it is built
+log_tbl_list = [
+    (u'occurrence_log', u'occurrence_id'),
+    (u'location_log', u'location_id'),
+    (u'event_log', u'event_id'),
+    (u'dataset_log', u'dataset_id'),
+    (u'project_log', u'project_id'),
+    (u'reference_log', u'reference_id')]
+
+mig_list = [
+    (1,
+     u'history filter indexes',
+     [u"""
+      CREATE INDEX IF NOT EXISTS  {0}_username_insert_timestamp_idx
+      ON                          plugin.{0} (username, insert_timestamp);
+      CREATE INDEX IF NOT EXISTS  {0}_update_timestamp_idx
+      ON                          plugin.{0} (update_timestamp);
+      """.format(tbl) for tbl, id_col in log_tbl_list]),
+    (2,
+     u'history page indexes',
+     [u"""
+      CREATE INDEX IF NOT EXISTS  {0}_insert_timestamp_{1}_idx
+      ON                          plugin.{0} (insert_timestamp, {1});
+      """.format(tbl, id_col) for tbl, id_col in log_tbl_list]),
+    # refresh after locations are imported in bulk:
+    # REFRESH MATERIALIZED VIEW plugin.location_admin;
+    (3,
+     u'administrative units view',
+     [u"""
+      CREATE MATERIALIZED VIEW IF NOT EXISTS  plugin.location_admin
+      AS
+      SELECT      DISTINCT
+                  "countryCode",
+                  "county",
+                  "municipality"
+      FROM        nofa."location";
+      """])]
+
+try:
+    con = psycopg2.connect(
+        "host={} dbname={} user={} password= {} port={}"
+        .format(pg_host, pg_db, pg_user, pg_pwd, pg_port))
+    print u'connection successful'
+except:
+    print u'connection error'
+
+cur = con.cursor()
+
+
+# create migration table
+cur.execute(
+    """
+    CREATE TABLE IF NOT EXISTS  plugin.schema_migration(
+                                    version integer PRIMARY KEY,
+                                    description text NOT NULL,
+                                    applied_timestamp
+                                        timestamp without time zone
+                                        DEFAULT now());
+    COMMENT ON TABLE    plugin.schema_migration
+    IS                  'Migrations of plugin schema applied by NOFAInsert plugin scripts.';
+    """)
+
+con.commit()
+
+cur.execute(
+    """
+    SELECT      version
+    FROM        plugin.schema_migration
+    """)
+
+vers_list = [v[0] for v in cur.fetchall()]
+
+
+# apply migrations that have not been applied yet
+for vers, desc, sql_list in mig_list:
+    if vers in vers_list:
+        print u'migration {} "{}" already applied'.format(vers, desc)
+        continue
+
+    for sql in sql_list:
+        cur.execute(sql)
+
+    cur.execute(
+        """
+        INSERT INTO     plugin.schema_migration (
+                            version,
+                            description)
+        VALUES          (%s, %s)
+        """,
+        (vers, desc))
+
+    con.commit()
+
+    print u'migration {} "{}" applied'.format(vers, desc)
+
+
+con.close()
+
+print u'connection closed'
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TestAdminIdx
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                              -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import unittest
+
+from nofa import admin_idx
+
+
+class TestAdminIdx(unittest.TestCase):
+    """Test for the administrative index."""
+
+    def shortDescription(self):
+        """
+        Method that overrides default behaviour
+        and allows printing multiline test description.
+        """
+
+        return self._testMethodDoc
+
+    def setUp(self):
+        """Runs before each test."""
+
+        # rows as returned by the database without unicode types
+        self.admin_idx = admin_idx.AdminIdx([
+            ('NO', '\xc3\x98stfold', 'Halden', 2, 2),
+            ('NO', '\xc3\x98stfold', 'Fredrikstad', 2, 1),
+            ('NO', 'M\xc3\xb8re og Romsdal', '\xc3\x85lesund', 1, 3),
+            ('SE', 'Dalarna', 'Mora', 3, 4)])
+
+    def test_get_cntry_code_list(self):
+        """Tests that country codes are listed."""
+
+        self.assertEqual(
+            self.admin_idx.get_cntry_code_list(), [u'NO', u'SE'])
+
+    def test_get_cnty_list(self):
+        """Tests that counties are listed as unicode by rank."""
+
+        cnty_list = self.admin_idx.get_cnty_list(u'NO')
+
+        self.assertEqual(cnty_list, [u'M\xf8re og Romsdal', u'\xd8stfold'])
+        self.assertTrue(all(isinstance(c, unicode) for c in cnty_list))
+        self.assertEqual(
+            self.admin_idx.get_cnty_list(None),
+            [u'M\xf8re og Romsdal', u'\xd8stfold', u'Dalarna'])
+        self.assertEqual(self.admin_idx.get_cnty_list(u'FI'), [])
+
+    def test_get_muni_list_non_ascii(self):
+        """Tests that municipalities of non-ASCII counties are listed."""
+
+        self.assertEqual(
+            self.admin_idx.get_muni_list(u'NO', u'\xd8stfold'),
+            [u'Fredrikstad', u'Halden'])
+        self.assertEqual(
+            self.admin_idx.get_muni_list(None, u'M\xf8re og Romsdal'),
+            [u'\xc5lesund'])
+        self.assertEqual(
+            self.admin_idx.get_muni_list('NO', '\xc3\x98stfold'),
+            [u'Fredrikstad', u'Halden'])
+
+    def test_get_muni_list_all(self):
+        """Tests that all municipalities are listed without a county."""
+
+        self.assertEqual(
+            self.admin_idx.get_muni_list(u'NO', None),
+            [u'Fredrikstad', u'Halden', u'\xc5lesund'])
+        self.assertEqual(
+            self.admin_idx.get_muni_list(u'SE', u'\xd8stfold'), [])
+
+if __name__ == '__main__':
+    unittest.main()
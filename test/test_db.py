@@ -0,0 +1,138 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TestDb
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                              -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import datetime
+import unittest
+import uuid
+
+from nofa import db
+
+
+class TestDb(unittest.TestCase):
+    """Test for database functions that do not need a database."""
+
+    def shortDescription(self):
+        """
+        Method that overrides default behaviour
+        and allows printing multiline test description.
+        """
+
+        return self._testMethodDoc
+
+    def test_get_ewkb_hex(self):
+        """Tests that a point EWKB matches the one built by PostGIS."""
+
+        # SELECT ST_AsEWKB('SRID=25833;POINT(1 2)'::geometry)
+        self.assertEqual(
+            db.get_ewkb_hex(1, 2),
+            '0101000020E9640000000000000000F03F0000000000000040')
+
+    def test_get_ewkb_hex_multi(self):
+        """Tests that a multi point EWKB matches the one built by PostGIS."""
+
+        # SELECT ST_AsEWKB('SRID=4326;MULTIPOINT(1 2)'::geometry)
+        self.assertEqual(
+            db.get_ewkb_hex(1, 2, 4326, True),
+            '0104000020E610000001000000'
+            '0101000000000000000000F03F0000000000000040')
+
+    def test_get_copy_val(self):
+        """Tests that values are converted to COPY text format."""
+
+        self.assertEqual(db._get_copy_val(None, 'utf-8'), b'\\N')
+        self.assertEqual(db._get_copy_val(True, 'utf-8'), b't')
+        self.assertEqual(db._get_copy_val(False, 'utf-8'), b'f')
+        self.assertEqual(db._get_copy_val(0, 'utf-8'), b'0')
+        self.assertEqual(db._get_copy_val(0.1, 'utf-8'), b'0.1')
+        self.assertEqual(
+            db._get_copy_val(datetime.date(2017, 1, 9), 'utf-8'),
+            b'2017-01-09')
+
+        occ_id = uuid.uuid4()
+
+        self.assertEqual(db._get_copy_val(occ_id, 'utf-8'), str(occ_id))
+
+    def test_get_copy_val_esc(self):
+        """Tests that special characters are escaped in COPY text format."""
+
+        self.assertEqual(
+            db._get_copy_val(u'a\tb\nc\rd', 'utf-8'), b'a\\tb\\nc\\rd')
+        self.assertEqual(db._get_copy_val(u'C:\\tmp', 'utf-8'), b'C:\\\\tmp')
+        # a text that looks like NULL is not NULL
+        self.assertEqual(db._get_copy_val(u'\\N', 'utf-8'), b'\\\\N')
+        self.assertEqual(db._get_copy_val(u'', 'utf-8'), b'')
+
+    def test_get_copy_val_enc(self):
+        """Tests that text is encoded in the connection encoding."""
+
+        self.assertEqual(
+            db._get_copy_val(u'\xd8stfold', 'utf-8'), b'\xc3\x98stfold')
+        self.assertEqual(
+            db._get_copy_val(u'\xd8stfold', 'latin-1'), b'\xd8stfold')
+
+    def test_get_hist_fltr_params(self):
+        """Tests that end dates are turned into exclusive timestamps."""
+
+        fltr_params = db._get_hist_fltr_params(
+            u'nofa',
+            datetime.date(2017, 1, 1),
+            datetime.date(2017, 1, 31),
+            datetime.date(2017, 2, 1),
+            datetime.date(2017, 2, 28))
+
+        self.assertEqual(fltr_params, {
+            u'usr': u'nofa',
+            u'usr_ptn': None,
+            u'ins_ts_strt': datetime.date(2017, 1, 1),
+            u'ins_ts_end': datetime.date(2017, 2, 1),
+            u'upd_ts_strt': datetime.date(2017, 2, 1),
+            u'upd_ts_end': datetime.date(2017, 3, 1)})
+
+    def test_get_hist_fltr_params_usr(self):
+        """Tests that an username with `%` is used as a pattern."""
+
+        dt = datetime.date(2017, 1, 1)
+
+        fltr_params = db._get_hist_fltr_params(u'no%', dt, dt, dt, dt)
+
+        self.assertIsNone(fltr_params[u'usr'])
+        self.assertEqual(fltr_params[u'usr_ptn'], u'no%')
+
+        fltr_params = db._get_hist_fltr_params(None, dt, dt, dt, dt)
+
+        self.assertIsNone(fltr_params[u'usr'])
+        self.assertIsNone(fltr_params[u'usr_ptn'])
+
+    def test_get_unicode(self):
+        """Tests that byte strings are decoded as UTF-8."""
+
+        self.assertEqual(db.get_unicode('\xc3\x98stfold'), u'\xd8stfold')
+        self.assertEqual(db.get_unicode(u'\xd8stfold'), u'\xd8stfold')
+        self.assertIsNone(db.get_unicode(None))
+        self.assertEqual(db.get_unicode(1), 1)
+
+if __name__ == '__main__':
+    unittest.main()
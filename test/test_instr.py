@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TestInstr
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                              -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import unittest
+
+from nofa import instr
+
+
+class TestInstr(unittest.TestCase):
+    """Test for query instrumentation."""
+
+    def shortDescription(self):
+        """
+        Method that overrides default behaviour
+        and allows printing multiline test description.
+        """
+
+        return self._testMethodDoc
+
+    def test_get_fp_literals(self):
+        """Tests that literals are replaced in fingerprints."""
+
+        self.assertEqual(
+            instr.get_fp(
+                u"SELECT * FROM nofa.location WHERE \"no\" = 'O''Neil' "
+                u"AND x > 1.5"),
+            u'SELECT * FROM nofa.location WHERE "no" = ? AND x > ?')
+
+    def test_get_fp_whitespace(self):
+        """Tests that whitespace is collapsed in fingerprints."""
+
+        self.assertEqual(
+            instr.get_fp(u'\n  SELECT  a,\n\tb\n  FROM  t\n'),
+            u'SELECT a, b FROM t')
+
+    def test_get_fp_lists(self):
+        """Tests that lists of different lengths have one fingerprint."""
+
+        self.assertEqual(
+            instr.get_fp(u"SELECT 1 FROM t WHERE id IN ('a', 'b', 'c')"),
+            instr.get_fp(u"SELECT 2 FROM t WHERE id IN ('d', 'e')"))
+        self.assertEqual(
+            instr.get_fp(u'INSERT INTO t (a, b) VALUES (1, 2), (3, 4)'),
+            instr.get_fp(
+                u'INSERT INTO t (a, b) VALUES (5, 6), (7, 8), (9, 0)'))
+
+    def test_get_fp_bytes(self):
+        """Tests that byte queries are decoded and fingerprints are cut."""
+
+        self.assertEqual(
+            instr.get_fp(b"SELECT '\xc3\x98stfold'"), u'SELECT ?')
+        self.assertEqual(len(instr.get_fp(u'SELECT ' + u'a' * 500)), 200)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TestLkpSnap
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                              -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from nofa import lkp_snap
+
+
+class TestLkpSnap(unittest.TestCase):
+    """Test for lookup snapshots."""
+
+    def shortDescription(self):
+        """
+        Method that overrides default behaviour
+        and allows printing multiline test description.
+        """
+
+        return self._testMethodDoc
+
+    def setUp(self):
+        """Runs before each test."""
+
+        self.snap_dir = tempfile.mkdtemp()
+        self.snap_path = lkp_snap.get_snap_path(
+            os.path.join(self.snap_dir, u'NOFAInsert'),
+            u'localhost', u'5432', u'nofa')
+        self.snap_dict = {
+            (u'get_oqt_list', ()): [u'Individuals', u'\xd8rret'],
+            (u'get_col_def_val', ('nofa', 'occurrence', 'modified')):
+                u'now()'}
+
+    def tearDown(self):
+        """Runs after each test."""
+
+        shutil.rmtree(self.snap_dir)
+
+    def test_get_snap_path(self):
+        """Tests that databases have different snapshot files."""
+
+        self.assertNotEqual(
+            self.snap_path,
+            lkp_snap.get_snap_path(
+                os.path.join(self.snap_dir, u'NOFAInsert'),
+                u'localhost', u'5432', u'nofa_test'))
+
+    def test_save_load_snap(self):
+        """Tests that a saved snapshot is loaded for the same schema."""
+
+        lkp_snap.save_snap(self.snap_path, u'abc', self.snap_dict)
+
+        self.assertEqual(
+            lkp_snap.load_snap(self.snap_path, u'abc'), self.snap_dict)
+        self.assertFalse(os.path.exists(self.snap_path + u'.tmp'))
+
+    def test_save_snap_replace(self):
+        """Tests that a snapshot replaces the previous one."""
+
+        lkp_snap.save_snap(self.snap_path, u'abc', self.snap_dict)
+        lkp_snap.save_snap(self.snap_path, u'abc', {})
+
+        self.assertEqual(lkp_snap.load_snap(self.snap_path, u'abc'), {})
+
+    def test_load_snap_stamp(self):
+        """Tests that a snapshot of another schema is not loaded."""
+
+        lkp_snap.save_snap(self.snap_path, u'abc', self.snap_dict)
+
+        self.assertIsNone(lkp_snap.load_snap(self.snap_path, u'def'))
+
+    def test_load_snap_missing(self):
+        """Tests that a missing or broken snapshot is not loaded."""
+
+        self.assertIsNone(lkp_snap.load_snap(self.snap_path, u'abc'))
+
+        lkp_snap.save_snap(self.snap_path, u'abc', self.snap_dict)
+
+        with open(self.snap_path, u'wb') as f:
+            f.write(b'broken')
+
+        self.assertIsNone(lkp_snap.load_snap(self.snap_path, u'abc'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+/***************************************************************************
+ TestTxnIdx
+                                 A QGIS plugin
+ Insert fish occurrence data to NOFA DB
+                              -------------------
+        begin                : 2017-01-09
+        git sha              : $Format:%H$
+        copyright            : (C) 2017 by NINA
+        contributors         : stefan.blumentrath@nina.no
+                               matteo.destefano@nina.no
+                               jakob.miksch@nina.no
+                               ondrej.svoboda@nina.no
+ ***************************************************************************/
+
+/***************************************************************************
+ *                                                                         *
+ *   This program is free software; you can redistribute it and/or modify  *
+ *   it under the terms of the GNU General Public License as published by  *
+ *   the Free Software Foundation; either version 2 of the License, or     *
+ *   (at your option) any later version.                                   *
+ *                                                                         *
+ ***************************************************************************/
+"""
+
+import unittest
+
+from nofa import txn_idx
+
+
+class TestTxnIdx(unittest.TestCase):
+    """Test for the taxonomy index."""
+
+    def shortDescription(self):
+        """
+        Method that overrides default behaviour
+        and allows printing multiline test description.
+        """
+
+        return self._testMethodDoc
+
+    def setUp(self):
+        """Runs before each test."""
+
+        # rows as returned by the database without unicode types
+        self.txn_idx = txn_idx.TxnIdx([
+            (1, 'Salmo trutta', 'Salmonidae', 'species',
+             10, 'Sj\xc3\xb8aure'),
+            (1, 'Salmo trutta', 'Salmonidae', 'species',
+             11, 'Bekkaure'),
+            (2, 'Salmo', 'Salmonidae', 'genus', None, None),
+            (3, 'Salmo trutta x salar', 'Salmonidae', 'hybrid',
+             None, None),
+            (4, 'Salmonidae', None, 'family', None, None)])
+
+    def test_get_txn_list(self):
+        """Tests that only taxons of combo box ranks are listed."""
+
+        self.assertEqual(
+            self.txn_idx.get_txn_list(),
+            [u'Salmo trutta', u'Salmo', u'Salmo trutta x salar'])
+
+    def test_get_txn_id(self):
+        """Tests that taxon IDs are found by scientific names."""
+
+        self.assertEqual(self.txn_idx.get_txn_id(u'Salmo trutta'), 1)
+        self.assertEqual(self.txn_idx.get_txn_id('Salmo'), 2)
+        self.assertRaises(KeyError, self.txn_idx.get_txn_id, u'Esox lucius')
+
+    def test_get_ectp_list(self):
+        """Tests that ecotypes are listed as unicode in database order."""
+
+        ectp_list = self.txn_idx.get_ectp_list(u'Salmo trutta')
+
+        self.assertEqual(ectp_list, [u'Sj\xf8aure', u'Bekkaure'])
+        self.assertTrue(all(isinstance(e, unicode) for e in ectp_list))
+        self.assertEqual(self.txn_idx.get_ectp_list(u'Salmo'), [])
+
+    def test_get_ectp_id_non_ascii(self):
+        """Tests that non-ASCII ecotypes are found as unicode and bytes."""
+
+        self.assertEqual(
+            self.txn_idx.get_ectp_id(u'Sj\xf8aure', u'Salmo trutta'), 10)
+        self.assertEqual(
+            self.txn_idx.get_ectp_id('Sj\xc3\xb8aure', 'Salmo trutta'), 10)
+        self.assertEqual(self.txn_idx.get_ectp_id(u'Sj\xf8aure'), 10)
+
+    def test_get_ectp_id_other_txn(self):
+        """Tests that an ecotype of another taxon is not found."""
+
+        self.assertIsNone(self.txn_idx.get_ectp_id(u'Bekkaure', u'Salmo'))
+        self.assertIsNone(self.txn_idx.get_ectp_id(u'Storaure'))
+
+if __name__ == '__main__':
+    unittest.main()